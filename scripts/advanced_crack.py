@@ -2,44 +2,16 @@
 
 import pikepdf
 import sys
-import itertools
 import string
 from pathlib import Path
+from pdf_security import PasswordVerifier, UnsupportedEncryptionError
+from potfile import record_password, try_known_passwords
+from keyspace import CharsetKeyspace
+from dates import quick_date_keyspace
 
-def try_password(pdf_path, password):
-    """Try to open PDF with given password using pikepdf"""
-    try:
-        with pikepdf.open(pdf_path, password=password):
-            return True
-    except pikepdf.PasswordError:
-        return False
-    except Exception:
-        return False
-
-def generate_number_passwords(min_length=1, max_length=8):
-    """Generate numeric passwords"""
-    for length in range(min_length, max_length + 1):
-        for combo in itertools.product('0123456789', repeat=length):
-            yield ''.join(combo)
-
-def generate_common_patterns():
-    """Generate common password patterns"""
-    patterns = []
-    
-    # Years
-    for year in range(1950, 2030):
-        patterns.append(str(year))
-    
-    # Dates (DDMM, MMDD, DDMMYY, MMDDYY)
-    for day in range(1, 32):
-        for month in range(1, 13):
-            patterns.append(f"{day:02d}{month:02d}")
-            patterns.append(f"{month:02d}{day:02d}")
-            for year in [21, 22, 23, 24, 25]:
-                patterns.append(f"{day:02d}{month:02d}{year}")
-                patterns.append(f"{month:02d}{day:02d}{year}")
-    
-    return patterns
+def try_password(verifier, password):
+    """Check a password against the parsed encryption parameters"""
+    return verifier.check(password)
 
 def main():
     if len(sys.argv) != 2:
@@ -51,6 +23,19 @@ def main():
         print(f"Error: {pdf_file} does not exist")
         sys.exit(1)
     
+    try:
+        verifier = PasswordVerifier.from_file(pdf_file)
+    except (UnsupportedEncryptionError, ValueError) as e:
+        print(f"Error: {e}")
+        sys.exit(1)
+    
+    # Already cracked, or opened by a password recovered from another file
+    password = try_known_passwords(verifier)
+    if password is not None:
+        print(f"Password found in potfile: '{password}'")
+        decrypt_pdf(pdf_file, password)
+        return
+    
     print(f"Advanced password cracking for: {pdf_file}")
     
     # First try common passwords
@@ -65,7 +50,7 @@ def main():
     print(f"Phase 1: Trying {len(common_passwords)} common passwords...")
     for i, password in enumerate(common_passwords, 1):
         print(f"[{i:2d}/{len(common_passwords)}] Trying: '{password}'", end=" ... ")
-        if try_password(pdf_file, password):
+        if try_password(verifier, password):
             print("SUCCESS!")
             print(f"Password found: '{password}'")
             decrypt_pdf(pdf_file, password)
@@ -73,24 +58,28 @@ def main():
         print("failed")
     
     print("\nPhase 2: Trying numeric passwords (1-6 digits)...")
+    numeric = CharsetKeyspace(string.digits, 1, 6)
     count = 0
-    for password in generate_number_passwords(1, 6):
+    for password in numeric.candidates(0, numeric.size):
         count += 1
         if count % 10000 == 0:
             print(f"Tried {count} numeric passwords...")
         
-        if try_password(pdf_file, password):
+        if try_password(verifier, password):
             print(f"SUCCESS! Password found: '{password}'")
             decrypt_pdf(pdf_file, password)
             return
     
     print(f"\nPhase 3: Trying date patterns...")
-    patterns = generate_common_patterns()
-    for i, password in enumerate(patterns):
-        if i % 1000 == 0:
+    # Recent DDMMYYYY and YYYYMMDD dates; brute_force_crack.py --dates tries every format
+    dates = quick_date_keyspace()
+    print(f"{dates.size:,} dates from {dates.first} to {dates.last}")
+    for i, password in enumerate(dates.candidates(0, dates.size)):
+        if i % 10000 == 0:
             print(f"Tried {i} date patterns...")
         
-        if try_password(pdf_file, password):
+        if verifier.check_bytes(password):
+            password = password.decode('latin-1')
             print(f"SUCCESS! Password found: '{password}'")
             decrypt_pdf(pdf_file, password)
             return
@@ -107,6 +96,7 @@ def decrypt_pdf(pdf_file, password):
     try:
         with pikepdf.open(pdf_file, password=password) as pdf:
             pdf.save(output_file)
+        record_password(pdf_file, password)
         print(f"Decrypted PDF saved as: {output_file}")
         
         # Verify it's not encrypted anymore
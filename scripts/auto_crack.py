@@ -12,6 +12,7 @@ Modes:
     quick     Use simple common/password patterns
     optimized Use CPU optimized wordlist attack
     brute     Full brute-force with CPU
+    keysearch Exhaustive 40-bit RC4 key search (revision 2 files)
 """
 
 import argparse
@@ -19,6 +20,9 @@ import subprocess
 from pathlib import Path
 import sys
 
+from m4_optimized_crack import decrypt_pdf
+from triage import triage_file
+
 SCRIPT_DIR = Path(__file__).resolve().parent
 
 def gpu_available() -> bool:
@@ -48,7 +52,7 @@ def auto_mode(pdf: Path):
 def main():
     parser = argparse.ArgumentParser(description='Auto-select PDF password cracking approach')
     parser.add_argument('pdf_file', help='Target PDF file')
-    parser.add_argument('--mode', choices=['auto', 'quick', 'optimized', 'brute'], default='auto',
+    parser.add_argument('--mode', choices=['auto', 'quick', 'optimized', 'brute', 'keysearch'], default='auto',
                         help='Cracking mode to use')
     args = parser.parse_args()
 
@@ -56,6 +60,18 @@ def main():
     if not pdf.exists():
         parser.error(f"File not found: {pdf}")
 
+    # Unencrypted, owner-only and already cracked files need no attack
+    result = triage_file(pdf)
+    if result.route in ('unencrypted', 'unsupported', 'error'):
+        print(f"{result.route}: {result.detail}")
+        if result.route != 'unencrypted':
+            sys.exit(1)
+        return
+    if result.route in ('decrypt', 'potfile'):
+        print(f"🗂️  {result.detail}: '{result.password}'")
+        decrypt_pdf(pdf, result.password)
+        return
+
     if args.mode == 'auto':
         auto_mode(pdf)
     elif args.mode == 'quick':
@@ -64,6 +80,8 @@ def main():
         run_script('m4_optimized_crack.py', pdf)
     elif args.mode == 'brute':
         run_script('brute_force_crack.py', pdf)
+    elif args.mode == 'keysearch':
+        run_script('rc4_key_search.py', pdf)
 
 
 if __name__ == '__main__':
@@ -0,0 +1,258 @@
+#!/usr/bin/env python3
+"""Reproducible guesses/sec benchmark per engine and encryption revision.
+
+Generates fixture PDFs with pikepdf for each encryption mode (R2 RC4-40,
+R3 RC4-128, R4 AES-128, R6 AES-256) with known passwords, then measures
+every engine at 1..N workers:
+
+    pikepdf   pikepdf.open per guess (how hits are confirmed)
+    qpdf      one qpdf --decrypt subprocess per guess, as in crack_pdf.py
+    native    PasswordVerifier, one candidate at a time
+    batched   BatchVerifier NumPy blocks (R2-R4 only)
+
+Each worker runs one batch at a time, so per-batch latency splits into the
+compute time measured in the worker and the IPC/scheduling overhead around
+it. Results go to a JSON file with stable keys, to diff between releases.
+
+Usage:
+    python benchmark.py [--output bench.json] [--workers 1,2,4] [--seconds S]
+        [--engines native,batched] [--compare old.json]
+"""
+
+import argparse
+import json
+import multiprocessing as mp
+import os
+import platform
+import resource
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from pathlib import Path
+
+import numpy as np
+import pikepdf
+
+from batch_verifier import DEFAULT_BATCH_SIZE, BatchVerifier
+from crack_pdf import try_decrypt_pdf
+from pdf_security import PasswordVerifier, confirm_password
+
+# (name, pikepdf Encryption arguments); every fixture's password is "bench-<name>"
+FIXTURES = [
+    ('R2-RC4-40', {'R': 2, 'aes': False, 'metadata': False}),
+    ('R3-RC4-128', {'R': 3, 'aes': False, 'metadata': False}),
+    ('R4-AES-128', {'R': 4, 'aes': True}),
+    ('R6-AES-256', {'R': 6, 'aes': True}),
+]
+ENGINES = ('pikepdf', 'qpdf', 'native', 'batched')
+# Target wall time of one batch, so latency numbers are comparable
+BATCH_SECONDS = 0.1
+
+# Per-process state set up by init_bench_worker
+_check_batch = None
+
+
+def make_fixtures(directory):
+    """Write one single-page PDF per encryption mode; return ``[(name, path, password)]``."""
+    fixtures = []
+    for name, options in FIXTURES:
+        path = Path(directory) / f"{name}.pdf"
+        password = f"bench-{name}"
+        pdf = pikepdf.new()
+        pdf.add_blank_page()
+        pdf.save(path, encryption=pikepdf.Encryption(user=password, owner=password + '-owner', **options))
+        fixtures.append((name, path, password))
+    return fixtures
+
+
+def _engine_checker(engine, pdf_path):
+    """Return ``check(passwords) -> number of hits`` for one engine and file."""
+    if engine == 'pikepdf':
+        return lambda passwords: sum(confirm_password(pdf_path, p) for p in passwords)
+    if engine == 'qpdf':
+        # One reused output per process, inside the fixtures' temporary directory
+        output = Path(pdf_path).with_name(f"{Path(pdf_path).stem}-qpdf-{os.getpid()}.pdf")
+        return lambda passwords: sum(try_decrypt_pdf(pdf_path, p, output) for p in passwords)
+    verifier = PasswordVerifier.from_file(pdf_path)
+    if engine == 'native':
+        return lambda passwords: sum(map(verifier.check, passwords))
+    batch = BatchVerifier(verifier.params)
+    return lambda passwords: int(batch.check_passwords([p.encode('latin-1') for p in passwords]).sum())
+
+
+def engine_supported(engine, name):
+    """Return None if the engine can run on this fixture, else the reason it cannot."""
+    if engine == 'qpdf' and shutil.which('qpdf') is None:
+        return 'qpdf not installed'
+    if engine == 'batched' and name.startswith('R6'):
+        return 'batched verification covers R2-R4 only'
+    return None
+
+
+def _peak_rss_mb():
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is bytes on macOS, kilobytes on Linux
+    return rss / (1 << 20) if sys.platform == 'darwin' else rss / 1024
+
+
+def init_bench_worker(engine, pdf_path):
+    """Pool initializer: build the engine once per worker."""
+    global _check_batch
+    _check_batch = _engine_checker(engine, pdf_path)
+
+
+def run_bench_batch(passwords):
+    """Check one batch; return ``(count, hits, compute_seconds, peak_rss_mb)``."""
+    start = time.perf_counter()
+    hits = _check_batch(passwords)
+    return len(passwords), hits, time.perf_counter() - start, _peak_rss_mb()
+
+
+def calibrate_batch_size(engine, pdf_path):
+    """Candidates per batch so one batch takes about BATCH_SECONDS in this process."""
+    check = _engine_checker(engine, pdf_path)
+    # Batched blocks have a fixed per-call cost; smaller batches would only measure that
+    minimum = DEFAULT_BATCH_SIZE if engine == 'batched' else 1
+    size, elapsed = minimum // 2 or 1, 0.0
+    while elapsed < BATCH_SECONDS / 4 and size < 1 << 16:
+        size *= 2
+        start = time.perf_counter()
+        check([f"calibrate{i}" for i in range(size)])
+        elapsed = time.perf_counter() - start
+    return max(minimum, int(size * BATCH_SECONDS / max(elapsed, 1e-6)))
+
+
+def measure(engine, pdf_path, password, workers, batch_size, seconds):
+    """Benchmark one engine on one file with ``workers`` processes."""
+    batches = ([f"wrong{n}-{i}" for i in range(batch_size)] for n in range(1 << 62))
+    counted = hits = 0
+    latencies, computes, rss = [], [], []
+    with ProcessPoolExecutor(max_workers=workers, initializer=init_bench_worker,
+                             initargs=(engine, pdf_path)) as executor:
+        # Correctness first: the known password must be found, and only it
+        _, found, _, _ = executor.submit(run_bench_batch, [password, 'not-' + password]).result()
+        if found != 1:
+            raise RuntimeError(f"{engine} found {found} of 1 known passwords in {pdf_path.name}")
+
+        pending = {}
+        start = time.perf_counter()
+        while True:
+            now = time.perf_counter()
+            if now - start < seconds:
+                # One batch per worker, so latency is not inflated by queueing
+                while len(pending) < workers:
+                    pending[executor.submit(run_bench_batch, next(batches))] = time.perf_counter()
+            if not pending:
+                break
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                submitted = pending.pop(future)
+                count, batch_hits, compute, worker_rss = future.result()
+                latencies.append(time.perf_counter() - submitted)
+                computes.append(compute)
+                rss.append(worker_rss)
+                counted += count
+                hits += batch_hits
+        elapsed = time.perf_counter() - start
+
+    if hits:
+        raise RuntimeError(f"{engine} accepted {hits} wrong passwords for {pdf_path.name}")
+    latencies.sort()
+    return {
+        'workers': workers,
+        'batch_size': batch_size,
+        'guesses': counted,
+        'seconds': round(elapsed, 3),
+        'guesses_per_sec': round(counted / elapsed, 1),
+        'batch_latency_ms': {
+            'mean': round(statistics.fmean(latencies) * 1000, 3),
+            'p50': round(latencies[len(latencies) // 2] * 1000, 3),
+            'p95': round(latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))] * 1000, 3),
+        },
+        'ipc_overhead_ms': round((statistics.fmean(latencies) - statistics.fmean(computes)) * 1000, 3),
+        'peak_worker_rss_mb': round(max(rss), 1),
+    }
+
+
+def environment():
+    """Versions and machine details recorded with every run."""
+    return {
+        'time': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'machine': platform.machine(),
+        'cpu_count': mp.cpu_count(),
+        'numpy': np.__version__,
+        'pikepdf': pikepdf.__version__,
+        'qpdf': pikepdf.__libqpdf_version__,
+    }
+
+
+def compare(old, new):
+    """Print guesses/sec ratios of ``new`` against ``old`` results."""
+    def rates(results):
+        return {(r['fixture'], r['engine'], r['workers']): r['guesses_per_sec']
+                for r in results['results'] if 'guesses_per_sec' in r}
+
+    before, after = rates(old), rates(new)
+    print(f"\n📈 Compared with {old['environment']['time']}:")
+    for key in sorted(before.keys() & after.keys()):
+        fixture, engine, workers = key
+        print(f"   {fixture:<11} {engine:<8} {workers:>2}w  {before[key]:>12,.0f} -> "
+              f"{after[key]:>12,.0f} pwd/sec ({after[key] / before[key]:.2f}x)")
+
+
+def main():
+    cpu_count = mp.cpu_count()
+    default_workers = sorted({1, *[n for n in (2, 4, 8, 16, 32) if n < cpu_count], cpu_count})
+    parser = argparse.ArgumentParser(description='Benchmark cracking engines per encryption revision')
+    parser.add_argument('--output', default='benchmark.json', help='JSON results file (default: benchmark.json)')
+    parser.add_argument('--workers', default=','.join(map(str, default_workers)),
+                        help='Comma-separated worker counts (default: 1, powers of two, all cores)')
+    parser.add_argument('--engines', default=','.join(ENGINES),
+                        help=f"Comma-separated engines (default: {','.join(ENGINES)})")
+    parser.add_argument('--seconds', type=float, default=3.0, help='Time per measurement (default: 3)')
+    parser.add_argument('--compare', help='Earlier results file to compare against')
+    args = parser.parse_args()
+
+    engines = args.engines.split(',')
+    unknown = set(engines) - set(ENGINES)
+    if unknown:
+        parser.error(f"unknown engines: {', '.join(sorted(unknown))}")
+    worker_counts = [int(n) for n in args.workers.split(',')]
+
+    env = environment()
+    print(f"⏱️  Benchmark on {env['platform']} ({env['cpu_count']} cores)")
+    results = []
+    with tempfile.TemporaryDirectory(prefix='pdf-bench-') as directory:
+        for name, path, password in make_fixtures(directory):
+            for engine in engines:
+                reason = engine_supported(engine, name)
+                if reason:
+                    print(f"⏭️  {name} {engine}: {reason}")
+                    results.append({'fixture': name, 'engine': engine, 'skipped': reason})
+                    continue
+                batch_size = calibrate_batch_size(engine, path)
+                for workers in worker_counts:
+                    result = measure(engine, path, password, workers, batch_size, args.seconds)
+                    print(f"📊 {name:<11} {engine:<8} {workers:>2}w  {result['guesses_per_sec']:>12,.0f} pwd/sec  "
+                          f"batch {result['batch_latency_ms']['p50']:.1f}ms  "
+                          f"ipc {result['ipc_overhead_ms']:.2f}ms  rss {result['peak_worker_rss_mb']:.0f}MB")
+                    results.append({'fixture': name, 'engine': engine, **result})
+
+    report = {'environment': env, 'results': results}
+    with open(args.output, 'w') as f:
+        json.dump(report, f, indent=2, sort_keys=True)
+        f.write('\n')
+    print(f"💾 Results written to {args.output}")
+
+    if args.compare:
+        with open(args.compare) as f:
+            compare(json.load(f), report)
+
+
+if __name__ == '__main__':
+    main()
@@ -2,33 +2,28 @@
 
 import pikepdf
 import sys
-import itertools
+import argparse
 import multiprocessing as mp
 import string
 from pathlib import Path
 import time
-from concurrent.futures import ProcessPoolExecutor, as_completed
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import nullcontext
+from pdf_security import PasswordVerifier, UnsupportedEncryptionError
+from crack_worker import init_worker, try_password_batch, try_keyspace_range
+from crack_runner import calibrated_chunk_size, keyspace_tasks, list_tasks, run_tasks
+from potfile import record_password, try_known_passwords
+from checkpoint import CheckpointError, default_checkpoint_path, open_checkpoint
+from dates import add_date_arguments, date_keyspace_from_args, quick_date_keyspace
+from keyspace import CharsetKeyspace, ExcludingKeyspace, covering, skip_covered
+from markov import MarkovKeyspace, add_markov_arguments, markov_model_from_args
+from mask import MaskError, MaskKeyspace, add_mask_arguments, mask_keyspace_from_args
+from metrics import add_metrics_arguments, metrics_from_args
+from profiling import RunProfiler, add_profile_arguments
+from rules import RuleError, RuledKeyspace, load_rules
+from wordlist import WordlistKeyspace
 
-def try_password_batch(args):
-    """Try a batch of passwords - designed for multiprocessing"""
-    pdf_path, passwords, batch_id = args
-    
-    for i, password in enumerate(passwords):
-        try:
-            with pikepdf.open(pdf_path, password=password):
-                return (True, password, batch_id, i)
-        except (pikepdf.PasswordError, pikepdf.PdfError):
-            continue
-        except Exception:
-            continue
-    
-    return (False, None, batch_id, len(passwords))
-
-def generate_brute_force_passwords(charset, min_length=1, max_length=6):
-    """Generate all possible passwords for given charset and length range"""
-    for length in range(min_length, max_length + 1):
-        for combo in itertools.product(charset, repeat=length):
-            yield ''.join(combo)
+BATCH_SIZE = 1000
 
 def generate_smart_patterns():
     """Generate smart password patterns based on common conventions"""
@@ -62,118 +57,225 @@ def generate_smart_patterns():
     return patterns
 
 def main():
-    if len(sys.argv) not in [2, 3]:
-        print("Usage: python brute_force_crack.py <pdf_file> [max_length]")
-        print("Default max_length is 4 (increase carefully - exponential growth!)")
-        sys.exit(1)
+    parser = argparse.ArgumentParser(description='Multi-core brute-force PDF password cracker')
+    parser.add_argument('pdf_file', help='Target PDF file')
+    parser.add_argument('max_length', type=int, nargs='?', default=4,
+                        help='Max password length (default: 4 - increase carefully, exponential growth!)')
+    add_mask_arguments(parser)
+    add_date_arguments(parser)
+    add_markov_arguments(parser)
+    parser.add_argument('--wordlist', help='External wordlist, one password per line (memory-mapped, any size)')
+    parser.add_argument('--rules', help='Hashcat/John rule file applied to every --wordlist word inside the workers')
+    parser.add_argument('--checkpoint', help='Checkpoint file (default: <pdf_stem>.checkpoint.json next to the PDF)')
+    parser.add_argument('--resume', action='store_true', help='Continue from the checkpoint file')
+    add_metrics_arguments(parser)
+    add_profile_arguments(parser)
+    args = parser.parse_args()
     
-    pdf_file = Path(sys.argv[1])
+    pdf_file = Path(args.pdf_file)
     if not pdf_file.exists():
         print(f"Error: {pdf_file} does not exist")
         sys.exit(1)
     
-    max_length = int(sys.argv[2]) if len(sys.argv) == 3 else 4
+    try:
+        verifier = PasswordVerifier.from_file(pdf_file)
+        params = verifier.params
+    except (UnsupportedEncryptionError, ValueError) as e:
+        print(f"Error: {e}")
+        sys.exit(1)
+    
+    # Already cracked, or opened by a password recovered from another file
+    password = try_known_passwords(verifier)
+    if password is not None:
+        print(f"🗂️  Password found in potfile: '{password}'")
+        decrypt_pdf(pdf_file, password)
+        return
+    
+    max_length = args.max_length
+    
+    if args.wordlist and not Path(args.wordlist).is_file():
+        print(f"Error: {args.wordlist} does not exist")
+        sys.exit(1)
+    if args.rules and not args.wordlist:
+        parser.error('--rules needs --wordlist')
+    try:
+        rules = load_rules(args.rules) if args.rules else None
+        model = markov_model_from_args(args)
+    except (RuleError, OSError) as e:
+        print(f"Error: {e}")
+        sys.exit(1)
+    
+    checkpoint_path = Path(args.checkpoint) if args.checkpoint else default_checkpoint_path(pdf_file)
+    try:
+        checkpoint = open_checkpoint(checkpoint_path, params.fingerprint(), args.resume)
+    except (CheckpointError, ValueError, OSError) as e:
+        print(f"Error: {e}")
+        sys.exit(1)
     
     num_processes = mp.cpu_count()
     print(f"🔥 Brute Force PDF Password Cracker (M4 Pro Optimized)")
-    print(f"📁 Target: {pdf_file}")
+    print(f"📁 Target: {pdf_file} (R{params.r}, {params.cipher})")
     print(f"⚡ Using {num_processes} CPU cores")
-    print(f"🔢 Max password length: {max_length}")
+    if args.wordlist:
+        print(f"📖 Wordlist: {args.wordlist}")
+    if rules:
+        print(f"📜 Rules: {args.rules} ({len(rules)} rules)")
+    if args.mask:
+        print(f"🎭 Mask: {args.mask}")
+    # Without --dates only recent separator-free dates are tried by default
+    try:
+        dates = date_keyspace_from_args(args) if args.dates else quick_date_keyspace()
+    except ValueError as e:
+        parser.error(str(e))
+    if args.dates:
+        print(f"📅 Dates: {dates.first} to {dates.last}")
+    if model is not None:
+        print(f"🧠 Markov order: trained on {model.passwords:,} passwords from {model.source}")
+        if not model.passwords:
+            print("⚠️  Empty corpus; keeping lexicographic order")
+            model = None
+    if not (args.wordlist or args.mask or args.dates):
+        print(f"🔢 Max password length: {max_length}")
     print()
     
-    strategies = [
-        ("🔢 Numeric brute force", string.digits, 1, min(6, max_length)),
-        ("🔤 Lowercase letters", string.ascii_lowercase, 1, min(4, max_length)),
-        ("🔠 Mixed case letters", string.ascii_letters, 1, min(3, max_length)),
-        ("🎯 Smart patterns", None, 0, 0),  # Special case
-    ]
+    strategies = []
+    if args.wordlist:
+        wordlist = WordlistKeyspace(args.wordlist)
+        if rules:
+            # Each worker expands its own base words; nothing is materialized
+            wordlist = RuledKeyspace(wordlist, rules)
+        strategies.append(("📖 Wordlist attack", wordlist))
+    if args.mask:
+        try:
+            strategies.append(("🎭 Mask attack", mask_keyspace_from_args(args)))
+        except MaskError as e:
+            parser.error(str(e))
+    if args.dates:
+        strategies.append(("📅 Date attack", dates))
+    if not strategies:
+        strategies = [
+            ("🔢 Numeric brute force", CharsetKeyspace(string.digits, 1, min(6, max_length))),
+            ("📅 Recent dates (DDMMYYYY, YYYYMMDD; --dates for every format)", dates),
+            ("🔤 Lowercase letters", CharsetKeyspace(string.ascii_lowercase, 1, min(4, max_length))),
+            ("🔠 Mixed case letters", CharsetKeyspace(string.ascii_letters, 1, min(3, max_length))),
+            ("🎯 Smart patterns", None),  # Special case
+        ]
+    if model is not None:
+        # Most likely candidates first; every candidate is still tried once
+        strategies = [(name, MarkovKeyspace(keyspace, model)
+                       if isinstance(keyspace, (MaskKeyspace, CharsetKeyspace)) else keyspace)
+                      for name, keyspace in strategies]
+    # Later phases skip candidates an earlier phase already covers, e.g. mixed
+    # case drops the all-lowercase words, smart patterns drop short numbers.
+    # Phases nothing earlier overlaps keep their raw keyspace (and block path)
+    covered = []
+    for i, (strategy_name, keyspace) in enumerate(strategies):
+        if keyspace is not None:
+            earlier = covering(keyspace, covered)
+            strategies[i] = (strategy_name, ExcludingKeyspace(keyspace, earlier) if earlier else keyspace)
+            covered.append(keyspace)
+    # Workers receive the keyspaces once; range tasks refer to them by index
+    keyspaces = tuple(keyspace for _, keyspace in strategies if keyspace is not None)
     
-    if max_length >= 5:
+    if max_length >= 5 and not (args.wordlist or args.mask):
         print("⚠️  Warning: Brute forcing passwords longer than 4 characters may take a very long time!")
         print("💡 Consider using targeted wordlists or known password patterns instead.")
         print()
     
     total_start_time = time.time()
+    # Candidates tested in this run, across all strategies
+    total_tested = 0
     
-    for strategy_name, charset, min_len, max_len in strategies:
-        print(f"\n{strategy_name}")
-        print("=" * 50)
-        
-        if charset is None:  # Smart patterns
-            passwords = generate_smart_patterns()
-            passwords = list(passwords)  # Convert to list for batching
-        else:
-            # Estimate total passwords for this strategy
-            total_passwords = sum(len(charset)**i for i in range(min_len, max_len + 1))
-            print(f"📊 Estimated passwords to test: {total_passwords:,}")
-            
-            if total_passwords > 10000000:  # 10 million
-                response = input("⚠️  This will test over 10 million passwords. Continue? (y/N): ")
-                if response.lower() != 'y':
-                    print("Skipping this strategy...")
+    # One warm pool for all strategies; keep every core busy with some headroom
+    max_in_flight = num_processes * 2
+    # Keyspace ranges cost no IPC per candidate, so size them by verifier speed
+    range_size = calibrated_chunk_size(verifier)
+    # Shared flag checked by workers between candidates
+    stop_event = mp.Event()
+    
+    metrics = metrics_from_args(args, pdf_file)
+    profiler = RunProfiler(args.profile)
+    initializer, initargs = profiler.pool(init_worker, (pdf_file, params, stop_event, keyspaces))
+    
+    with profiler, ProcessPoolExecutor(max_workers=num_processes, initializer=initializer,
+                                       initargs=initargs) as executor, \
+            (metrics or nullcontext()):
+        try:
+            for strategy_name, keyspace in strategies:
+                print(f"\n{strategy_name}")
+                print("=" * 50)
+                
+                if keyspace is None:  # Smart patterns
+                    passwords = skip_covered(generate_smart_patterns(), covered)
+                strategy = repr(keyspace) if keyspace is not None else f'smart-patterns:{len(passwords)}'
+                if checkpoint.is_complete(strategy):
+                    print("⏭️  Already completed in a previous run")
                     continue
-            
-            passwords = generate_brute_force_passwords(charset, min_len, max_len)
-        
-        # Convert generator to list in chunks to avoid memory issues
-        batch_size = 1000
-        strategy_start_time = time.time()
-        passwords_tested = 0
-        found = False
-        
-        with ProcessPoolExecutor(max_workers=num_processes) as executor:
-            batch = []
-            batch_id = 0
-            
-            for password in passwords:
-                batch.append(password)
                 
-                if len(batch) >= batch_size:
-                    # Submit batch
-                    future = executor.submit(try_password_batch, (pdf_file, batch, batch_id))
+                if keyspace is None:
+                    total_passwords = len(passwords)
+                    worker_fn = try_password_batch
+                    tasks = list_tasks(passwords, BATCH_SIZE, checkpoint, strategy)
+                elif isinstance(keyspace, (WordlistKeyspace, RuledKeyspace)):
+                    # Line count is unknown without reading the file
+                    total_passwords = None
+                    print(f"📊 Wordlist size: {keyspace.size / 1e6:,.1f} MB")
+                    worker_fn = try_keyspace_range
+                    tasks = keyspace_tasks(keyspaces.index(keyspace), keyspace, range_size,
+                                           checkpoint, strategy)
+                else:
+                    # Exact size of this strategy's keyspace
+                    total_passwords = keyspace.size
+                    remaining = keyspace.remaining() if isinstance(keyspace, ExcludingKeyspace) else None
+                    if remaining is not None and remaining < keyspace.size:
+                        total_passwords = remaining
+                        print(f"⏭️  Skipping {keyspace.size - total_passwords:,} passwords covered by earlier strategies")
+                    print(f"📊 Estimated passwords to test: {total_passwords:,}")
                     
-                    # Check result
-                    success, found_password, bid, tested_count = future.result()
-                    passwords_tested += tested_count
+                    if total_passwords > 10000000 and not args.mask:  # 10 million
+                        response = input("⚠️  This will test over 10 million passwords. Continue? (y/N): ")
+                        if response.lower() != 'y':
+                            print("Skipping this strategy...")
+                            continue
                     
-                    elapsed = time.time() - strategy_start_time
-                    rate = passwords_tested / elapsed if elapsed > 0 else 0
-                    
-                    print(f"🔍 Tested: {passwords_tested:,} | Rate: {rate:,.0f} pwd/sec", end="\r")
-                    
-                    if success:
-                        elapsed_total = time.time() - total_start_time
-                        print(f"\n🎉 SUCCESS! Password found: '{found_password}'")
-                        print(f"⏱️  Total time: {elapsed_total:.2f} seconds")
-                        print(f"📈 Total tested: {passwords_tested:,} passwords")
-                        
-                        # Decrypt and save
-                        decrypt_pdf(pdf_file, found_password)
-                        return
-                    
-                    batch = []
-                    batch_id += 1
-            
-            # Process remaining passwords in final batch
-            if batch:
-                future = executor.submit(try_password_batch, (pdf_file, batch, batch_id))
-                success, found_password, bid, tested_count = future.result()
-                passwords_tested += tested_count
+                    worker_fn = try_keyspace_range
+                    tasks = keyspace_tasks(keyspaces.index(keyspace), keyspace, range_size,
+                                           checkpoint, strategy)
                 
-                if success:
+                already_tested = checkpoint.tested(strategy)
+                if already_tested:
+                    print(f"⏩ Resuming: {already_tested:,} passwords already tested")
+                
+                strategy_start_time = time.time()
+                found_password, passwords_tested = run_tasks(
+                    executor, worker_fn, tasks, max_in_flight, total_passwords,
+                    checkpoint, strategy, already_tested, metrics=metrics,
+                    size=keyspace.size if keyspace is not None else None)
+                total_tested += passwords_tested
+                
+                if found_password is not None:
                     elapsed_total = time.time() - total_start_time
                     print(f"\n🎉 SUCCESS! Password found: '{found_password}'")
                     print(f"⏱️  Total time: {elapsed_total:.2f} seconds")
-                    print(f"📈 Total tested: {passwords_tested:,} passwords")
+                    print(f"📈 Total tested: {total_tested:,} passwords")
+                    checkpoint.remove()
                     
+                    # Decrypt and save
                     decrypt_pdf(pdf_file, found_password)
                     return
-        
-        strategy_elapsed = time.time() - strategy_start_time
-        print(f"\n❌ Strategy completed: {passwords_tested:,} passwords in {strategy_elapsed:.2f}s")
+                
+                checkpoint.mark_complete(strategy)
+                strategy_elapsed = time.time() - strategy_start_time
+                print(f"\n❌ Strategy completed: {passwords_tested:,} passwords in {strategy_elapsed:.2f}s")
+        except KeyboardInterrupt:
+            stop_event.set()
+            checkpoint.save()
+            print(f"\n⏹️  Interrupted by user")
+            print(f"💾 Progress saved to {checkpoint.path}; continue with --resume")
+            return
     
     total_elapsed = time.time() - total_start_time
-    print(f"\n❌ All strategies exhausted in {total_elapsed:.2f} seconds")
+    print(f"\n❌ All strategies exhausted in {total_elapsed:.2f} seconds ({total_tested:,} passwords tested)")
     print("\n💡 Recommendations:")
     print("1. Try a targeted dictionary attack with domain-specific words")
     print("2. Use professional tools like Hashcat with GPU acceleration")
@@ -188,6 +290,7 @@ def decrypt_pdf(pdf_file, password):
         print(f"\n💾 Decrypting and saving...")
         with pikepdf.open(pdf_file, password=password) as pdf:
             pdf.save(output_file)
+        record_password(pdf_file, password)
         
         print(f"✅ Decrypted PDF saved as: {output_file}")
         
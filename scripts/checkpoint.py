@@ -0,0 +1,142 @@
+#!/usr/bin/env python3
+"""Checkpoint files for long-running attacks.
+
+A checkpoint records, per strategy, which ``[start, end)`` ranges of the
+strategy's index space (keyspace indices, list positions or wordlist
+byte offsets) have been fully tested, plus the target's encryption
+fingerprint. Ranges are only recorded once their batch has returned, so
+batches that were still in flight when the file was written are simply
+tested again on resume.
+"""
+
+import bisect
+import json
+import os
+import time
+from pathlib import Path
+
+# Seconds between periodic checkpoint writes
+CHECKPOINT_INTERVAL = 30
+
+
+class CheckpointError(Exception):
+    """Raised when a checkpoint cannot be used for the current target."""
+
+
+class Checkpoint:
+    """Tracks completed ranges per strategy and persists them periodically."""
+
+    def __init__(self, path, target, interval=CHECKPOINT_INTERVAL):
+        self.path = Path(path)
+        self.target = target
+        self.interval = interval
+        self.strategies = {}
+        self._last_save = time.time()
+
+    @classmethod
+    def load(cls, path, target, interval=CHECKPOINT_INTERVAL):
+        """Load a checkpoint, checking it belongs to the same target."""
+        checkpoint = cls(path, target, interval)
+        with open(path) as f:
+            data = json.load(f)
+        if data.get('target') != target:
+            raise CheckpointError(f"{path} was written for a different target")
+        for name, state in data.get('strategies', {}).items():
+            checkpoint.strategies[name] = {
+                'done': [tuple(r) for r in state.get('done', [])],
+                'complete': state.get('complete', False),
+                'tested': state.get('tested', 0),
+            }
+        return checkpoint
+
+    def _state(self, strategy):
+        return self.strategies.setdefault(
+            strategy, {'done': [], 'complete': False, 'tested': 0})
+
+    def is_complete(self, strategy):
+        """Return True if a strategy was exhausted in an earlier run."""
+        return self._state(strategy)['complete']
+
+    def tested(self, strategy):
+        """Number of candidates recorded as tested for a strategy."""
+        return self._state(strategy)['tested']
+
+    def mark_done(self, strategy, start, end, tested=None):
+        """Record ``[start, end)`` as fully tested, merging adjacent ranges."""
+        state = self._state(strategy)
+        state['tested'] += (end - start) if tested is None else tested
+        done = state['done']
+        i = bisect.bisect_left(done, (start, end))
+        # Merge with the previous range if it touches
+        if i > 0 and done[i - 1][1] >= start:
+            i -= 1
+            start = min(start, done[i][0])
+            end = max(end, done[i][1])
+            del done[i]
+        # Merge with following ranges that touch
+        while i < len(done) and done[i][0] <= end:
+            end = max(end, done[i][1])
+            del done[i]
+        done.insert(i, (start, end))
+        self.maybe_save()
+
+    def mark_complete(self, strategy):
+        """Record that a strategy has been exhausted."""
+        self._state(strategy)['complete'] = True
+        self.save()
+
+    def pending(self, strategy, start, end):
+        """Yield the gaps of ``[start, end)`` not yet recorded as tested."""
+        position = start
+        for lo, hi in self._state(strategy)['done']:
+            if hi <= position:
+                continue
+            if lo >= end:
+                break
+            if lo > position:
+                yield position, lo
+            position = max(position, hi)
+        if position < end:
+            yield position, end
+
+    def maybe_save(self):
+        """Write the checkpoint if the save interval has elapsed."""
+        if time.time() - self._last_save >= self.interval:
+            self.save()
+
+    def save(self):
+        """Atomically write the checkpoint file."""
+        data = {
+            'version': 1,
+            'target': self.target,
+            'updated': time.strftime('%Y-%m-%dT%H:%M:%S'),
+            'strategies': {
+                name: {'done': state['done'], 'complete': state['complete'],
+                       'tested': state['tested']}
+                for name, state in self.strategies.items()
+            },
+        }
+        tmp_path = self.path.with_name(self.path.name + '.tmp')
+        with open(tmp_path, 'w') as f:
+            json.dump(data, f)
+        os.replace(tmp_path, self.path)
+        self._last_save = time.time()
+
+    def remove(self):
+        """Delete the checkpoint file once the attack has finished."""
+        self.path.unlink(missing_ok=True)
+
+
+def default_checkpoint_path(pdf_file):
+    """Checkpoint file stored next to the target PDF."""
+    pdf_file = Path(pdf_file)
+    return pdf_file.with_name(f"{pdf_file.stem}.checkpoint.json")
+
+
+def open_checkpoint(path, target, resume):
+    """Load a checkpoint for ``--resume`` or start a fresh one."""
+    if resume:
+        if Path(path).exists():
+            return Checkpoint.load(path, target)
+        print(f"⚠️  No checkpoint found at {path}, starting from the beginning")
+    return Checkpoint(path, target)
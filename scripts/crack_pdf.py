@@ -4,6 +4,8 @@ import subprocess
 import sys
 from pathlib import Path
 
+from potfile import Potfile, known_password, record_password
+
 def try_decrypt_pdf(pdf_path, password, output_path):
     """Try to decrypt PDF with given password"""
     try:
@@ -25,6 +27,14 @@ def main():
     
     output_file = pdf_file.with_name(f"{pdf_file.stem}_decrypted.pdf")
     
+    # A file cracked before needs no guessing
+    potfile = Potfile()
+    known = known_password(pdf_file, potfile)
+    if known is not None and try_decrypt_pdf(pdf_file, known, output_file):
+        print(f"Password found in potfile: '{known}'")
+        print(f"Decrypted file saved as: {output_file}")
+        return
+    
     # Common passwords to try
     passwords = [
         "",  # Empty password
@@ -61,6 +71,8 @@ def main():
         pdf_file.stem.lower(),
         pdf_file.stem.upper(),
     ]
+    # Passwords recovered from other files are the most likely, so go first
+    passwords = list(dict.fromkeys(potfile.priority_passwords() + passwords))
     
     print(f"Attempting to crack password for: {pdf_file}")
     print(f"Trying {len(passwords)} common passwords...")
@@ -71,6 +83,7 @@ def main():
         if try_decrypt_pdf(pdf_file, password, output_file):
             print("SUCCESS!")
             print(f"Password found: '{password}'")
+            record_password(pdf_file, password, potfile)
             print(f"Decrypted file saved as: {output_file}")
             
             # Verify the decrypted file
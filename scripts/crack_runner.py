@@ -0,0 +1,154 @@
+#!/usr/bin/env python3
+"""Parent-side driver shared by the multiprocessing crackers.
+
+Tasks are described as ``(task_args, (start, end))`` pairs: the arguments
+sent to the worker function and the index range they cover, which is what
+gets recorded in the checkpoint once the task has returned.
+"""
+
+import itertools
+import os
+import time
+from concurrent.futures import FIRST_COMPLETED, wait
+
+# Aim for tasks of about this many seconds: long enough to amortize IPC,
+# short enough for fine-grained checkpoints and progress
+TARGET_TASK_SECONDS = 1.0
+# Redraw the console progress line at most this often; printing after every
+# task costs measurable time on fast engines
+PROGRESS_INTERVAL = 0.25
+
+
+def calibrated_chunk_size(verifier, minimum=100, maximum=1000000, seconds=TARGET_TASK_SECONDS):
+    """Pick a range size so one task takes roughly ``seconds`` on one core"""
+    tested = 0
+    start = time.perf_counter()
+    while time.perf_counter() - start < 0.05:
+        verifier.check(f"calibration{tested}")
+        tested += 1
+    rate = tested / (time.perf_counter() - start)
+    return max(minimum, min(maximum, int(rate * seconds)))
+
+
+def keyspace_tasks(keyspace_id, keyspace, chunk_size, checkpoint=None, strategy=None):
+    """Describe a keyspace as (keyspace_id, start, end) range tasks
+
+    ``chunk_size`` is in candidates; the keyspace's ``ranges`` turns it into
+    index ranges (line-aligned byte ranges for wordlists).
+    """
+    gaps = [(0, keyspace.size)]
+    if checkpoint is not None:
+        gaps = list(checkpoint.pending(strategy, 0, keyspace.size))
+    for lo, hi in gaps:
+        for start, end in keyspace.ranges(chunk_size, lo, hi):
+            yield (keyspace_id, start, end), (start, end)
+
+
+def list_tasks(passwords, batch_size, checkpoint=None, strategy=None):
+    """Describe a password list as (batch, start) tasks"""
+    gaps = [(0, len(passwords))]
+    if checkpoint is not None:
+        gaps = list(checkpoint.pending(strategy, 0, len(passwords)))
+    for lo, hi in gaps:
+        for start in range(lo, hi, batch_size):
+            end = min(start + batch_size, hi)
+            yield (passwords[start:end], start), (start, end)
+
+
+def timed_call(worker_fn, task_args):
+    """Run a task in a worker and report which process ran it and for how long"""
+    start = time.perf_counter()
+    result = worker_fn(task_args)
+    return os.getpid(), time.perf_counter() - start, result
+
+
+def run_tasks(executor, worker_fn, tasks, max_in_flight, total=None,
+              checkpoint=None, strategy=None, already_tested=0, on_found=None, unit='pwd',
+              metrics=None, size=None):
+    """Run tasks through worker_fn keeping up to max_in_flight of them queued
+
+    Results are consumed as they complete and new tasks are submitted to
+    refill the window, so memory stays flat while every worker stays busy.
+    Completed ranges are recorded in the checkpoint, if any; whatever is
+    still in flight when the run stops is left out and retried on resume.
+
+    By default the run ends at the first success. With ``on_found``, each
+    successful result's payload is passed to it instead and the run only
+    ends once it returns True (used by multi-target runs). ``unit`` labels
+    the progress rate.
+
+    With ``metrics`` (a metrics.Metrics), the run is reported as one phase
+    named after ``strategy``; ``size`` is the index space of the tasks'
+    ranges when it differs from ``total`` (wordlist bytes).
+    Returns (found_password or None, passwords_tested).
+    """
+    start_time = time.time()
+    last_progress = 0.0
+    passwords_tested = 0
+    tasks = iter(tasks)
+    pending = {}
+    submit = executor.submit if metrics is None else (lambda fn, args: executor.submit(timed_call, fn, args))
+    show_progress = metrics is None or not metrics.to_stdout
+    result = 'stopped'
+    # Lowest start of a range whose task stopped early (hit or stop event):
+    # its tail is untested, so the metrics watermark never passes it
+    unfinished = None
+    if metrics is not None:
+        metrics.start_phase(strategy, total, already_tested, size)
+
+    try:
+        while True:
+            for task_args, task_range in itertools.islice(tasks, max_in_flight - len(pending)):
+                pending[submit(worker_fn, task_args)] = task_range
+            if not pending:
+                result = 'exhausted'
+                if show_progress:
+                    print_progress(passwords_tested + already_tested, total, start_time, passwords_tested, unit)
+                return None, passwords_tested
+
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                start, end = pending.pop(future)
+                if metrics is None:
+                    success, found_password, _, tested_count, finished = future.result()
+                else:
+                    pid, busy, (success, found_password, _, tested_count, finished) = future.result()
+                    if not finished:
+                        unfinished = start if unfinished is None else min(unfinished, start)
+                    # Everything below the oldest range still in flight or cut short has been tested
+                    holes = [lo for lo, _ in pending.values()]
+                    if unfinished is not None:
+                        holes.append(unfinished)
+                    position = min(holes, default=end)
+                    metrics.record(tested_count, position, pid, busy)
+                passwords_tested += tested_count
+                if success and (on_found is None or on_found(found_password)):
+                    result = 'found'
+                    return found_password, passwords_tested
+                if checkpoint is not None and finished:
+                    checkpoint.mark_done(strategy, start, end, tested_count)
+
+            if show_progress and time.time() - last_progress >= PROGRESS_INTERVAL:
+                last_progress = time.time()
+                print_progress(passwords_tested + already_tested, total, start_time, passwords_tested, unit)
+    finally:
+        # Workers set the shared stop event themselves on a hit; tasks
+        # that have not started yet are simply dropped
+        for future in pending:
+            future.cancel()
+        if checkpoint is not None:
+            checkpoint.save()
+        if metrics is not None:
+            metrics.end_phase(result)
+
+
+def print_progress(tested, total, start_time, tested_this_run=None, unit='pwd'):
+    """Rewrite the progress line in place"""
+    elapsed = time.time() - start_time
+    rate = (tested if tested_this_run is None else tested_this_run) / elapsed if elapsed > 0 else 0
+    if total:
+        print(f"🔍 Progress: {tested / total * 100:5.1f}% | "
+              f"Tested: {tested:,}/{total:,} | "
+              f"Rate: {rate:,.0f} {unit}/sec", end="\r")
+    else:
+        print(f"🔍 Tested: {tested:,} | Rate: {rate:,.0f} {unit}/sec", end="\r")
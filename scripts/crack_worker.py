@@ -0,0 +1,230 @@
+#!/usr/bin/env python3
+"""Worker-side helpers shared by the multiprocessing crackers.
+
+Pool workers receive the target's parsed encryption parameters once,
+through ``init_worker``, so each task only has to carry candidates.
+"""
+
+import signal
+from itertools import islice
+
+import numpy as np
+
+from batch_verifier import DEFAULT_BATCH_SIZE, BatchVerifier, pad_block, pad_passwords
+from pdf_security import (MultiTargetVerifier, PasswordVerifier, confirm_password, decode_password,
+                          encode_password)
+
+# Bytes of the U check compared per key in key search; the ~2^8 chance
+# matches over a 40-bit space are rejected by the full check
+PREFIX_BYTES = 4
+
+# Per-process state set up by init_worker
+_pdf_path = None
+_verifier = None
+_batch = None
+_stop_event = None
+_keyspaces = ()
+_multi = None
+_solved = None
+
+
+def init_worker(pdf_path, params, stop_event=None, keyspaces=()):
+    """Pool initializer: build the verifier once per worker process.
+
+    ``stop_event`` is an optional shared ``multiprocessing.Event``; once it
+    is set, running batches return early so a hit ends the run promptly.
+    ``keyspaces`` are the indexable keyspaces that range tasks refer to by
+    position, so a task only carries ``(keyspace_id, start, end)``.
+    """
+    global _pdf_path, _verifier, _batch, _stop_event, _keyspaces
+    # Ctrl-C is handled by the parent, which sets the stop event and
+    # writes the checkpoint; workers just finish their current candidate
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    _pdf_path = pdf_path
+    _verifier = PasswordVerifier(params)
+    # Revisions 2-4 are checked a block at a time with the NumPy kernels
+    _batch = BatchVerifier(params) if _verifier.revision <= 4 else None
+    _stop_event = stop_event
+    _keyspaces = keyspaces
+
+
+def try_password_batch(args):
+    """Try a batch of passwords - designed for multiprocessing"""
+    passwords, batch_id = args
+    if _batch is not None:
+        return _try_candidates_batched(passwords, batch_id, encoded=False)
+    return _try_candidates(passwords, batch_id, _verifier.check)
+
+
+def try_keyspace_range(args):
+    """Decode and try the candidates with indices in ``[start, end)``"""
+    keyspace_id, start, end = args
+    keyspace = _keyspaces[keyspace_id]
+    if _batch is not None:
+        # Keyspaces that decode to uint8 blocks (masks, dates) are padded as
+        # arrays. Checked on the class: wrappers like ExcludingKeyspace filter
+        # in candidates() and only forward blocks() from their base
+        if hasattr(type(keyspace), 'blocks'):
+            return _try_blocks_batched(keyspace.blocks(start, end), start)
+        return _try_candidates_batched(keyspace.candidates(start, end), start, keyspace.encoded)
+    # Mask keyspaces decode straight to encoded bytes
+    check = _verifier.check_bytes if keyspace.encoded else _verifier.check
+    return _try_candidates(keyspace.candidates(start, end), start, check)
+
+
+def _try_candidates(passwords, batch_id, check):
+    """Check candidates from any iterable.
+
+    Returns ``(success, password, batch_id, tested, finished)``; ``finished``
+    is True only if every candidate was checked, so the parent knows whether
+    the task's range can be recorded as done.
+    """
+    stop_event = _stop_event
+    tested = 0
+
+    for password in passwords:
+        if stop_event is not None and stop_event.is_set():
+            return (False, None, batch_id, tested, False)
+        if check(password) and confirm_password(_pdf_path, password):
+            if stop_event is not None:
+                stop_event.set()
+            if isinstance(password, bytes):
+                password = decode_password(password, _verifier.revision)
+            return (True, password, batch_id, tested, False)
+        tested += 1
+
+    return (False, None, batch_id, tested, True)
+
+
+def _try_candidates_batched(passwords, batch_id, encoded):
+    """_try_candidates for revisions 2-4, checking blocks of candidates at once.
+
+    The stop event is polled between blocks; ``tested`` counts the
+    candidates before a hit, as in the per-candidate loop.
+    """
+    stop_event = _stop_event
+    revision = _verifier.revision
+    passwords = iter(passwords)
+    tested = 0
+
+    while True:
+        if stop_event is not None and stop_event.is_set():
+            return (False, None, batch_id, tested, False)
+        block = list(islice(passwords, DEFAULT_BATCH_SIZE))
+        if not block:
+            break
+        raw = block if encoded else [encode_password(p, revision) for p in block]
+        for index in np.flatnonzero(_batch.check_padded(pad_passwords(raw))):
+            password = block[index]
+            if encoded:
+                password = decode_password(password, revision)
+            if confirm_password(_pdf_path, password):
+                if stop_event is not None:
+                    stop_event.set()
+                return (True, password, batch_id, tested + int(index), False)
+        tested += len(block)
+
+    return (False, None, batch_id, tested, True)
+
+
+def _try_blocks_batched(blocks, batch_id):
+    """_try_candidates_batched for ``(length, array)`` blocks of raw candidates.
+
+    Rows are padded straight from the decoded array, so no per-candidate
+    bytes objects are built; only hits are turned back into passwords.
+    """
+    stop_event = _stop_event
+    revision = _verifier.revision
+    tested = 0
+
+    for _, block in blocks:
+        for lo in range(0, len(block), DEFAULT_BATCH_SIZE):
+            if stop_event is not None and stop_event.is_set():
+                return (False, None, batch_id, tested, False)
+            rows = block[lo:lo + DEFAULT_BATCH_SIZE]
+            for index in np.flatnonzero(_batch.check_padded(pad_block(rows))):
+                password = decode_password(rows[index].tobytes(), revision)
+                if confirm_password(_pdf_path, password):
+                    if stop_event is not None:
+                        stop_event.set()
+                    return (True, password, batch_id, tested + int(index), False)
+            tested += len(rows)
+
+    return (False, None, batch_id, tested, True)
+
+
+def try_key_range(args):
+    """Try the RC4 file keys with indices in ``[start, end)`` against /U.
+
+    Blocks are filtered on the first bytes of the U check and matches
+    confirmed in full; a hit returns the key as a hex string.
+    """
+    keyspace_id, start, end = args
+    keyspace = _keyspaces[keyspace_id]
+    stop_event = _stop_event
+    tested = 0
+
+    for offset, keys in keyspace.blocks(start, end):
+        if stop_event is not None and stop_event.is_set():
+            return (False, None, start, tested, False)
+        for index in np.flatnonzero(_batch.check_keys(keys, PREFIX_BYTES)):
+            key = keys[index].tobytes()
+            if _verifier.check_file_key(key):
+                if stop_event is not None:
+                    stop_event.set()
+                return (True, key.hex(), start, tested + int(index), False)
+        tested += len(keys)
+
+    return (False, None, start, tested, True)
+
+
+def init_multi_worker(params_list, solved, stop_event=None, keyspaces=()):
+    """Pool initializer for multi-target runs.
+
+    ``solved`` is a shared ``multiprocessing.RawArray`` with one flag per
+    target; workers skip targets whose flag is set and set it on a hit.
+    """
+    global _multi, _solved, _stop_event, _keyspaces
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    _multi = MultiTargetVerifier(params_list)
+    _solved = solved
+    _stop_event = stop_event
+    _keyspaces = keyspaces
+
+
+def try_multi_batch(args):
+    """Try a batch of passwords against every unsolved target"""
+    passwords, batch_id = args
+    return _try_multi_candidates(passwords, batch_id, _multi.check)
+
+
+def try_multi_keyspace_range(args):
+    """Decode ``[start, end)`` of a keyspace and try it against every unsolved target"""
+    keyspace_id, start, end = args
+    keyspace = _keyspaces[keyspace_id]
+    check = _multi.check_bytes if keyspace.encoded else _multi.check
+    return _try_multi_candidates(keyspace.candidates(start, end), start, check)
+
+
+def _try_multi_candidates(passwords, batch_id, check):
+    """Like _try_candidates, but keeps going after a hit.
+
+    Returns ``(found_any, [(target_index, password), ...], batch_id, tested, finished)``.
+    """
+    stop_event = _stop_event
+    solved = _solved
+    hits = []
+    tested = 0
+
+    for password in passwords:
+        if stop_event is not None and stop_event.is_set():
+            return (bool(hits), hits, batch_id, tested, False)
+        for index in check(password, solved):
+            solved[index] = 1
+            if isinstance(password, bytes):
+                hits.append((index, decode_password(password, _multi.verifiers[index].revision)))
+            else:
+                hits.append((index, password))
+        tested += 1
+
+    return (bool(hits), hits, batch_id, tested, True)
@@ -0,0 +1,268 @@
+#!/usr/bin/env python3
+"""Calendar-aware date candidates, generated in bulk with NumPy.
+
+Every calendar day in a range is rendered in each requested format: an
+ordering of day, month and year (DMY, MDY, YMD), a separator between the
+fields (none, ``.``, ``-``, ``/`` ...) and a 4- or 2-digit year. Only real
+dates are produced - no 31 February, 29 February only in leap years -
+because the days come from ``datetime64`` arithmetic, not from looping
+over day and month numbers.
+
+Strings that two formats would both produce are generated once (0102 is
+1 February as DMY and 2 January as MDY), and 2-digit years only cover the
+last 100 years of the range.
+
+``DateKeyspace`` is indexable like the mask keyspaces, so the crackers
+stream date ranges straight into the verifiers without a wordlist file.
+
+Usage:
+    python dates.py [--dates 1950-2025 | 1990-01-01:1995-06-30] [--date-orders DMY,MDY]
+        [--date-separators ./-] [--date-years 4,2] [--output FILE | --show N]
+"""
+
+import argparse
+import datetime
+import re
+import sys
+
+import numpy as np
+
+ORDERS = ('DMY', 'MDY', 'YMD')
+DEFAULT_FIRST_YEAR = 1940
+DEFAULT_SEPARATORS = '.-/'
+DEFAULT_YEAR_DIGITS = (4, 2)
+# The default date phase of the crackers: DDMMYYYY and YYYYMMDD over recent years
+QUICK_ORDERS = ('DMY', 'YMD')
+QUICK_YEARS = 50
+_DIGITS = np.frombuffer(b'0123456789', dtype=np.uint8)
+
+
+def parse_date_range(text):
+    """Parse ``YYYY-YYYY`` (whole years) or ``YYYY-MM-DD:YYYY-MM-DD``."""
+    years = re.fullmatch(r'(\d{4})-(\d{4})', text)
+    try:
+        if years:
+            first = datetime.date(int(years.group(1)), 1, 1)
+            last = datetime.date(int(years.group(2)), 12, 31)
+        else:
+            first_text, last_text = text.split(':')
+            first = datetime.date.fromisoformat(first_text)
+            last = datetime.date.fromisoformat(last_text)
+    except ValueError:
+        raise argparse.ArgumentTypeError(
+            f"expected FIRST-LAST years or FIRST:LAST ISO dates, got {text!r}") from None
+    if first > last:
+        raise argparse.ArgumentTypeError(f"date range {text!r} ends before it starts")
+    return first, last
+
+
+def default_date_range():
+    """From DEFAULT_FIRST_YEAR to today."""
+    return datetime.date(DEFAULT_FIRST_YEAR, 1, 1), datetime.date.today()
+
+
+def quick_date_keyspace():
+    """The narrow date phase run when no ``--dates`` range is given.
+
+    Separator-free DDMMYYYY and YYYYMMDD over the last QUICK_YEARS years,
+    about 37k candidates instead of the 600k+ of the full default range.
+    """
+    today = datetime.date.today()
+    return DateKeyspace(datetime.date(today.year - QUICK_YEARS, 1, 1), today, QUICK_ORDERS, '', (4,))
+
+
+class DateKeyspace:
+    """Every valid date in ``[first, last]`` in every requested format.
+
+    Formats are ordered plain first, then by separator; within each, by
+    year digits and ordering as given. Each format is a contiguous index
+    range over its days in calendar order. ``candidates`` yields encoded
+    ``bytes``.
+    """
+
+    encoded = True
+
+    def __init__(self, first=None, last=None, orders=ORDERS, separators=DEFAULT_SEPARATORS,
+                 year_digits=DEFAULT_YEAR_DIGITS):
+        default_first, default_last = default_date_range()
+        self.first = first or default_first
+        self.last = last or default_last
+        self.orders = tuple(orders)
+        self.separators = ('',) + tuple(sep for sep in dict.fromkeys(separators) if sep)
+        self.year_digits = tuple(year_digits)
+        for order in self.orders:
+            if order not in ORDERS:
+                raise ValueError(f"unknown date order {order!r} (choose from {', '.join(ORDERS)})")
+        for digits in self.year_digits:
+            if digits not in (2, 4):
+                raise ValueError(f"year digits must be 2 or 4, got {digits}")
+        self.formats = [(order, sep, digits) for sep in self.separators
+                        for digits in self.year_digits for order in self.orders]
+        lengths = [digits + 4 + 2 * len(sep) for _, sep, digits in self.formats]
+        self.min_length, self.max_length = min(lengths), max(lengths)
+        self._days = None
+        self._starts = []
+        total = 0
+        for days in self._format_days():
+            self._starts.append(total)
+            total += len(days)
+        self.size = total
+
+    def __repr__(self):
+        separators = ''.join(self.separators[1:])
+        return (f"DateKeyspace({self.first}..{self.last}, {'/'.join(self.orders)}, "
+                f"separators {separators!r}, years {'/'.join(map(str, self.year_digits))})")
+
+    def __getstate__(self):
+        # Workers rebuild the day arrays instead of receiving them
+        state = self.__dict__.copy()
+        state['_days'] = None
+        return state
+
+    def _format_days(self):
+        """Per format, the ``datetime64[D]`` days it renders."""
+        if self._days is None:
+            days = np.arange(np.datetime64(self.first, 'D'), np.datetime64(self.last, 'D') + 1)
+            # A 2-digit year names one year per century; keep the most recent
+            recent = days[days >= np.datetime64(f'{max(self.last.year - 99, 1):04d}-01-01', 'D')]
+
+            self._days = []
+            produced = {}
+            for order, sep, digits in self.formats:
+                span = recent if digits == 2 else days
+                # Formats sharing separator and year width can spell the same
+                # string for different days (0102 is 1 Feb DMY and 2 Jan MDY);
+                # keep each string in the first format that produces it. With a
+                # separator, equal digits only mean equal strings if the field
+                # widths line up (11.10.1011 DMY is not 1011.10.11 YMD)
+                keys = self.digit_keys(span, order, digits)
+                layout = tuple(digits if field == 'Y' else 2 for field in order) if sep else None
+                earlier = produced.setdefault((sep, digits, layout), [])
+                if earlier:
+                    fresh = ~np.isin(keys, np.concatenate(earlier))
+                    span, keys = span[fresh], keys[fresh]
+                earlier.append(keys)
+                self._days.append(span)
+        return self._days
+
+    @staticmethod
+    def _fields(days):
+        """Day, month and year numbers of ``datetime64[D]`` days."""
+        months = days.astype('datetime64[M]')
+        years = months.astype('datetime64[Y]').astype(np.int64) + 1970
+        return (days - months).astype(np.int64) + 1, months.astype(np.int64) % 12 + 1, years
+
+    def digit_keys(self, days, order, digits):
+        """The digits of each rendered date as one integer (separators aside)."""
+        day, month, years = self._fields(days)
+        values = {'D': (day, 100), 'M': (month, 100), 'Y': (years % 10 ** digits, 10 ** digits)}
+        keys = np.zeros(len(days), dtype=np.int64)
+        for field in order:
+            value, scale = values[field]
+            keys = keys * scale + value
+        return keys
+
+    def ranges(self, chunk_size, start=0, end=None):
+        """Yield ``(start, end)`` index ranges covering ``[start, end)``."""
+        end = self.size if end is None else end
+        for lo in range(start, end, chunk_size):
+            yield lo, min(lo + chunk_size, end)
+
+    def _segments(self, start, end):
+        for index, first in enumerate(self._starts):
+            last = first + len(self._format_days()[index])
+            lo, hi = max(start, first), min(end, last)
+            if lo < hi:
+                yield index, lo - first, hi - first
+
+    def render(self, days, order, sep, digits):
+        """Render ``datetime64[D]`` days as an ``(N, length)`` uint8 array."""
+        day, month, years = self._fields(days)
+        fields = {'D': [day // 10, day % 10], 'M': [month // 10, month % 10]}
+        if digits == 4:
+            fields['Y'] = [years // 1000, years // 100 % 10, years // 10 % 10, years % 10]
+        else:
+            fields['Y'] = [years // 10 % 10, years % 10]
+
+        length = sum(len(fields[field]) for field in order) + 2 * len(sep)
+        out = np.empty((len(days), length), dtype=np.uint8)
+        position = 0
+        for i, field in enumerate(order):
+            if i and sep:
+                for char in sep.encode('latin-1'):
+                    out[:, position] = char
+                    position += 1
+            for column in fields[field]:
+                out[:, position] = _DIGITS[column]
+                position += 1
+        return out
+
+    def blocks(self, start, end):
+        """Yield ``(length, array)`` blocks for global indices ``[start, end)``."""
+        for index, lo, hi in self._segments(start, end):
+            order, sep, digits = self.formats[index]
+            block = self.render(self._format_days()[index][lo:hi], order, sep, digits)
+            yield block.shape[1], block
+
+    def candidates(self, start, end):
+        """Yield the encoded candidates with global indices in ``[start, end)``."""
+        for length, block in self.blocks(start, end):
+            data = block.tobytes()
+            for i in range(0, len(data), length):
+                yield data[i:i + length]
+
+
+def add_date_arguments(parser, flag_help='Date phase over a range: 1950-2025 or 1990-01-01:1995-06-30',
+                       repeatable=False):
+    """Add the date candidate options to an argparse parser."""
+    first, last = default_date_range()
+    if repeatable:
+        parser.add_argument('--dates', action='append', type=parse_date_range, metavar='RANGE',
+                            help=f"{flag_help} (repeatable)")
+    else:
+        parser.add_argument('--dates', nargs='?', const=(first, last), type=parse_date_range,
+                            metavar='RANGE', help=f"{flag_help} (default: {first.year}-{last.year})")
+    parser.add_argument('--date-orders', default=','.join(ORDERS),
+                        help=f"Comma-separated field orders (default: {','.join(ORDERS)})")
+    parser.add_argument('--date-separators', default=DEFAULT_SEPARATORS,
+                        help=f"Separator characters besides none (default: '{DEFAULT_SEPARATORS}')")
+    parser.add_argument('--date-years', default=','.join(map(str, DEFAULT_YEAR_DIGITS)),
+                        help='Comma-separated year digit counts, 4 and/or 2 (default: 4,2)')
+
+
+def date_keyspace_from_args(args, date_range=None):
+    """Build a DateKeyspace from options added by add_date_arguments."""
+    first, last = date_range or args.dates or default_date_range()
+    return DateKeyspace(first, last, args.date_orders.upper().split(','), args.date_separators,
+                        [int(digits) for digits in args.date_years.split(',')])
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Generate valid date candidates')
+    add_date_arguments(parser, flag_help='Date range')
+    parser.add_argument('--output', help='Write the candidates to this wordlist file')
+    parser.add_argument('--show', type=int, default=10, help='Print the first N candidates (default: 10)')
+    args = parser.parse_args()
+
+    try:
+        keyspace = date_keyspace_from_args(args)
+    except ValueError as e:
+        parser.error(str(e))
+    print(f"📅 {keyspace!r}", file=sys.stderr)
+    print(f"📊 {keyspace.size:,} candidates in {len(keyspace.formats)} formats", file=sys.stderr)
+
+    if args.output:
+        with open(args.output, 'wb') as f:
+            for length, block in keyspace.blocks(0, keyspace.size):
+                lines = np.empty((len(block), length + 1), dtype=np.uint8)
+                lines[:, :length] = block
+                lines[:, length] = ord('\n')
+                f.write(lines.tobytes())
+        print(f"💾 Written to {args.output}", file=sys.stderr)
+    else:
+        for candidate in keyspace.candidates(0, min(args.show, keyspace.size)):
+            print(candidate.decode('latin-1'))
+
+
+if __name__ == '__main__':
+    main()
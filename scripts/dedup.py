@@ -0,0 +1,289 @@
+#!/usr/bin/env python3
+"""Memory-bounded deduplication for candidate streams.
+
+Two backends, both keeping the first occurrence of every candidate in its
+original position so likely passwords stay at the front:
+
+- ``exact``: an insertion-ordered dict until the memory budget is reached,
+  then sorted runs spilled to temporary files and merged from disk.
+- ``bloom``: a Bloom filter sized from the budget and a target
+  false-positive rate. Streams lazily; a false positive drops a candidate
+  that was never tested, so keep the rate low.
+
+Usage:
+    python dedup.py <input> [<input> ...] -o <output> [--method exact|bloom]
+        [--memory-mb MB] [--error-rate RATE]
+"""
+
+import argparse
+import hashlib
+import heapq
+import itertools
+import math
+import pickle
+import shutil
+import sys
+import tempfile
+from pathlib import Path
+
+DEFAULT_MEMORY_MB = 256
+DEFAULT_ERROR_RATE = 1e-6
+
+# Rough per-entry overhead of a dict slot plus the object header
+_ENTRY_OVERHEAD = 100
+# Run files open at once in a merge; more runs are merged in several passes
+MERGE_FAN_IN = 64
+
+
+class BloomFilter:
+    """A fixed-size Bloom filter over ``str`` or ``bytes`` items."""
+
+    def __init__(self, num_bits, num_hashes):
+        self.num_bits = max(8, num_bits)
+        self.num_hashes = max(1, num_hashes)
+        self.bits = bytearray((self.num_bits + 7) // 8)
+        self.count = 0
+
+    @classmethod
+    def for_capacity(cls, capacity, error_rate=DEFAULT_ERROR_RATE):
+        """Size a filter to hold ``capacity`` items at ``error_rate``."""
+        num_bits = math.ceil(-capacity * math.log(error_rate) / math.log(2) ** 2)
+        return cls(num_bits, round(num_bits / capacity * math.log(2)))
+
+    @classmethod
+    def for_memory(cls, memory_bytes, error_rate=DEFAULT_ERROR_RATE):
+        """Use ``memory_bytes`` of bits, with the hash count for ``error_rate``."""
+        return cls(memory_bytes * 8, round(-math.log2(error_rate)))
+
+    @property
+    def capacity(self):
+        """Items the filter holds before exceeding its design error rate."""
+        return int(self.num_bits * math.log(2) / self.num_hashes)
+
+    def _positions(self, item):
+        if isinstance(item, str):
+            item = item.encode('utf-8', 'surrogatepass')
+        digest = hashlib.blake2b(item, digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], 'little')
+        h2 = int.from_bytes(digest[8:], 'little') | 1
+        m = self.num_bits
+        return [(h1 + i * h2) % m for i in range(self.num_hashes)]
+
+    def __contains__(self, item):
+        bits = self.bits
+        return all(bits[p >> 3] & (1 << (p & 7)) for p in self._positions(item))
+
+    def add(self, item):
+        """Add an item; return False if it was (probably) already present."""
+        bits = self.bits
+        new = False
+        for p in self._positions(item):
+            mask = 1 << (p & 7)
+            if not bits[p >> 3] & mask:
+                bits[p >> 3] |= mask
+                new = True
+        if new:
+            self.count += 1
+        return new
+
+
+def bloom_dedup(candidates, memory_mb=DEFAULT_MEMORY_MB, error_rate=DEFAULT_ERROR_RATE,
+                capacity=None):
+    """Yield candidates not seen before, using a Bloom filter.
+
+    With ``capacity`` the filter is sized for it at ``error_rate`` (capped
+    at ``memory_mb``); otherwise it uses the whole budget.
+    """
+    memory_bytes = memory_mb << 20
+    bloom = BloomFilter.for_memory(memory_bytes, error_rate)
+    if capacity is not None:
+        sized = BloomFilter.for_capacity(capacity, error_rate)
+        if len(sized.bits) <= memory_bytes:
+            bloom = sized
+    warned = False
+    for candidate in candidates:
+        if bloom.add(candidate):
+            yield candidate
+            if not warned and bloom.count > bloom.capacity:
+                print(f"⚠️  Bloom filter past its capacity of {bloom.capacity:,}; "
+                      f"false positives will rise (raise --memory-mb)", file=sys.stderr)
+                warned = True
+
+
+def _write_run(records, directory, index, prefix='run'):
+    """Pickle ``records`` in order to a run file and return its path."""
+    path = Path(directory) / f"{prefix}{index:05d}.pkl"
+    with open(path, 'wb') as f:
+        for record in records:
+            pickle.dump(record, f, pickle.HIGHEST_PROTOCOL)
+    return path
+
+
+def _read_run(path):
+    with open(path, 'rb') as f:
+        while True:
+            try:
+                yield pickle.load(f)
+            except EOFError:
+                return
+
+
+def _merged(runs, key, directory, name, fan_in=None):
+    """Merge sorted runs, keeping at most ``fan_in`` files open at a time.
+
+    While there are more runs than that, consecutive groups are merged into
+    intermediate runs named after ``name``. Groups keep their order, so
+    records with equal keys still come out in run order, as in one
+    ``heapq.merge`` over all runs. Runs are deleted once merged.
+    """
+    fan_in = fan_in or MERGE_FAN_IN
+    runs = list(runs)
+    level = 0
+    while len(runs) > fan_in:
+        level += 1
+        merged = []
+        for i in range(0, len(runs), fan_in):
+            group = runs[i:i + fan_in]
+            merged.append(_write_run(heapq.merge(*map(_read_run, group), key=key),
+                                     directory, len(merged), prefix=f"{name}{level}-"))
+            for path in group:
+                path.unlink()
+        runs = merged
+    yield from heapq.merge(*map(_read_run, runs), key=key)
+    for path in runs:
+        path.unlink()
+
+
+def _sorted_runs(records, key, budget, directory, first_index):
+    """Spill ``(a, b)`` records into runs of about ``budget`` bytes sorted by ``key``.
+
+    One element of each record is the candidate, the other its position.
+    """
+    runs, chunk, used = [], [], 0
+    for record in records:
+        chunk.append(record)
+        a, b = record
+        used += len(b if isinstance(a, int) else a) + _ENTRY_OVERHEAD
+        if used >= budget:
+            chunk.sort(key=key)
+            runs.append(_write_run(chunk, directory, first_index + len(runs)))
+            chunk, used = [], 0
+    if chunk:
+        chunk.sort(key=key)
+        runs.append(_write_run(chunk, directory, first_index + len(runs)))
+    return runs
+
+
+def _first(record):
+    return record[0]
+
+
+def exact_dedup(candidates, memory_mb=DEFAULT_MEMORY_MB, tmpdir=None):
+    """Yield every distinct candidate once, in first-occurrence order.
+
+    Streams from an in-memory dict while the distinct candidates fit in half
+    the budget. Beyond that it switches to an external sort: ``(candidate,
+    position)`` runs are merged to keep each candidate's first position,
+    then re-sorted by position so the original order is restored.
+    """
+    # Half for the in-memory chunk, half for the run being built while it is spilled
+    budget = (memory_mb << 20) // 2
+    seen = {}
+    used = 0
+    candidates = iter(candidates)
+    for candidate in candidates:
+        if candidate in seen:
+            continue
+        seen[candidate] = len(seen)
+        used += len(candidate) + _ENTRY_OVERHEAD
+        if used >= budget:
+            break
+        yield candidate
+    else:
+        return
+
+    # Over budget: the in-memory chunk (all yielded but its last entry) and
+    # the rest of the stream go to disk. Candidates already yielded are
+    # recognized in the merge by their positions and skipped there.
+    emitted = len(seen) - 1
+
+    def numbered(chunk):
+        yield from chunk.items()
+        yield from zip(candidates, itertools.count(len(chunk)))
+
+    def first_occurrences(runs):
+        previous = None
+        # heapq.merge is stable, so equal candidates come in position order
+        for candidate, position in _merged(runs, _first, directory, 'value'):
+            if candidate != previous:
+                previous = candidate
+                if position >= emitted:
+                    yield position, candidate
+
+    directory = tempfile.mkdtemp(prefix='dedup-', dir=tmpdir)
+    try:
+        chunk, seen = seen, None
+        by_value = _sorted_runs(numbered(chunk), _first, budget, directory, 0)
+        del chunk
+        by_position = _sorted_runs(first_occurrences(by_value), _first, budget, directory,
+                                   len(by_value))
+        for _, candidate in _merged(by_position, _first, directory, 'position'):
+            yield candidate
+    finally:
+        shutil.rmtree(directory, ignore_errors=True)
+
+
+def dedup(candidates, method='exact', memory_mb=DEFAULT_MEMORY_MB,
+          error_rate=DEFAULT_ERROR_RATE, capacity=None, tmpdir=None):
+    """Remove repeats from any candidate stream with the chosen backend."""
+    if method == 'exact':
+        return exact_dedup(candidates, memory_mb, tmpdir)
+    if method == 'bloom':
+        return bloom_dedup(candidates, memory_mb, error_rate, capacity)
+    raise ValueError(f"unknown dedup method {method!r}")
+
+
+def _read_lines(paths):
+    """Yield the lines of each input file as bytes, without line endings."""
+    for path in paths:
+        with (sys.stdin.buffer if path == '-' else open(path, 'rb')) as f:
+            for line in f:
+                line = line.rstrip(b'\r\n')
+                if line:
+                    yield line
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Merge and deduplicate wordlists')
+    parser.add_argument('inputs', nargs='+', help="Wordlists to merge ('-' for stdin)")
+    parser.add_argument('-o', '--output', required=True, help='Deduplicated wordlist to write')
+    parser.add_argument('--method', choices=['exact', 'bloom'], default='exact',
+                        help='exact: sorted runs on disk; bloom: approximate, single pass')
+    parser.add_argument('--memory-mb', type=int, default=DEFAULT_MEMORY_MB,
+                        help=f'Memory budget in MB (default: {DEFAULT_MEMORY_MB})')
+    parser.add_argument('--error-rate', type=float, default=DEFAULT_ERROR_RATE,
+                        help=f'Bloom filter false-positive rate (default: {DEFAULT_ERROR_RATE})')
+    parser.add_argument('--tmpdir', help='Directory for sorted runs (default: system temp)')
+    args = parser.parse_args()
+
+    read = written = 0
+
+    def counted(lines):
+        nonlocal read
+        for line in lines:
+            read += 1
+            yield line
+
+    output = Path(args.output)
+    tmp_output = output.with_name(output.name + '.tmp')
+    with open(tmp_output, 'wb') as f:
+        for line in dedup(counted(_read_lines(args.inputs)), args.method, args.memory_mb,
+                          args.error_rate, tmpdir=args.tmpdir):
+            f.write(line + b'\n')
+            written += 1
+    tmp_output.replace(output)
+    print(f"✅ {written:,} unique of {read:,} candidates written to {output}")
+
+
+if __name__ == '__main__':
+    main()
@@ -5,6 +5,9 @@ import sys
 from pathlib import Path
 import tempfile
 import os
+from dates import DateKeyspace
+from dedup import dedup
+from potfile import known_password, record_password
 
 def check_hashcat():
     """Check if hashcat is installed"""
@@ -50,12 +53,8 @@ def extract_pdf_hash(pdf_file):
         print(f"Error extracting PDF hash: {e}")
         return None
 
-def create_wordlist(pdf_file):
-    """Create a comprehensive wordlist file"""
-    wordlist_file = pdf_file.parent / "wordlist.txt"
-    
-    passwords = set()
-    
+def generate_candidates(pdf_file):
+    """Yield the wordlist candidates, likely ones first (may repeat)"""
     # Common passwords
     common = [
         "", "password", "123456", "password123", "admin", "user", "guest",
@@ -72,31 +71,31 @@ def create_wordlist(pdf_file):
         filename_base.title(), pdf_file.name, pdf_file.name.lower()
     ]
     
-    passwords.update(common + filename_variants)
+    yield from common + filename_variants
     
     # Numeric passwords
     for length in range(1, 9):
         if length <= 6:
             for num in range(10**length):
-                passwords.add(f"{num:0{length}d}")
+                yield f"{num:0{length}d}"
     
     # Years
     for year in range(1950, 2030):
-        passwords.add(str(year))
-        passwords.add(str(year)[-2:])
-    
-    # Date patterns
-    for month in range(1, 13):
-        for day in range(1, 32):
-            passwords.add(f"{month:02d}{day:02d}")
-            passwords.add(f"{day:02d}{month:02d}")
-            for year in [24, 25]:
-                passwords.add(f"{month:02d}{day:02d}{year}")
-                passwords.add(f"{day:02d}{month:02d}{year}")
-    
-    # Write wordlist
+        yield str(year)
+        yield str(year)[-2:]
+    
+    # Every valid date, in the default range and formats
+    dates = DateKeyspace()
+    for candidate in dates.candidates(0, dates.size):
+        yield candidate.decode('latin-1')
+
+def create_wordlist(pdf_file):
+    """Create a comprehensive wordlist file"""
+    wordlist_file = pdf_file.parent / "wordlist.txt"
+    
+    # Stream through the memory-bounded dedup stage instead of a set
     with open(wordlist_file, 'w') as f:
-        for pwd in sorted(passwords):
+        for pwd in dedup(generate_candidates(pdf_file)):
             f.write(pwd + '\n')
     
     return wordlist_file
@@ -187,16 +186,23 @@ def main():
     print(f"📁 Target: {pdf_file}")
     print()
     
+    # A file cracked before needs no hashcat run
+    password = known_password(pdf_file)
+    if password is not None:
+        print(f"🗂️  Password found in potfile: '{password}'")
+    
     # Check for hashcat
-    if check_hashcat():
-        password = crack_with_hashcat(pdf_file)
-        if password:
+    if password is not None or check_hashcat():
+        if password is None:
+            password = crack_with_hashcat(pdf_file)
+        if password is not False:
             # Decrypt the PDF
             try:
                 import pikepdf
                 output_file = pdf_file.with_name(f"{pdf_file.stem}_decrypted.pdf")
                 with pikepdf.open(pdf_file, password=password) as pdf:
                     pdf.save(output_file)
+                record_password(pdf_file, password)
                 print(f"✅ Decrypted PDF saved as: {output_file}")
                 return
             except Exception as e:
@@ -0,0 +1,194 @@
+#!/usr/bin/env python3
+"""Indexable brute-force keyspaces.
+
+A keyspace numbers every candidate from 0 to ``size - 1`` so the parent can
+hand out integer ``(start, end)`` ranges and each worker decodes its own
+candidates locally instead of receiving pickled string lists.
+
+Charset and mask keyspaces also describe which candidates they cover
+(``covers`` and ``position_sets``), so later phases can skip what earlier
+ones already tested without remembering any tested string.
+"""
+
+import itertools
+import math
+
+
+class CharsetKeyspace:
+    """All strings over ``charset`` with lengths ``min_length``..``max_length``.
+
+    Candidates are ordered like ``itertools.product``: shorter lengths
+    first, then lexicographically by position in ``charset``.
+    """
+
+    # Candidates are str, not pre-encoded bytes
+    encoded = False
+
+    def __init__(self, charset, min_length, max_length):
+        self.charset = charset
+        self.min_length = min_length
+        self.max_length = max_length
+        self.base = len(charset)
+        self._charset_set = frozenset(charset)
+        self._codes = frozenset(map(ord, charset))
+        # Offset of the first candidate of each length
+        self._length_starts = []
+        total = 0
+        for length in range(min_length, max_length + 1):
+            self._length_starts.append((length, total))
+            total += self.base ** length
+        self.size = total
+
+    def __repr__(self):
+        return (f"CharsetKeyspace({self.charset!r}, {self.min_length}, "
+                f"{self.max_length})")
+
+    def ranges(self, chunk_size, start=0, end=None):
+        """Yield ``(start, end)`` index ranges covering ``[start, end)``."""
+        end = self.size if end is None else end
+        for lo in range(start, end, chunk_size):
+            yield lo, min(lo + chunk_size, end)
+
+    def covers(self, word):
+        """Return True if ``word`` (str or latin-1 bytes) is a candidate of this keyspace."""
+        if isinstance(word, bytes):
+            word = word.decode('latin-1')
+        return self.min_length <= len(word) <= self.max_length and self._charset_set.issuperset(word)
+
+    def position_sets(self, length):
+        """Per-position sets of character codes for one length, or None if out of range."""
+        if not self.min_length <= length <= self.max_length:
+            return None
+        return [self._codes] * length
+
+    def _segments(self, start, end):
+        """Split a global index range into per-length ``(length, lo, hi)``."""
+        for length, first in self._length_starts:
+            last = first + self.base ** length
+            lo, hi = max(start, first), min(end, last)
+            if lo < hi:
+                yield length, lo - first, hi - first
+
+    def _word(self, index, length):
+        """Decode one index within a fixed length into a string."""
+        chars = []
+        for _ in range(length):
+            index, digit = divmod(index, self.base)
+            chars.append(self.charset[digit])
+        return ''.join(reversed(chars))
+
+    def candidate(self, index):
+        """Return the candidate at a global index."""
+        for length, lo, _ in self._segments(index, index + 1):
+            return self._word(lo, length)
+        raise IndexError(index)
+
+    def candidates(self, start, end):
+        """Yield the candidates with global indices in ``[start, end)``.
+
+        Only the prefix is decoded with divmod; the last position is walked
+        directly over the charset, so the per-candidate cost is one concat.
+        """
+        charset, base = self.charset, self.base
+        for length, lo, hi in self._segments(start, end):
+            if length == 0:
+                yield ''
+                continue
+            pos = lo
+            while pos < hi:
+                prefix_index, last = divmod(pos, base)
+                prefix = self._word(prefix_index, length - 1)
+                stop = min(base, last + hi - pos)
+                for char in charset[last:stop]:
+                    yield prefix + char
+                pos += stop - last
+
+
+def overlap_size(keyspace, earlier):
+    """Count the candidates of ``keyspace`` that any ``earlier`` keyspace covers.
+
+    Exact, by inclusion-exclusion over the per-position charset
+    intersections; keyspaces without ``position_sets`` are ignored.
+    """
+    earlier = [k for k in earlier if hasattr(k, 'position_sets')]
+    total = 0
+    for length in range(keyspace.min_length, keyspace.max_length + 1):
+        base = keyspace.position_sets(length)
+        for r in range(1, len(earlier) + 1):
+            for group in itertools.combinations(earlier, r):
+                sets = base
+                for other in group:
+                    other_sets = other.position_sets(length)
+                    if other_sets is None:
+                        break
+                    sets = [a & b for a, b in zip(sets, other_sets)]
+                else:
+                    total += (-1) ** (r + 1) * math.prod(len(s) for s in sets)
+    return total
+
+
+def covering(keyspace, earlier):
+    """The ``earlier`` keyspaces that may cover some candidate of ``keyspace``.
+
+    Exact for keyspaces with ``position_sets``; otherwise any earlier
+    keyspace whose lengths meet ``keyspace``'s is kept, to be safe. Only
+    these need an ``ExcludingKeyspace`` filter pass.
+    """
+    found = []
+    for other in earlier:
+        if not hasattr(other, 'covers'):
+            continue
+        if hasattr(keyspace, 'position_sets'):
+            if overlap_size(keyspace, [other]):
+                found.append(other)
+        elif (getattr(keyspace, 'min_length', 0) <= other.max_length
+                and other.min_length <= getattr(keyspace, 'max_length', math.inf)):
+            found.append(other)
+    return found
+
+
+class ExcludingKeyspace:
+    """A keyspace minus the candidates that earlier phases already covered.
+
+    Indices, ranges and ``repr`` are those of the base keyspace, so
+    checkpoints are unaffected; covered candidates are dropped in
+    ``candidates``, inside the workers, with a per-candidate membership
+    test instead of a set of tested strings.
+    """
+
+    def __init__(self, base, earlier):
+        self.base = base
+        self.earlier = tuple(k for k in earlier if hasattr(k, 'covers'))
+        self.encoded = base.encoded
+        self.size = base.size
+
+    def __repr__(self):
+        return repr(self.base)
+
+    def __getattr__(self, name):
+        # min_length, max_length, covers, position_sets... come from the base
+        if name == 'base':
+            raise AttributeError(name)
+        return getattr(self.base, name)
+
+    def ranges(self, chunk_size, start=0, end=None):
+        return self.base.ranges(chunk_size, start, end)
+
+    def candidates(self, start, end):
+        """Yield the base candidates in ``[start, end)`` no earlier phase covers."""
+        earlier = self.earlier
+        for word in self.base.candidates(start, end):
+            if not any(k.covers(word) for k in earlier):
+                yield word
+
+    def remaining(self):
+        """Number of candidates left after exclusion, if it can be computed."""
+        if not hasattr(self.base, 'position_sets'):
+            return None
+        return self.size - overlap_size(self.base, self.earlier)
+
+
+def skip_covered(candidates, earlier):
+    """Filter a candidate list against keyspaces tested in earlier phases."""
+    earlier = [k for k in earlier if hasattr(k, 'covers')]
+    return [word for word in candidates if not any(k.covers(word) for k in earlier)]
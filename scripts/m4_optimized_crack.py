@@ -2,36 +2,28 @@
 
 import pikepdf
 import sys
-import itertools
+import argparse
 import multiprocessing as mp
 from pathlib import Path
 import time
-from concurrent.futures import ProcessPoolExecutor, as_completed
-import hashlib
-
-def try_password_batch(args):
-    """Try a batch of passwords - designed for multiprocessing"""
-    pdf_path, passwords, batch_id = args
-    
-    for i, password in enumerate(passwords):
-        try:
-            with pikepdf.open(pdf_path, password=password):
-                return (True, password, batch_id, i)
-        except (pikepdf.PasswordError, pikepdf.PdfError):
-            continue
-        except Exception:
-            continue
-    
-    return (False, None, batch_id, len(passwords))
-
-def generate_password_batches(passwords, batch_size=1000):
-    """Split passwords into batches for parallel processing"""
-    for i in range(0, len(passwords), batch_size):
-        yield passwords[i:i + batch_size]
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import nullcontext
+from pdf_security import PasswordVerifier, UnsupportedEncryptionError
+from crack_worker import init_worker, try_password_batch, try_keyspace_range
+from crack_runner import calibrated_chunk_size, keyspace_tasks, list_tasks, run_tasks
+from potfile import record_password, try_known_passwords
+from checkpoint import CheckpointError, default_checkpoint_path, open_checkpoint
+from dates import add_date_arguments, date_keyspace_from_args, quick_date_keyspace
+from metrics import add_metrics_arguments, metrics_from_args
+from profiling import RunProfiler, add_profile_arguments
+from rules import Rule, RuleError, RuledKeyspace, apply_rules, load_rules
+from wordlist import WordlistKeyspace
 
 def generate_comprehensive_wordlist(pdf_file):
     """Generate a comprehensive password list optimized for common PDF passwords"""
-    passwords = set()
+    # Insertion-ordered set: likely passwords first, and the same order on
+    # every run so checkpoints can refer to list positions
+    passwords = {}
     
     # Common passwords
     common = [
@@ -49,125 +41,203 @@ def generate_comprehensive_wordlist(pdf_file):
         filename_base.title(), pdf_file.name, pdf_file.name.lower()
     ]
     
-    passwords.update(common + filename_variants)
+    passwords.update(dict.fromkeys(common + filename_variants))
     
     # Numeric passwords (optimized ranges)
     for length in range(1, 9):
         if length <= 4:
             # For short numbers, try all combinations
             for num in range(10**length):
-                passwords.add(f"{num:0{length}d}")
+                passwords[f"{num:0{length}d}"] = None
         else:
             # For longer numbers, try common patterns
             patterns = ["0", "1", "2", "9"]
             for pattern in patterns:
-                passwords.add(pattern * length)
+                passwords[pattern * length] = None
     
     # Years and dates
     current_year = 2025
     for year in range(1950, current_year + 10):
-        passwords.add(str(year))
-        passwords.add(str(year)[-2:])  # Two-digit year
-    
-    # Common date patterns
-    for month in range(1, 13):
-        for day in range(1, 32):
-            passwords.add(f"{month:02d}{day:02d}")
-            passwords.add(f"{day:02d}{month:02d}")
-            passwords.add(f"{month:02d}{day:02d}{current_year}")
-            passwords.add(f"{day:02d}{month:02d}{current_year}")
-            passwords.add(f"{month:02d}{day:02d}{str(current_year)[-2:]}")
-            passwords.add(f"{day:02d}{month:02d}{str(current_year)[-2:]}")
+        passwords[str(year)] = None
+        passwords[str(year)[-2:]] = None  # Two-digit year
     
     # Common keyboard patterns
     keyboard_patterns = [
         "qwerty", "asdf", "zxcv", "123qwe", "qwe123", "asd123",
         "qwerty123", "123456789", "987654321", "abcdef", "fedcba"
     ]
-    passwords.update(keyboard_patterns)
+    passwords.update(dict.fromkeys(keyboard_patterns))
     
     # Simple variations with common suffixes/prefixes
     base_words = ["password", "admin", "user", "test", "demo", "police"]
-    variations = ["123", "1", "!", "@", "#", "2024", "2025"]
-    
     for word in base_words:
-        for var in variations:
-            passwords.add(word + var)
-            passwords.add(var + word)
-            passwords.add(word.capitalize() + var)
+        passwords.update(dict.fromkeys(apply_rules(word, VARIATION_RULES)))
     
     return list(passwords)
 
+def affix_rules(affixes):
+    """Rules that append, prepend, and capitalize + append each affix"""
+    rules = []
+    for affix in affixes:
+        append = ''.join(f"${char}" for char in affix)
+        rules.append(Rule(append))
+        rules.append(Rule(''.join(f"^{char}" for char in reversed(affix))))
+        rules.append(Rule('c' + append))
+    return rules
+
+VARIATION_RULES = affix_rules(["123", "1", "!", "@", "#", "2024", "2025"])
+
 def main():
-    if len(sys.argv) != 2:
-        print("Usage: python m4_optimized_crack.py <pdf_file>")
-        sys.exit(1)
+    parser = argparse.ArgumentParser(description='Multi-core PDF wordlist attack')
+    parser.add_argument('pdf_file', help='Target PDF file')
+    parser.add_argument('--wordlist', help='External wordlist tried after the generated one (memory-mapped, any size)')
+    parser.add_argument('--rules', help='Hashcat/John rule file applied to every --wordlist word inside the workers')
+    add_date_arguments(parser, flag_help='Date range tried after the generated list')
+    parser.add_argument('--checkpoint', help='Checkpoint file (default: <pdf_stem>.checkpoint.json next to the PDF)')
+    parser.add_argument('--resume', action='store_true', help='Continue from the checkpoint file')
+    add_metrics_arguments(parser)
+    add_profile_arguments(parser)
+    args = parser.parse_args()
     
-    pdf_file = Path(sys.argv[1])
+    pdf_file = Path(args.pdf_file)
     if not pdf_file.exists():
         print(f"Error: {pdf_file} does not exist")
         sys.exit(1)
+    if args.wordlist and not Path(args.wordlist).is_file():
+        print(f"Error: {args.wordlist} does not exist")
+        sys.exit(1)
+    if args.rules and not args.wordlist:
+        parser.error('--rules needs --wordlist')
+    try:
+        rules = load_rules(args.rules) if args.rules else None
+    except (RuleError, OSError) as e:
+        print(f"Error: {e}")
+        sys.exit(1)
+    # Without --dates only recent separator-free dates are tried
+    try:
+        dates = date_keyspace_from_args(args) if args.dates else quick_date_keyspace()
+    except ValueError as e:
+        parser.error(str(e))
+    
+    try:
+        verifier = PasswordVerifier.from_file(pdf_file)
+        params = verifier.params
+    except (UnsupportedEncryptionError, ValueError) as e:
+        print(f"Error: {e}")
+        sys.exit(1)
+    
+    # Already cracked, or opened by a password recovered from another file
+    password = try_known_passwords(verifier)
+    if password is not None:
+        print(f"🗂️  Password found in potfile: '{password}'")
+        decrypt_pdf(pdf_file, password)
+        return
+    
+    checkpoint_path = Path(args.checkpoint) if args.checkpoint else default_checkpoint_path(pdf_file)
+    try:
+        checkpoint = open_checkpoint(checkpoint_path, params.fingerprint(), args.resume)
+    except (CheckpointError, ValueError, OSError) as e:
+        print(f"Error: {e}")
+        sys.exit(1)
     
     # Use all available CPU cores (M4 Pro has 10-12 cores)
     num_processes = mp.cpu_count()
     print(f"🚀 M4 Pro Optimized PDF Password Cracker")
-    print(f"📁 Target: {pdf_file}")
+    print(f"📁 Target: {pdf_file} (R{params.r}, {params.cipher})")
     print(f"⚡ Using {num_processes} CPU cores for parallel processing")
     
+    profiler = RunProfiler(args.profile)
+    
     # Generate comprehensive password list
     print("📝 Generating password wordlist...")
     passwords = generate_comprehensive_wordlist(pdf_file)
     print(f"📊 Generated {len(passwords):,} passwords to test")
     
-    # Split into batches for parallel processing
-    batch_size = max(100, len(passwords) // (num_processes * 4))
-    batches = list(generate_password_batches(passwords, batch_size))
-    print(f"🔄 Split into {len(batches)} batches of ~{batch_size} passwords each")
+    # Split into batches for parallel processing; slow revisions get smaller
+    # batches so checkpoints and progress stay fine-grained
+    batch_size = max(100, min(len(passwords) // (num_processes * 4), calibrated_chunk_size(verifier)))
+    print(f"🔄 Split into batches of ~{batch_size} passwords each")
+    
+    # The generated list first, then the dates, then the external wordlist
+    # if one was given
+    strategies = [(f"comprehensive-wordlist:{len(passwords)}", None)]
+    print(f"📅 Dates: {dates.first} to {dates.last} ({dates.size:,} candidates, streamed)")
+    strategies.append((repr(dates), dates))
+    if args.wordlist:
+        wordlist = WordlistKeyspace(args.wordlist)
+        print(f"📖 External wordlist: {args.wordlist} ({wordlist.size / 1e6:,.1f} MB)")
+        if rules:
+            # Each worker expands its own base words; nothing is materialized
+            wordlist = RuledKeyspace(wordlist, rules)
+            print(f"📜 Rules: {args.rules} ({len(rules)} rules)")
+        strategies.append((repr(wordlist), wordlist))
+    keyspaces = tuple(keyspace for _, keyspace in strategies if keyspace is not None)
     
     start_time = time.time()
-    passwords_tested = 0
-    
-    # Process batches in parallel
-    with ProcessPoolExecutor(max_workers=num_processes) as executor:
-        # Submit all batches
-        future_to_batch = {
-            executor.submit(try_password_batch, (pdf_file, batch, i)): i 
-            for i, batch in enumerate(batches)
-        }
-        
+    password, passwords_tested = None, 0
+    # Shared flag checked by workers between candidates
+    stop_event = mp.Event()
+    metrics = metrics_from_args(args, pdf_file)
+    initializer, initargs = profiler.pool(init_worker, (pdf_file, params, stop_event, keyspaces))
+    
+    # Process batches in parallel, keeping every core busy with some headroom
+    with profiler, ProcessPoolExecutor(max_workers=num_processes, initializer=initializer,
+                                       initargs=initargs) as executor, \
+            (metrics or nullcontext()):
         try:
-            for future in as_completed(future_to_batch):
-                success, password, batch_id, tested_count = future.result()
-                passwords_tested += tested_count
+            for strategy, keyspace in strategies:
+                if checkpoint.is_complete(strategy):
+                    continue
+                already_tested = checkpoint.tested(strategy)
+                if already_tested:
+                    print(f"⏩ Resuming: {already_tested:,} passwords already tested")
                 
-                # Show progress
-                progress = (passwords_tested / len(passwords)) * 100
-                elapsed = time.time() - start_time
-                rate = passwords_tested / elapsed if elapsed > 0 else 0
+                if keyspace is None:
+                    worker_fn, total = try_password_batch, len(passwords)
+                    tasks = list_tasks(passwords, batch_size, checkpoint, strategy)
+                else:
+                    if keyspace is dates:
+                        print(f"\n📅 Trying dates...")
+                        total = keyspace.size
+                    else:
+                        # Workers split line-aligned byte ranges of the mapped file themselves
+                        print(f"\n📖 Trying external wordlist...")
+                        total = None
+                    worker_fn = try_keyspace_range
+                    tasks = keyspace_tasks(keyspaces.index(keyspace), keyspace,
+                                           calibrated_chunk_size(verifier), checkpoint, strategy)
                 
-                print(f"🔍 Progress: {progress:5.1f}% | "
-                      f"Tested: {passwords_tested:,}/{len(passwords):,} | "
-                      f"Rate: {rate:,.0f} pwd/sec", end="\r")
-                
-                if success:
-                    elapsed = time.time() - start_time
-                    print(f"\n🎉 SUCCESS! Password found: '{password}'")
-                    print(f"⏱️  Time taken: {elapsed:.2f} seconds")
-                    print(f"📈 Tested {passwords_tested:,} passwords at {rate:,.0f} pwd/sec")
-                    
-                    # Decrypt and save
-                    decrypt_pdf(pdf_file, password)
-                    return
-                    
+                password, tested = run_tasks(
+                    executor, worker_fn, tasks, num_processes * 2, total,
+                    checkpoint, strategy, already_tested, metrics=metrics,
+                    size=keyspace.size if keyspace is not None else None)
+                passwords_tested += tested
+                if password is not None:
+                    break
+                checkpoint.mark_complete(strategy)
         except KeyboardInterrupt:
+            stop_event.set()
+            checkpoint.save()
             print(f"\n⏹️  Interrupted by user")
-            print(f"📊 Tested {passwords_tested:,} passwords in {time.time() - start_time:.2f} seconds")
+            print(f"📊 Tested {sum(checkpoint.tested(name) for name, _ in strategies):,} passwords in {time.time() - start_time:.2f} seconds")
+            print(f"💾 Progress saved to {checkpoint.path}; continue with --resume")
             return
     
     elapsed = time.time() - start_time
-    print(f"\n❌ Password not found after testing {len(passwords):,} passwords")
+    if password is not None:
+        rate = passwords_tested / elapsed if elapsed > 0 else 0
+        print(f"\n🎉 SUCCESS! Password found: '{password}'")
+        print(f"⏱️  Time taken: {elapsed:.2f} seconds")
+        print(f"📈 Tested {passwords_tested:,} passwords at {rate:,.0f} pwd/sec")
+        checkpoint.remove()
+        
+        # Decrypt and save
+        decrypt_pdf(pdf_file, password)
+        return
+    
+    print(f"\n❌ Password not found after testing {passwords_tested:,} passwords")
     print(f"⏱️  Total time: {elapsed:.2f} seconds")
-    print(f"📈 Average rate: {len(passwords)/elapsed:,.0f} passwords/second")
+    print(f"📈 Average rate: {passwords_tested/elapsed:,.0f} passwords/second")
     print("\n💡 Next steps:")
     print("1. Try a larger custom wordlist")
     print("2. Use specialized tools like Hashcat or John the Ripper")
@@ -182,6 +252,7 @@ def decrypt_pdf(pdf_file, password):
         with pikepdf.open(pdf_file, password=password) as pdf:
             # Remove all encryption
             pdf.save(output_file)
+        record_password(pdf_file, password)
         
         print(f"✅ Decrypted PDF saved as: {output_file}")
         
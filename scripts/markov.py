@@ -0,0 +1,393 @@
+#!/usr/bin/env python3
+"""Probability-ordered mask and charset keyspaces (OMEN-style levels).
+
+A first-order Markov model is trained on a corpus of real passwords - by
+default the potfile of passwords recovered so far - counting the first
+character, every character pair and the lengths. Each choice a candidate
+makes is then given a *level*, the rounded-down ``-log2`` of its smoothed
+probability (0 is most likely, capped at ``MAX_LEVEL``):
+
+    length      p(length), over the keyspace's lengths
+    first char  p(c0), over the first position's charset
+    next chars  p(ci | ci-1), over position i's charset
+
+A candidate's level is the sum, and ``MarkovKeyspace`` enumerates the base
+keyspace level by level, most likely first. Every candidate has exactly
+one length and one level, so the ordered keyspace is a permutation of the
+base: same size, same ``covers``, every candidate once.
+
+Indices stay random-access, so ranges, workers and checkpoints work as for
+any keyspace. Per length, a table counts the ways to complete a prefix
+with a given remaining level; a start index is found by subtracting those
+counts position by position, and the walk then continues depth-first,
+trying characters in level order and skipping any branch with no
+completion of the required level.
+
+Usage:
+    python markov.py [CORPUS] --mask MASK [-1 CHARSET] [--increment] [--show N] [--rank WORD ...]
+"""
+
+import argparse
+import bisect
+import hashlib
+import sys
+from pathlib import Path
+
+import numpy as np
+
+from mask import MaskError, add_mask_arguments, mask_keyspace_from_args
+from potfile import Potfile, potfile_path
+
+MAX_LEVEL = 10
+# Additive smoothing, so characters the corpus never used still get a level
+ALPHA = 1.0
+# Row of the transition counts that holds the first characters
+START = 256
+_READ_BYTES = 1 << 24
+
+
+class MarkovModel:
+    """Character transition and length counts of a password corpus."""
+
+    def __init__(self, source=None):
+        self.source = source
+        self.passwords = 0
+        self.transitions = np.zeros((START + 1, 256), dtype=np.int64)
+        self.lengths = np.zeros(0, dtype=np.int64)
+
+    def __repr__(self):
+        return f"MarkovModel({self.source!r}, {self.passwords} passwords)"
+
+    @classmethod
+    def from_passwords(cls, passwords, source=None):
+        """Train on an iterable of passwords (str as latin-1, or bytes)."""
+        model = cls(source)
+        lines = [p.encode('latin-1', errors='ignore') if isinstance(p, str) else p for p in passwords]
+        model.add_lines(b'\n'.join(lines))
+        return model
+
+    @classmethod
+    def from_file(cls, path):
+        """Train on a wordlist, one password per line, read in chunks."""
+        model = cls(str(path))
+        with open(path, 'rb') as f:
+            tail = b''
+            while True:
+                data = f.read(_READ_BYTES)
+                if not data:
+                    break
+                data = tail + data
+                # Train on whole lines only; carry the partial last one over
+                cut = max(data.rfind(b'\n'), data.rfind(b'\r')) + 1
+                model.add_lines(data[:cut])
+                tail = data[cut:]
+            model.add_lines(tail)
+        return model
+
+    @classmethod
+    def from_potfile(cls, path=None):
+        """Train on the passwords recovered so far (one per target)."""
+        potfile = Potfile(path)
+        return cls.from_passwords(potfile.entries.values(), source=str(potfile.path))
+
+    def add_lines(self, data):
+        """Count the non-empty lines of a newline-separated buffer."""
+        buf = np.frombuffer(data, dtype=np.uint8)
+        if not len(buf):
+            return
+        separator = (buf == 0x0A) | (buf == 0x0D)
+        # Previous byte of each byte, or START at the beginning of a line
+        previous = np.empty(len(buf), dtype=np.int64)
+        previous[0] = START
+        previous[1:] = np.where(separator[:-1], START, buf[:-1])
+        keep = ~separator
+        pairs = previous[keep] * 256 + buf[keep]
+        self.transitions += np.bincount(pairs, minlength=(START + 1) * 256).reshape(START + 1, 256)
+
+        bounds = np.concatenate(([-1], np.flatnonzero(separator), [len(buf)]))
+        lengths = np.diff(bounds) - 1
+        lengths = lengths[lengths > 0]
+        self.passwords += len(lengths)
+        counts = np.bincount(lengths)
+        if len(counts) > len(self.lengths):
+            counts[:len(self.lengths)] += self.lengths
+            self.lengths = counts
+        else:
+            self.lengths[:len(counts)] += counts
+
+    def digest(self):
+        """Short hash of the counts; part of an ordered keyspace's checkpoint key."""
+        h = hashlib.sha256(self.transitions.tobytes())
+        h.update(self.lengths.tobytes())
+        return h.hexdigest()[:12]
+
+    def transition_levels(self, previous, charset):
+        """Level of each character of ``charset`` after each of ``previous``.
+
+        ``previous`` is the preceding position's charset, or None for the
+        first position. Returns an int array of shape ``(len(previous) or
+        1, len(charset))``; probabilities are normalized over ``charset``.
+        """
+        rows = [START] if previous is None else list(previous)
+        counts = self.transitions[np.ix_(rows, list(charset))]
+        p = (counts + ALPHA) / (counts.sum(axis=1, keepdims=True) + ALPHA * len(charset))
+        return _levels(p)
+
+    def length_levels(self, min_length, max_length):
+        """``{length: level}`` for the lengths of a keyspace."""
+        counts = np.zeros(max_length + 1, dtype=np.int64)
+        known = self.lengths[:max_length + 1]
+        counts[:len(known)] = known
+        counts = counts[min_length:]
+        p = (counts + ALPHA) / (counts.sum() + ALPHA * len(counts))
+        return dict(zip(range(min_length, max_length + 1), _levels(p).tolist()))
+
+
+def _levels(p):
+    return np.minimum(MAX_LEVEL, np.floor(-np.log2(p))).astype(np.int64)
+
+
+class MarkovKeyspace:
+    """A mask or charset keyspace enumerated in descending probability.
+
+    Indices are ordered by total level, then length, then depth-first by
+    character level. ``candidates`` yields encoded ``bytes``; ``covers``,
+    ``position_sets`` and the lengths come from the base keyspace.
+    """
+
+    encoded = True
+
+    def __init__(self, base, model):
+        self.base = base
+        self.model = model
+        self.size = base.size
+        self.digest = model.digest()
+        if hasattr(base, 'positions'):
+            self.positions = list(base.positions)
+        else:
+            self.positions = [base.charset.encode('latin-1')] * base.max_length
+        # Exact counts need Python ints beyond int64
+        self._dtype = np.int64 if base.size < 1 << 62 else object
+        self._tables = None
+
+    def __repr__(self):
+        return f"MarkovKeyspace({self.base!r}, model {self.digest})"
+
+    def __getstate__(self):
+        # Workers rebuild the tables instead of receiving them
+        state = self.__dict__.copy()
+        state['_tables'] = None
+        return state
+
+    def __getattr__(self, name):
+        # min_length, max_length, covers, position_sets... come from the base
+        if name == 'base':
+            raise AttributeError(name)
+        return getattr(self.base, name)
+
+    def _build(self):
+        """Level tables, completion counts and the (level, length) segments."""
+        if self._tables is not None:
+            return self._tables
+        positions = self.positions
+        levels, order, last = [], [], []
+        for i, charset in enumerate(positions):
+            table = self.model.transition_levels(positions[i - 1] if i else None, charset)
+            levels.append(table)
+            chars = [bytes((c,)) for c in charset]
+            ranked = np.argsort(table, axis=1, kind='stable')
+            # Per previous character: (index, level, char) in level order ...
+            order.append([[(int(b), int(row[b]), chars[b]) for b in rank]
+                          for row, rank in zip(table, ranked)])
+            # ... and the characters of each level, for the last position
+            by_level = []
+            for row, rank in zip(table, ranked):
+                groups = {}
+                for b in rank:
+                    groups.setdefault(int(row[b]), []).append(chars[b])
+                by_level.append(groups)
+            last.append(by_level)
+
+        # counts[length][i][a][r]: ways to fill positions i.. of a candidate
+        # of this length, after character a at i - 1, with total level r
+        counts = {}
+        cache = {}
+        for length in range(self.base.min_length, self.base.max_length + 1):
+            rows = [np.ones((len(positions[length - 1]) if length else 1, 1), dtype=self._dtype)]
+            for i in range(length - 1, -1, -1):
+                key = (positions[i - 1] if i else None,) + tuple(positions[i:length])
+                if key not in cache:
+                    cache[key] = _completions(levels[i], rows[0])
+                rows.insert(0, cache[key])
+            counts[length] = [table.tolist() for table in rows]
+
+        segments = []
+        length_levels = self.model.length_levels(self.base.min_length, self.base.max_length)
+        # A length level plus one level per position
+        for total in range(MAX_LEVEL * (self.base.max_length + 1) + 1):
+            for length, length_level in length_levels.items():
+                start_row = counts[length][0][0]
+                level = total - length_level
+                if 0 <= level < len(start_row) and start_row[level]:
+                    segments.append((length, level, start_row[level]))
+        starts = [0]
+        for _, _, count in segments:
+            starts.append(starts[-1] + count)
+        if starts[-1] != self.size:
+            raise AssertionError(f"ordered keyspace covers {starts[-1]} of {self.size} candidates")
+        self._tables = (order, last, counts, segments, starts)
+        return self._tables
+
+    def ranges(self, chunk_size, start=0, end=None):
+        """Yield ``(start, end)`` index ranges covering ``[start, end)``."""
+        end = self.size if end is None else end
+        for lo in range(start, end, chunk_size):
+            yield lo, min(lo + chunk_size, end)
+
+    def _segments(self, start, end):
+        _, _, _, segments, starts = self._build()
+        index = bisect.bisect_right(starts, start) - 1
+        while index < len(segments) and starts[index] < end:
+            length, level, count = segments[index]
+            first = starts[index]
+            yield length, level, max(start, first) - first, min(end, first + count) - first
+            index += 1
+
+    def _walk(self, length, i, previous, remaining, skip, prefix):
+        """Candidates of one length and level, from the ``skip``-th on."""
+        order, last, counts, _, _ = self._tables
+        if length == 0:
+            yield prefix
+            return
+        if i == length - 1:
+            for char in last[i][previous].get(remaining, ())[skip:]:
+                yield prefix + char
+            return
+        following = counts[length][i + 1]
+        for b, level, char in order[i][previous]:
+            if level > remaining:
+                break
+            row = following[b]
+            rest = remaining - level
+            count = row[rest] if rest < len(row) else 0
+            if count <= skip:
+                skip -= count
+                continue
+            yield from self._walk(length, i + 1, b, rest, skip, prefix + char)
+            skip = 0
+
+    def candidates(self, start, end):
+        """Yield the encoded candidates with global indices in ``[start, end)``."""
+        for length, level, lo, hi in self._segments(start, end):
+            walk = self._walk(length, 0, 0, level, lo, b'')
+            for _ in range(hi - lo):
+                yield next(walk)
+
+    def candidate(self, index):
+        """Return the encoded candidate at a global index."""
+        return next(self.candidates(index, index + 1))
+
+    def index(self, word):
+        """Return the global index of a candidate (bytes or latin-1 str)."""
+        if isinstance(word, str):
+            word = word.encode('latin-1')
+        if not self.covers(word):
+            raise ValueError(f"{word!r} is not a candidate of {self!r}")
+        order, _, counts, segments, starts = self._build()
+        length = len(word)
+        levels = []
+        previous = 0
+        for i, byte in enumerate(word):
+            b = self.positions[i].index(byte)
+            levels.append(next(level for index, level, _ in order[i][previous] if index == b))
+            previous = b
+        remaining = sum(levels)
+        position = next(starts[n] for n, segment in enumerate(segments) if segment[:2] == (length, remaining))
+
+        previous = 0
+        for i, byte in enumerate(word):
+            b = self.positions[i].index(byte)
+            following = counts[length][i + 1]
+            # Candidates sharing the prefix but with an earlier character here
+            for index, level, _ in order[i][previous]:
+                if index == b:
+                    break
+                rest = remaining - level
+                if 0 <= rest < len(following[index]):
+                    position += following[index][rest]
+            remaining -= levels[i]
+            previous = b
+        return position
+
+
+def _completions(levels, following):
+    """Completion counts one position earlier.
+
+    ``levels[a, b]`` is the level of character b after a; ``following[b, r]``
+    counts the completions after b with level r. Returns ``out[a, r]``.
+    """
+    width = following.shape[1]
+    out = np.zeros((levels.shape[0], width + MAX_LEVEL), dtype=following.dtype)
+    for a, row in enumerate(levels):
+        for level in np.unique(row):
+            out[a, level:level + width] += following[row == level].sum(axis=0)
+    return out
+
+
+def load_model(corpus=None):
+    """Train on a wordlist file, or on the potfile when ``corpus`` is None or one."""
+    if corpus is None or Path(corpus).suffix == '.potfile':
+        return MarkovModel.from_potfile(corpus)
+    return MarkovModel.from_file(corpus)
+
+
+def add_markov_arguments(parser):
+    """Add the --markov option to an argparse parser."""
+    parser.add_argument('--markov', nargs='?', const='', metavar='CORPUS',
+                        help='Try mask/brute-force candidates most likely first, trained on CORPUS '
+                             f'(a wordlist; default: the potfile, {potfile_path()})')
+
+
+def markov_model_from_args(args):
+    """Train the model requested by add_markov_arguments, or None."""
+    if args.markov is None:
+        return None
+    return load_model(args.markov or None)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Preview a probability-ordered mask keyspace')
+    parser.add_argument('corpus', nargs='?', help='Training wordlist (default: the potfile)')
+    add_mask_arguments(parser)
+    parser.add_argument('--show', type=int, default=10, help='Print the first N candidates (default: 10)')
+    parser.add_argument('--rank', nargs='+', metavar='WORD',
+                        help='Print the position of these candidates, ordered and unordered')
+    args = parser.parse_args()
+    if not args.mask:
+        parser.error('--mask is required')
+
+    try:
+        model = load_model(args.corpus)
+        base = mask_keyspace_from_args(args)
+    except (MaskError, OSError) as e:
+        parser.error(str(e))
+    keyspace = MarkovKeyspace(base, model)
+    print(f"🧠 Trained on {model.passwords:,} passwords from {model.source}", file=sys.stderr)
+    print(f"📊 {keyspace!r}: {keyspace.size:,} candidates", file=sys.stderr)
+
+    if args.rank:
+        for word in args.rank:
+            try:
+                ordered = keyspace.index(word)
+            except ValueError as e:
+                print(f"❌ {e}")
+                continue
+            print(f"{word}: #{ordered + 1:,} ({(ordered + 1) / keyspace.size:.2%} of the keyspace), "
+                  f"#{base.index(word) + 1:,} unordered")
+        return
+    for candidate in keyspace.candidates(0, min(args.show, keyspace.size)):
+        print(candidate.decode('latin-1'))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,254 @@
+#!/usr/bin/env python3
+"""Hashcat-style mask keyspaces with vectorized candidate decoding.
+
+A mask is a sequence of positions, each either a literal character or a
+placeholder for a charset:
+
+    ?l  abcdefghijklmnopqrstuvwxyz      ?u  ABCDEFGHIJKLMNOPQRSTUVWXYZ
+    ?d  0123456789                      ?s  space and ASCII punctuation
+    ?h  0123456789abcdef                ?H  0123456789ABCDEF
+    ?a  ?l?u?d?s                        ?b  every byte 0x00-0xff
+    ?1 .. ?4  custom charsets           ??  a literal '?'
+
+Examples: ``Police?d?d?d?d`` or, with ``-1 0123 -2 01``,
+``?1?d?2?d19?d?d`` for DDMM19YY-style dates.
+
+Indices are decoded into fixed-width byte candidates in bulk with NumPy
+mixed-radix arithmetic, so no per-candidate Python strings are built.
+
+Usage:
+    python mask.py --mask MASK [-1 CHARSET] [--increment] [--show N]
+"""
+
+import argparse
+import string
+
+import numpy as np
+
+BUILTIN_CHARSETS = {
+    'l': string.ascii_lowercase,
+    'u': string.ascii_uppercase,
+    'd': string.digits,
+    'h': string.digits + 'abcdef',
+    'H': string.digits + 'ABCDEF',
+    's': ' ' + string.punctuation,
+    'a': string.ascii_lowercase + string.ascii_uppercase + string.digits + ' ' + string.punctuation,
+}
+
+
+class MaskError(ValueError):
+    """Raised for malformed masks or custom charsets."""
+
+
+def _to_bytes(text):
+    return text.encode('latin-1') if isinstance(text, str) else bytes(text)
+
+
+def expand_charset(spec, custom=None):
+    """Expand a charset spec such as ``?l?d_`` into its unique bytes."""
+    spec = _to_bytes(spec)
+    custom = custom or {}
+    out = bytearray()
+    i = 0
+    while i < len(spec):
+        c = spec[i:i + 1]
+        if c == b'?':
+            if i + 1 >= len(spec):
+                raise MaskError(f"Dangling '?' in {spec!r}")
+            key = chr(spec[i + 1])
+            if key == '?':
+                out += b'?'
+            elif key == 'b':
+                out += bytes(range(256))
+            elif key in BUILTIN_CHARSETS:
+                out += BUILTIN_CHARSETS[key].encode('ascii')
+            elif key in custom:
+                out += custom[key]
+            else:
+                raise MaskError(f"Unknown charset '?{key}'")
+            i += 2
+        else:
+            out += c
+            i += 1
+    # Keep first occurrence order, drop duplicates
+    return bytes(dict.fromkeys(out))
+
+
+def parse_mask(mask, custom_charsets=None):
+    """Parse a mask into a list of per-position charsets (bytes)."""
+    custom = {}
+    for key, spec in (custom_charsets or {}).items():
+        custom[str(key)] = expand_charset(spec, custom)
+    mask = _to_bytes(mask)
+    positions = []
+    i = 0
+    while i < len(mask):
+        if mask[i:i + 1] == b'?':
+            positions.append(expand_charset(mask[i:i + 2], custom))
+            i += 2
+        else:
+            positions.append(mask[i:i + 1])
+            i += 1
+    if any(not charset for charset in positions):
+        raise MaskError(f"Mask {mask!r} has an empty position")
+    return positions
+
+
+class MaskKeyspace:
+    """All candidates matching a mask, optionally for incremental lengths.
+
+    Candidates are ordered like ``itertools.product`` over the positions
+    (shorter lengths first with ``increment``). ``candidates`` yields
+    encoded ``bytes`` rather than ``str``.
+    """
+
+    encoded = True
+
+    def __init__(self, mask, custom_charsets=None, increment=False, min_length=1):
+        self.mask = mask
+        self.positions = parse_mask(mask, custom_charsets)
+        max_length = len(self.positions)
+        self.min_length = max(1, min(min_length, max_length)) if increment else max_length
+        self.max_length = max_length
+        self._charsets = [np.frombuffer(charset, dtype=np.uint8) for charset in self.positions]
+        self._radices = [len(charset) for charset in self.positions]
+        self._position_sets = [frozenset(charset) for charset in self.positions]
+        self._length_starts = []
+        total = 0
+        for length in range(self.min_length, self.max_length + 1):
+            self._length_starts.append((length, total))
+            total += self._length_size(length)
+        self.size = total
+
+    def __repr__(self):
+        return f"MaskKeyspace({self.mask!r}, lengths {self.min_length}-{self.max_length})"
+
+    def covers(self, word):
+        """Return True if ``word`` (bytes or latin-1 str) is a candidate of this keyspace."""
+        if isinstance(word, str):
+            try:
+                word = word.encode('latin-1')
+            except UnicodeEncodeError:
+                return False
+        if not self.min_length <= len(word) <= self.max_length:
+            return False
+        return all(byte in allowed for byte, allowed in zip(word, self._position_sets))
+
+    def position_sets(self, length):
+        """Per-position sets of byte values for one length, or None if out of range."""
+        if not self.min_length <= length <= self.max_length:
+            return None
+        return self._position_sets[:length]
+
+    def _length_size(self, length):
+        size = 1
+        for radix in self._radices[:length]:
+            size *= radix
+        return size
+
+    def ranges(self, chunk_size, start=0, end=None):
+        """Yield ``(start, end)`` index ranges covering ``[start, end)``."""
+        end = self.size if end is None else end
+        for lo in range(start, end, chunk_size):
+            yield lo, min(lo + chunk_size, end)
+
+    def _segments(self, start, end):
+        for length, first in self._length_starts:
+            last = first + self._length_size(length)
+            lo, hi = max(start, first), min(end, last)
+            if lo < hi:
+                yield length, lo - first, hi - first
+
+    def decode_block(self, length, offset, count):
+        """Decode ``count`` consecutive candidates of one length.
+
+        Returns a ``(count, length)`` uint8 array. The first index is split
+        into digits with Python ints (so huge keyspaces are fine); the
+        ``arange`` of offsets is then added with vectorized carries from
+        the last position leftwards.
+        """
+        radices = self._radices[:length]
+        start_digits = []
+        for radix in reversed(radices):
+            offset, digit = divmod(offset, radix)
+            start_digits.append(digit)
+        start_digits.reverse()
+
+        out = np.empty((count, length), dtype=np.uint8)
+        carry = np.arange(count, dtype=np.int64)
+        for pos in range(length - 1, -1, -1):
+            if not carry.any():
+                # No more carries: the remaining prefix is constant
+                for fixed in range(pos, -1, -1):
+                    out[:, fixed] = self._charsets[fixed][start_digits[fixed]]
+                break
+            carry, digits = np.divmod(carry + start_digits[pos], radices[pos])
+            out[:, pos] = self._charsets[pos][digits]
+        return out
+
+    def blocks(self, start, end):
+        """Yield ``(length, array)`` blocks for global indices ``[start, end)``."""
+        for length, lo, hi in self._segments(start, end):
+            yield length, self.decode_block(length, lo, hi - lo)
+
+    def candidates(self, start, end):
+        """Yield the encoded candidates with global indices in ``[start, end)``."""
+        for length, block in self.blocks(start, end):
+            data = block.tobytes()
+            for i in range(0, len(data), length):
+                yield data[i:i + length]
+
+    def candidate(self, index):
+        """Return the encoded candidate at a global index."""
+        return next(self.candidates(index, index + 1))
+
+    def index(self, word):
+        """Return the global index of a candidate (bytes or latin-1 str)."""
+        if isinstance(word, str):
+            word = word.encode('latin-1')
+        if not self.covers(word):
+            raise ValueError(f"{word!r} is not a candidate of {self!r}")
+        offset = 0
+        for byte, charset in zip(word, self.positions):
+            offset = offset * len(charset) + charset.index(byte)
+        return dict(self._length_starts)[len(word)] + offset
+
+
+def add_mask_arguments(parser):
+    """Add the common mask options to an argparse parser."""
+    parser.add_argument('--mask', help="Hashcat-style mask, e.g. 'Police?d?d?d?d'")
+    for n in range(1, 5):
+        parser.add_argument(f'-{n}', f'--custom-charset{n}', dest=f'charset{n}',
+                            metavar='CHARSET', help=f'Custom charset for ?{n}')
+    parser.add_argument('--increment', action='store_true',
+                        help='Also try shorter prefixes of the mask')
+    parser.add_argument('--increment-min', type=int, default=1,
+                        help='Minimum length with --increment (default: 1)')
+
+
+def mask_keyspace_from_args(args):
+    """Build a MaskKeyspace from options added by add_mask_arguments."""
+    custom = {str(n): getattr(args, f'charset{n}') for n in range(1, 5)
+              if getattr(args, f'charset{n}')}
+    return MaskKeyspace(args.mask, custom, args.increment, args.increment_min)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Inspect a mask keyspace')
+    add_mask_arguments(parser)
+    parser.add_argument('--show', type=int, default=10, help='Number of candidates to print')
+    args = parser.parse_args()
+    if not args.mask:
+        parser.error('--mask is required')
+
+    try:
+        keyspace = mask_keyspace_from_args(args)
+    except MaskError as e:
+        parser.error(str(e))
+    print(f"{keyspace}: {keyspace.size:,} candidates")
+    for candidate in keyspace.candidates(0, min(args.show, keyspace.size)):
+        print(candidate.decode('latin-1'))
+
+
+if __name__ == '__main__':
+    main()
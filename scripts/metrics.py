@@ -0,0 +1,232 @@
+#!/usr/bin/env python3
+"""Machine-readable progress for long attacks.
+
+The crack loop only updates counters under a lock; a background thread
+turns them into events every ``interval`` seconds, so neither formatting
+nor I/O sits on the hot path however fast the engine is.
+
+Two outputs, either or both:
+
+    JSON lines   one object per event, to a file, ``fd:N`` or ``-`` (stdout)
+    Prometheus   text-format file for the node exporter textfile collector,
+                 rewritten atomically on every tick
+
+Events are ``start``, ``phase`` (a keyspace begins), ``progress`` (periodic),
+``phase_end`` and ``stop`` (with the last phase's result: ``found``,
+``exhausted`` or ``stopped``). Progress events carry the candidates tested,
+the rate over the last interval and since the phase began, the rate of
+each worker process while busy, the ETA when the phase size is known, and
+the keyspace position: every index below it has been tested.
+"""
+
+import json
+import os
+import sys
+import threading
+import time
+from pathlib import Path
+
+DEFAULT_INTERVAL = 5.0
+PROMETHEUS_PREFIX = 'pdf_crack'
+
+
+def open_stream(spec):
+    """Open a JSON-lines destination: a path (appended to), ``fd:N`` or ``-``."""
+    if spec == '-':
+        return sys.stdout
+    if spec.startswith('fd:'):
+        return os.fdopen(int(spec[3:]), 'w', buffering=1, closefd=False)
+    return open(spec, 'a', buffering=1, encoding='utf-8')
+
+
+def _label_value(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+class Metrics:
+    """Progress counters for one target, emitted periodically off the hot path."""
+
+    def __init__(self, target, jsonl=None, prometheus=None, interval=DEFAULT_INTERVAL):
+        self.target = str(target)
+        self.interval = interval
+        self.to_stdout = jsonl == '-'
+        self._stream = open_stream(jsonl) if jsonl else None
+        self._prometheus = Path(prometheus) if prometheus else None
+        self._lock = threading.Lock()
+        # Events come from both the crack loop and the emitter thread
+        self._io_lock = threading.Lock()
+        self._wake = threading.Event()
+        self._thread = None
+        self._phase = None
+        self._last_emit = (time.time(), 0)
+        self._result = None
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            status = self._result or 'done'
+        else:
+            status = 'stopped' if exc_type is KeyboardInterrupt else 'error'
+        self.close(status)
+
+    def start(self):
+        """Emit the start event and begin periodic emission."""
+        self._event({'event': 'start', 'pid': os.getpid()})
+        self._thread = threading.Thread(target=self._run, name='metrics', daemon=True)
+        self._thread.start()
+
+    def close(self, status='done'):
+        """Stop the emitter after a final progress and ``stop`` event."""
+        if self._thread is not None:
+            self._wake.set()
+            self._thread.join()
+            self._thread = None
+        self._tick()
+        self._event({'event': 'stop', 'status': status})
+        if self._stream is not None and self._stream is not sys.stdout:
+            self._stream.close()
+        self._stream = None
+
+    # --- Called by the crack loop -------------------------------------------
+
+    def start_phase(self, phase, total=None, already_tested=0, size=None):
+        """Begin a keyspace; ``total`` in candidates, ``size`` in index units."""
+        with self._lock:
+            self._phase = {
+                'phase': phase, 'total': total, 'size': size or total,
+                'already_tested': already_tested, 'tested': 0, 'position': 0,
+                'started': time.time(), 'workers': {},
+            }
+            self._last_emit = (time.time(), 0)
+        self._event({'event': 'phase', 'phase': phase, 'total': total, 'size': size or total,
+                     'already_tested': already_tested})
+
+    def record(self, tested, position, pid=None, busy_seconds=None):
+        """Count one finished task; ``position`` is the tested low watermark."""
+        with self._lock:
+            phase = self._phase
+            phase['tested'] += tested
+            phase['position'] = max(phase['position'], position)
+            if pid is not None:
+                worker = phase['workers'].setdefault(pid, [0, 0.0])
+                worker[0] += tested
+                worker[1] += busy_seconds
+
+    def end_phase(self, result):
+        """Finish the current keyspace with ``found``, ``exhausted`` or ``stopped``."""
+        snapshot = self._snapshot()
+        if snapshot is None:
+            return
+        snapshot.update(event='phase_end', result=result)
+        with self._lock:
+            self._phase = None
+            self._result = result
+        self._event(snapshot)
+        self._write_prometheus(snapshot)
+
+    # --- Emission -----------------------------------------------------------
+
+    def _run(self):
+        while not self._wake.wait(self.interval):
+            self._tick()
+
+    def _tick(self):
+        snapshot = self._snapshot()
+        if snapshot is not None:
+            self._event(snapshot)
+            self._write_prometheus(snapshot)
+
+    def _snapshot(self):
+        """Progress event for the current phase, or None between phases."""
+        now = time.time()
+        with self._lock:
+            phase = self._phase
+            if phase is None:
+                return None
+            tested = phase['tested']
+            position = phase['position']
+            workers = {pid: (count, busy) for pid, (count, busy) in phase['workers'].items()}
+            last_time, last_tested = self._last_emit
+            self._last_emit = (now, tested)
+
+        elapsed = now - phase['started']
+        average = tested / elapsed if elapsed > 0 else 0.0
+        eta = None
+        if phase['total'] and average:
+            eta = max(0, phase['total'] - phase['already_tested'] - tested) / average
+        elif phase['size'] and position and elapsed > 0:
+            # Candidates per index unit are unknown (wordlist bytes); use positional progress
+            eta = (phase['size'] - position) * elapsed / position
+        return {
+            'event': 'progress',
+            'phase': phase['phase'],
+            'tested': phase['already_tested'] + tested,
+            'tested_this_run': tested,
+            'total': phase['total'],
+            'rate': round((tested - last_tested) / (now - last_time), 1) if now > last_time else 0.0,
+            'rate_average': round(average, 1),
+            'worker_rates': {str(pid): round(count / busy, 1) for pid, (count, busy) in workers.items() if busy},
+            'eta_seconds': round(eta, 1) if eta is not None else None,
+            'position': position,
+            'size': phase['size'],
+            'elapsed_seconds': round(elapsed, 3),
+        }
+
+    def _event(self, event):
+        if self._stream is None:
+            return
+        record = {'time': round(time.time(), 3), 'target': self.target, **event}
+        with self._io_lock:
+            self._stream.write(json.dumps(record, ensure_ascii=False) + '\n')
+            self._stream.flush()
+
+    def _write_prometheus(self, snapshot):
+        """Rewrite the textfile; the collector must never see a partial file."""
+        if self._prometheus is None:
+            return
+        labels = f'target="{_label_value(self.target)}",phase="{_label_value(snapshot["phase"])}"'
+        lines = []
+
+        def metric(name, kind, help_text, value, extra=''):
+            if value is None:
+                return
+            lines.append(f"# HELP {PROMETHEUS_PREFIX}_{name} {help_text}")
+            lines.append(f"# TYPE {PROMETHEUS_PREFIX}_{name} {kind}")
+            lines.append(f"{PROMETHEUS_PREFIX}_{name}{{{labels}{extra}}} {value}")
+
+        metric('tested_total', 'counter', 'Candidates tested in this phase, including resumed work.', snapshot['tested'])
+        metric('rate', 'gauge', 'Candidates per second over the last interval.', snapshot['rate'])
+        metric('rate_average', 'gauge', 'Candidates per second since the phase began.', snapshot['rate_average'])
+        metric('eta_seconds', 'gauge', 'Estimated seconds until the phase is exhausted.', snapshot['eta_seconds'])
+        metric('position', 'gauge', 'Keyspace index below which everything has been tested.', snapshot['position'])
+        metric('keyspace_size', 'gauge', 'Keyspace size in index units.', snapshot['size'])
+        if snapshot['worker_rates']:
+            lines.append(f"# HELP {PROMETHEUS_PREFIX}_worker_rate Candidates per second of one worker while busy.")
+            lines.append(f"# TYPE {PROMETHEUS_PREFIX}_worker_rate gauge")
+            for pid, rate in sorted(snapshot['worker_rates'].items()):
+                lines.append(f'{PROMETHEUS_PREFIX}_worker_rate{{{labels},worker="{pid}"}} {rate}')
+
+        temp = self._prometheus.with_name(self._prometheus.name + '.tmp')
+        with self._io_lock:
+            temp.write_text('\n'.join(lines) + '\n', encoding='utf-8')
+            os.replace(temp, self._prometheus)
+
+
+def add_metrics_arguments(parser):
+    """Add the metrics options to an argparse parser."""
+    parser.add_argument('--metrics', metavar='FILE|fd:N|-',
+                        help='Write JSON-lines progress events to a file, file descriptor or stdout')
+    parser.add_argument('--metrics-prometheus', metavar='FILE',
+                        help='Keep a Prometheus text-format file up to date (node exporter textfile collector)')
+    parser.add_argument('--metrics-interval', type=float, default=DEFAULT_INTERVAL,
+                        help=f'Seconds between metrics events (default: {DEFAULT_INTERVAL:g})')
+
+
+def metrics_from_args(args, target):
+    """Build a Metrics from options added by add_metrics_arguments, or None."""
+    if not args.metrics and not args.metrics_prometheus:
+        return None
+    return Metrics(target, args.metrics, args.metrics_prometheus, args.metrics_interval)
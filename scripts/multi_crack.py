@@ -0,0 +1,202 @@
+#!/usr/bin/env python3
+"""Multi-target PDF password cracker.
+
+Loads the encryption parameters of many PDFs at once and groups files with
+identical /ID, O and U values, so each distinct target is tested only once.
+Every candidate is checked against all unsolved targets in a single pass,
+sharing the per-candidate work that does not depend on the file, and a
+recovered password is immediately tried against the remaining targets
+before the main attack continues.
+
+Usage:
+    python multi_crack.py <pdf_or_dir> [<pdf_or_dir> ...] [--mask MASK [--markov] | --wordlist FILE]
+"""
+
+import argparse
+import itertools
+import multiprocessing as mp
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+from crack_runner import calibrated_chunk_size, keyspace_tasks, list_tasks, run_tasks
+from crack_worker import init_multi_worker, try_multi_batch, try_multi_keyspace_range
+from dedup import dedup
+from m4_optimized_crack import decrypt_pdf, generate_comprehensive_wordlist
+from markov import MarkovKeyspace, add_markov_arguments, markov_model_from_args
+from mask import MaskError, add_mask_arguments, mask_keyspace_from_args
+from potfile import Potfile, try_known_passwords
+from pdf_security import (MultiTargetVerifier, PasswordVerifier, UnsupportedEncryptionError,
+                          read_encryption_params)
+from rules import RuleError, RuledKeyspace, load_rules
+from wordlist import WordlistKeyspace
+
+
+def collect_pdfs(paths):
+    """Expand directories into the PDFs they contain."""
+    pdf_files = []
+    for path in map(Path, paths):
+        if path.is_dir():
+            pdf_files.extend(sorted(path.glob('*.pdf')))
+        elif path.exists():
+            pdf_files.append(path)
+        else:
+            print(f"⚠️  Skipping missing file: {path}")
+    return pdf_files
+
+
+def target_key(params):
+    """Files with the same key open with exactly the same passwords."""
+    return (params.id0, params.o, params.u, params.r, params.length,
+            params.p, params.encrypt_metadata)
+
+
+def load_targets(pdf_files):
+    """Parse every file once and group identical targets.
+
+    Returns a list of ``(params, [pdf_file, ...])`` groups.
+    """
+    groups = {}
+    for pdf_file in pdf_files:
+        try:
+            params = read_encryption_params(pdf_file)
+            if params is None:
+                print(f"ℹ️  {pdf_file.name}: not encrypted, nothing to crack")
+                continue
+            PasswordVerifier(params)
+        except (UnsupportedEncryptionError, ValueError, OSError) as e:
+            print(f"⚠️  {pdf_file.name}: {e}")
+            continue
+        groups.setdefault(target_key(params), (params, []))[1].append(pdf_file)
+    return list(groups.values())
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Crack many PDFs in one pass')
+    parser.add_argument('targets', nargs='+', help='PDF files or directories of PDFs')
+    add_mask_arguments(parser)
+    add_markov_arguments(parser)
+    parser.add_argument('--wordlist', help='External wordlist instead of the generated one (memory-mapped, any size)')
+    parser.add_argument('--rules', help='Hashcat/John rule file applied to every --wordlist word inside the workers')
+    args = parser.parse_args()
+    if args.rules and not args.wordlist:
+        parser.error('--rules needs --wordlist')
+    if args.wordlist and not Path(args.wordlist).is_file():
+        print(f"Error: {args.wordlist} does not exist")
+        sys.exit(1)
+
+    pdf_files = collect_pdfs(args.targets)
+    groups = load_targets(pdf_files)
+    if not groups:
+        print("Error: no crackable PDFs found")
+        sys.exit(1)
+
+    num_processes = mp.cpu_count()
+    print(f"🎯 Multi-Target PDF Password Cracker")
+    print(f"📁 {len(pdf_files)} files, {len(groups)} distinct encryption targets")
+    for params, files in groups:
+        names = ', '.join(f.name for f in files)
+        print(f"   R{params.r} {params.cipher}: {names}")
+    print(f"⚡ Using {num_processes} CPU cores")
+
+    params_list = [params for params, _ in groups]
+    parent_verifier = MultiTargetVerifier(params_list)
+    # Shared flags: workers skip solved targets, the parent sets flags for reuse hits
+    solved = mp.RawArray('b', len(groups))
+    stop_event = mp.Event()
+    results = {}
+
+    # Targets cracked before, or opened by a recovered password, are done up front
+    potfile = Potfile()
+    for index, verifier in enumerate(parent_verifier.verifiers):
+        password = try_known_passwords(verifier, potfile)
+        if password is not None:
+            solved[index] = 1
+            results[index] = password
+            print(f"🗂️  Potfile password for {', '.join(f.name for f in groups[index][1])}: '{password}'")
+
+    def on_found(hits):
+        for index, password in hits:
+            if index in results:
+                continue
+            results[index] = password
+            names = ', '.join(f.name for f in groups[index][1])
+            print(f"\n🎉 Password found for {names}: '{password}'")
+            # Try it on every remaining target before the attack continues
+            for other in parent_verifier.check(password, solved):
+                solved[other] = 1
+                results[other] = password
+                names = ', '.join(f.name for f in groups[other][1])
+                print(f"♻️  Same password also opens {names}")
+        if len(results) == len(groups):
+            stop_event.set()
+            return True
+        return False
+
+    # Each candidate now costs one check per unsolved target
+    chunk_size = max(100, calibrated_chunk_size(parent_verifier.verifiers[0]) // len(groups))
+    keyspaces = ()
+    if args.wordlist:
+        keyspace = WordlistKeyspace(args.wordlist)
+        if args.rules:
+            try:
+                keyspace = RuledKeyspace(keyspace, load_rules(args.rules))
+            except (RuleError, OSError) as e:
+                parser.error(str(e))
+            print(f"📜 Rules: {args.rules} ({len(keyspace.rules)} rules)")
+        keyspaces = (keyspace,)
+        total = None
+        worker_fn = try_multi_keyspace_range
+        tasks = keyspace_tasks(0, keyspaces[0], chunk_size)
+        print(f"📖 Wordlist: {args.wordlist} ({keyspaces[0].size / 1e6:,.1f} MB)")
+    elif args.mask:
+        try:
+            keyspace = mask_keyspace_from_args(args)
+            model = markov_model_from_args(args)
+        except (MaskError, OSError) as e:
+            parser.error(str(e))
+        if model is not None and model.passwords:
+            keyspace = MarkovKeyspace(keyspace, model)
+            print(f"🧠 Markov order: trained on {model.passwords:,} passwords from {model.source}")
+        keyspaces = (keyspace,)
+        total = keyspace.size
+        worker_fn = try_multi_keyspace_range
+        tasks = keyspace_tasks(0, keyspace, chunk_size)
+        print(f"🎭 Mask: {args.mask} ({total:,} candidates)")
+    else:
+        passwords = list(dedup(itertools.chain.from_iterable(
+            generate_comprehensive_wordlist(pdf_file) for pdf_file in pdf_files)))
+        total = len(passwords)
+        worker_fn = try_multi_batch
+        tasks = list_tasks(passwords, chunk_size)
+        print(f"📝 Generated {total:,} passwords to test")
+
+    start_time = time.time()
+    if len(results) == len(groups):
+        tasks = ()
+    with ProcessPoolExecutor(max_workers=num_processes, initializer=init_multi_worker,
+                             initargs=(params_list, solved, stop_event, keyspaces)) as executor:
+        try:
+            _, passwords_tested = run_tasks(executor, worker_fn, tasks, num_processes * 2,
+                                            total, on_found=on_found)
+        except KeyboardInterrupt:
+            stop_event.set()
+            print(f"\n⏹️  Interrupted by user")
+            passwords_tested = None
+
+    elapsed = time.time() - start_time
+    print(f"\n📊 Solved {len(results)}/{len(groups)} targets in {elapsed:.2f} seconds")
+    if passwords_tested is not None:
+        print(f"📈 Tested {passwords_tested:,} candidates")
+
+    for index, (params, files) in enumerate(groups):
+        if index not in results:
+            print(f"❌ Not found: {', '.join(f.name for f in files)}")
+            continue
+        for pdf_file in files:
+            decrypt_pdf(pdf_file, results[index])
+
+
+if __name__ == '__main__':
+    main()
@@ -1,10 +1,146 @@
 #!/usr/bin/env python3
 
 import os
+import json
+import time
+import hashlib
 import subprocess
+import queue
+import signal
 import argparse
+import multiprocessing as mp
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from concurrent.futures.process import BrokenProcessPool
 from pathlib import Path
 
+import pikepdf
+
+from potfile import Potfile, known_password, potfile_path
+
+try:
+    from watchdog.events import FileSystemEventHandler
+    from watchdog.observers import Observer
+except ImportError:  # optional: --watch falls back to polling
+    FileSystemEventHandler = object
+    Observer = None
+
+# Per-process potfile for the worker pool, reloaded when the file changes
+_potfile = None
+_potfile_mtime = None
+
+# --watch: a file is dispatched once its size and mtime have been stable this long
+WATCH_SETTLE_SECONDS = 0.5
+# --watch without watchdog: seconds between directory scans
+WATCH_POLL_SECONDS = 0.5
+
+MANIFEST_NAME = '.pdf_decrypt_manifest.json'
+# Results between periodic manifest writes
+MANIFEST_SAVE_EVERY = 500
+
+def file_digest(path: Path) -> str:
+    """
+    SHA-256 of a file's content, read in 1 MB blocks.
+    """
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+class Manifest:
+    """
+    Record of processed source files, keyed by path relative to the input directory.
+    
+    Each entry keeps the source size, mtime and SHA-256 with the result, so
+    a re-run only processes new or modified files. The content hash is only
+    computed when size and mtime no longer match, e.g. after a copy.
+    """
+    
+    def __init__(self, path: Path):
+        self.path = path
+        self.entries = {}
+        self._unsaved = 0
+        if path.exists():
+            with open(path, encoding='utf-8') as f:
+                self.entries = json.load(f).get('files', {})
+    
+    def is_current(self, key: str, stat, source: Path, retry_failed=False) -> bool:
+        """
+        Return True if the source is unchanged since its recorded result.
+        """
+        entry = self.entries.get(key)
+        if entry is None or entry['size'] != stat.st_size:
+            return False
+        if entry['result'] != 'ok' and retry_failed:
+            return False
+        if entry['mtime_ns'] != stat.st_mtime_ns:
+            # Touched or copied: compare content before reprocessing
+            if file_digest(source) != entry['sha256']:
+                return False
+            entry['mtime_ns'] = stat.st_mtime_ns
+            self._unsaved += 1
+        return True
+    
+    def record(self, key: str, stat, sha256: str, success: bool, message: str):
+        """
+        Record the result for one source file, saving periodically.
+        """
+        self.entries[key] = {
+            'size': stat.st_size,
+            'mtime_ns': stat.st_mtime_ns,
+            'sha256': sha256,
+            'result': 'ok' if success else 'failed',
+            'message': message,
+            'time': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        }
+        self._unsaved += 1
+        if self._unsaved >= MANIFEST_SAVE_EVERY:
+            self.save()
+    
+    def save(self):
+        """
+        Write the manifest atomically.
+        """
+        if not self._unsaved:
+            return
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.path.with_name(self.path.name + '.tmp')
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({'files': self.entries}, f, indent=1, sort_keys=True)
+        os.replace(tmp_path, self.path)
+        self._unsaved = 0
+
+def find_pdfs(input_dir: Path, output_dir: Path, recursive: bool):
+    """
+    List the PDFs to process, skipping anything inside the output directory.
+    """
+    pattern = input_dir.rglob('*.pdf') if recursive else input_dir.glob('*.pdf')
+    output_dir = output_dir.resolve()
+    return sorted(path for path in pattern
+                  if path.is_file() and output_dir not in path.resolve().parents)
+
+def plan_work(input_dir: Path, output_dir: Path, recursive=False, manifest=None, retry_failed=False):
+    """
+    Pair each PDF with its mirrored output path and drop unchanged files.
+    
+    Returns:
+        tuple: (list of (source, output, manifest key, stat), number skipped)
+    """
+    work = []
+    skipped = 0
+    for pdf_file in find_pdfs(input_dir, output_dir, recursive):
+        relative = pdf_file.relative_to(input_dir)
+        output_path = output_dir / relative
+        stat = pdf_file.stat()
+        key = relative.as_posix()
+        # A recorded success only counts while its output is still there
+        if (manifest is not None and manifest.is_current(key, stat, pdf_file, retry_failed)
+                and (output_path.exists() or manifest.entries[key]['result'] != 'ok')):
+            skipped += 1
+            continue
+        work.append((pdf_file, output_path, key, stat))
+    return work, skipped
+
 def show_encryption_status(pdf_path: Path, label: str):
     """
     Print the encryption status of a PDF file using qpdf.
@@ -38,9 +174,16 @@ def decrypt_pdf(input_path: Path, output_path: Path) -> bool:
         # Print encryption status before decryption
         show_encryption_status(input_path, "BEFORE")
         
+        # Use the recovered user password if this file was cracked before
+        cmd = ['qpdf', '--decrypt', str(input_path), str(output_path)]
+        password = known_password(input_path)
+        if password is not None:
+            print(f"Using password from potfile for {input_path.name}")
+            cmd.insert(1, '--password=' + password)
+        
         # Run qpdf command to decrypt the PDF
         result = subprocess.run(
-            ['qpdf', '--decrypt', str(input_path), str(output_path)],
+            cmd,
             capture_output=True,
             text=True
         )
@@ -61,40 +204,357 @@ def decrypt_pdf(input_path: Path, output_path: Path) -> bool:
         print(f"Error processing {input_path.name}: {str(e)}")
         return False
 
-def process_directory(input_dir: Path, output_dir: Path):
+def describe_encryption(pdf) -> str:
+    """
+    Describe the encryption of an already open pikepdf.Pdf.
+    """
+    if not pdf.is_encrypted:
+        return "not encrypted"
+    info = pdf.encryption
+    # V1/V2 handlers are always RC4; pikepdf only names crypt filters (V4+)
+    method = 'rc4' if info.V < 4 else info.stream_method.name
+    return f"R{info.R}, {info.bits}-bit {method}, P={info.P}"
+
+def current_potfile():
+    """
+    The worker's potfile, loaded once and reloaded only when the file changes.
+    """
+    global _potfile, _potfile_mtime
+    try:
+        mtime = potfile_path().stat().st_mtime_ns
+    except OSError:
+        mtime = None
+    if _potfile is None or mtime != _potfile_mtime:
+        _potfile, _potfile_mtime = Potfile(), mtime
+    return _potfile
+
+def init_decrypt_worker():
+    """
+    Pool initializer: load the potfile once per worker process.
+    """
+    # Ctrl-C is handled by the parent, which lets running files finish
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    current_potfile()
+
+def decrypt_in_process(paths):
+    """
+    Decrypt one PDF with pikepdf, inside a pool worker.
+    
+    The output is written to a temporary name next to the destination and
+    renamed into place, so an interrupted run never leaves a truncated PDF.
+    
+    Args:
+        paths: (input_path, output_path, hash_source) tuple; the source is
+            only hashed (an extra full read) when a manifest needs it
+    
+    Returns:
+        tuple: (input_path, success, message, sha256 of the source or None)
+    """
+    input_path, output_path, hash_source = paths
+    sha256 = None
+    tmp_path = output_path.with_name(f".{output_path.name}.tmp")
+    try:
+        if hash_source:
+            sha256 = file_digest(input_path)
+        password = known_password(input_path, current_potfile()) or ''
+        with pikepdf.open(input_path, password=password) as pdf:
+            before = describe_encryption(pdf)
+            output_path.parent.mkdir(parents=True, exist_ok=True)
+            pdf.save(tmp_path)
+        os.replace(tmp_path, output_path)
+    except pikepdf.PasswordError:
+        return input_path, False, "password required (not in potfile)", sha256
+    except Exception as e:
+        tmp_path.unlink(missing_ok=True)
+        return input_path, False, str(e), sha256
+    
+    source = " (password from potfile)" if password else ""
+    return input_path, True, f"{before} -> not encrypted{source}", sha256
+
+def process_directory_parallel(input_dir: Path, output_dir: Path, workers: int,
+                               recursive=False, manifest=None, retry_failed=False):
+    """
+    Decrypt all PDF files in the input directory with a pool of pikepdf workers.
+    
+    Args:
+        input_dir: Directory containing encrypted PDFs
+        output_dir: Directory where decrypted PDFs will be saved
+        workers: Number of worker processes
+        recursive: Also process subdirectories, mirroring them in output_dir
+        manifest: Optional Manifest used to skip unchanged files
+        retry_failed: Reprocess unchanged files whose last attempt failed
+    """
+    output_dir.mkdir(parents=True, exist_ok=True)
+    work, skipped = plan_work(input_dir, output_dir, recursive, manifest, retry_failed)
+    
+    if not work:
+        print(f"No new or modified PDF files found in {input_dir}" if skipped
+              else f"No PDF files found in {input_dir}")
+        return
+    
+    print(f"Found {len(work)} PDF files to process with {workers} workers"
+          + (f" ({skipped} unchanged skipped)" if skipped else ""))
+    
+    tasks = [(pdf_file, output_path, manifest is not None) for pdf_file, output_path, _, _ in work]
+    # Many small files: hand them out in chunks so IPC stays negligible
+    chunksize = max(1, min(64, len(tasks) // (workers * 4)))
+    successful = 0
+    with ProcessPoolExecutor(max_workers=workers, initializer=init_decrypt_worker) as executor:
+        try:
+            results = executor.map(decrypt_in_process, tasks, chunksize=chunksize)
+            for (_, _, key, stat), (input_path, success, message, sha256) in zip(work, results):
+                if success:
+                    successful += 1
+                    print(f"Successfully decrypted: {key} ({message})")
+                else:
+                    print(f"Error decrypting {key}: {message}")
+                if manifest is not None:
+                    manifest.record(key, stat, sha256, success, message)
+        except KeyboardInterrupt:
+            executor.shutdown(cancel_futures=True)
+            print(f"\nInterrupted; files not yet started were skipped")
+        finally:
+            if manifest is not None:
+                manifest.save()
+    
+    print(f"\nProcessing complete:")
+    print(f"Successfully decrypted: {successful}/{len(work)} files")
+
+def process_directory(input_dir: Path, output_dir: Path, recursive=False, manifest=None,
+                      retry_failed=False):
     """
     Process all PDF files in the input directory.
     
     Args:
         input_dir: Directory containing encrypted PDFs
         output_dir: Directory where decrypted PDFs will be saved
+        recursive: Also process subdirectories, mirroring them in output_dir
+        manifest: Optional Manifest used to skip unchanged files
+        retry_failed: Reprocess unchanged files whose last attempt failed
     """
     # Create output directory if it doesn't exist
     output_dir.mkdir(parents=True, exist_ok=True)
     
-    # Get all PDF files in the input directory
-    pdf_files = list(input_dir.glob('*.pdf'))
+    # Get the PDF files that are new or changed since the last run
+    work, skipped = plan_work(input_dir, output_dir, recursive, manifest, retry_failed)
     
-    if not pdf_files:
-        print(f"No PDF files found in {input_dir}")
+    if not work:
+        print(f"No new or modified PDF files found in {input_dir}" if skipped
+              else f"No PDF files found in {input_dir}")
         return
     
-    print(f"Found {len(pdf_files)} PDF files to process")
+    print(f"Found {len(work)} PDF files to process"
+          + (f" ({skipped} unchanged skipped)" if skipped else ""))
     
     # Process each PDF file
     successful = 0
-    for pdf_file in pdf_files:
-        output_path = output_dir / pdf_file.name
-        if decrypt_pdf(pdf_file, output_path):
-            successful += 1
+    try:
+        for pdf_file, output_path, key, stat in work:
+            success = decrypt_pdf(pdf_file, output_path)
+            if success:
+                successful += 1
+            if manifest is not None:
+                manifest.record(key, stat, file_digest(pdf_file), success,
+                                'decrypted with qpdf' if success else 'qpdf failed')
+    finally:
+        if manifest is not None:
+            manifest.save()
     
     print(f"\nProcessing complete:")
-    print(f"Successfully decrypted: {successful}/{len(pdf_files)} files")
+    print(f"Successfully decrypted: {successful}/{len(work)} files")
+
+class _EventQueue(FileSystemEventHandler):
+    """
+    Watchdog handler that queues the paths of created, modified and moved files.
+    """
+    
+    def __init__(self, events):
+        self.events = events
+    
+    def on_any_event(self, event):
+        if not event.is_directory:
+            # A move reports both ends, so the old path is forgotten too
+            self.events.put(Path(event.src_path))
+            if getattr(event, 'dest_path', None):
+                self.events.put(Path(event.dest_path))
+
+def watch_directory(input_dir: Path, output_dir: Path, workers: int, recursive=False,
+                    manifest=None, settle=WATCH_SETTLE_SECONDS):
+    """
+    Decrypt PDFs as they land in the input directory, until interrupted.
+    
+    Files already present are processed first. New or changed files are
+    picked up from filesystem events (watchdog) or by polling, and handed
+    to a warm pool of pikepdf workers once their size and mtime have been
+    stable for ``settle`` seconds, so partially written files are not read.
+    
+    Args:
+        input_dir: Directory to watch
+        output_dir: Directory where decrypted PDFs will be saved
+        workers: Number of worker processes
+        recursive: Also watch subdirectories, mirroring them in output_dir
+        manifest: Optional Manifest used to skip unchanged files across restarts
+        settle: Seconds a file must stay unchanged before it is processed
+    """
+    output_dir.mkdir(parents=True, exist_ok=True)
+    resolved_output = output_dir.resolve()
+    events = queue.Queue()
+    observer = None
+    if Observer is not None:
+        observer = Observer()
+        observer.schedule(_EventQueue(events), str(input_dir), recursive=recursive)
+        observer.start()
+        print(f"Watching {input_dir} for new PDFs with {workers} workers (Ctrl-C to stop)")
+    else:
+        print(f"Watching {input_dir} for new PDFs with {workers} workers, polling every "
+              f"{WATCH_POLL_SECONDS}s (install watchdog for filesystem events; Ctrl-C to stop)")
+    
+    def wanted(path):
+        if path.suffix != '.pdf' or resolved_output in path.resolve().parents:
+            return False
+        return recursive or path.parent == input_dir
+    
+    # path -> (size, mtime_ns, time first seen with that signature)
+    pending = {path: None for path in find_pdfs(input_dir, output_dir, recursive)}
+    # path -> signature of the version already dispatched, while the file exists
+    handled = {}
+    # future -> (path, manifest key, stat)
+    in_flight = {}
+    successful = failed = 0
+    last_scan = time.monotonic()
+    
+    def new_pool():
+        return ProcessPoolExecutor(max_workers=workers, initializer=init_decrypt_worker)
+    
+    def finish(future, path, key, stat):
+        # A failed task (file moved away, worker crash) fails that file, not the watch
+        try:
+            _, success, message, sha256 = future.result()
+        except Exception as e:
+            success, message, sha256 = False, f"{type(e).__name__}: {e}", None
+        if success:
+            print(f"Successfully decrypted: {key} ({message})")
+        else:
+            print(f"Error decrypting {key}: {message}")
+        if manifest is not None:
+            manifest.record(key, stat, sha256, success, message)
+        return success
+    
+    executor = new_pool()
+    try:
+        while True:
+            # Gather changed paths: wait briefly for the first event, then take
+            # only what is already queued, so a steady stream of events cannot
+            # hold off dispatch and reporting
+            try:
+                changed = [events.get(timeout=0.1 if not in_flight else 0.02)]
+            except queue.Empty:
+                changed = []
+            for _ in range(events.qsize()):
+                changed.append(events.get_nowait())
+            for path in changed:
+                if wanted(path):
+                    pending.setdefault(path, None)
+            if observer is None and time.monotonic() - last_scan >= WATCH_POLL_SECONDS:
+                present = set(find_pdfs(input_dir, output_dir, recursive))
+                for path in present:
+                    pending.setdefault(path, None)
+                # Forget files that were removed since they were handled
+                for path in handled.keys() - present:
+                    del handled[path]
+                last_scan = time.monotonic()
+            
+            # Debounce: dispatch files whose size and mtime have settled
+            now = time.monotonic()
+            for path, seen in list(pending.items()):
+                try:
+                    stat = path.stat()
+                except OSError:
+                    # Deleted or moved away
+                    del pending[path]
+                    handled.pop(path, None)
+                    continue
+                signature = (stat.st_size, stat.st_mtime_ns)
+                if handled.get(path) == signature:
+                    del pending[path]
+                    continue
+                if seen is None or seen[:2] != signature:
+                    pending[path] = signature + (now,)
+                    continue
+                if not stat.st_size or now - seen[2] < settle:
+                    continue
+                del pending[path]
+                handled[path] = signature
+                relative = path.relative_to(input_dir)
+                output_path = output_dir / relative
+                key = relative.as_posix()
+                try:
+                    unchanged = manifest is not None and manifest.is_current(key, stat, path)
+                except OSError:
+                    continue  # Moved away while being compared
+                if unchanged and (output_path.exists() or manifest.entries[key]['result'] != 'ok'):
+                    continue
+                try:
+                    future = executor.submit(decrypt_in_process, (path, output_path, manifest is not None))
+                except BrokenProcessPool:
+                    executor.shutdown(wait=False)
+                    executor = new_pool()
+                    future = executor.submit(decrypt_in_process, (path, output_path, manifest is not None))
+                in_flight[future] = (path, key, stat)
+            
+            # Report finished files
+            if in_flight:
+                done, _ = wait(in_flight, timeout=0, return_when=FIRST_COMPLETED)
+                broken = False
+                for future in done:
+                    path, key, stat = in_flight.pop(future)
+                    if finish(future, path, key, stat):
+                        successful += 1
+                    else:
+                        failed += 1
+                    broken = broken or isinstance(future.exception(), BrokenProcessPool)
+                if done and manifest is not None:
+                    manifest.save()
+                if broken:
+                    # A worker died; the pool is unusable, so start a fresh one
+                    print("Worker pool broke; restarting it")
+                    executor.shutdown(wait=False)
+                    executor = new_pool()
+    except KeyboardInterrupt:
+        print(f"\nStopping; waiting for {len(in_flight)} files in progress")
+        for future in list(in_flight):
+            path, key, stat = in_flight.pop(future)
+            if finish(future, path, key, stat):
+                successful += 1
+            else:
+                failed += 1
+    finally:
+        executor.shutdown()
+        if observer is not None:
+            observer.stop()
+            observer.join()
+        if manifest is not None:
+            manifest.save()
+    
+    print(f"Watch stopped: {successful} decrypted, {failed} failed")
 
 def main():
     parser = argparse.ArgumentParser(description='Decrypt PDF files using qpdf')
     parser.add_argument('input_dir', type=str, help='Input directory containing encrypted PDFs')
     parser.add_argument('output_dir', type=str, help='Output directory for decrypted PDFs')
+    parser.add_argument('--workers', type=int, nargs='?', const=mp.cpu_count(),
+                        help='Decrypt in-process with pikepdf using N worker processes '
+                             '(default N: all cores) instead of calling qpdf per file')
+    parser.add_argument('--recursive', '-r', action='store_true',
+                        help='Process subdirectories too, mirroring them in the output directory')
+    parser.add_argument('--manifest', nargs='?', const='',
+                        help='Skip files unchanged since the last run, tracked in a manifest '
+                             f'(default: <output_dir>/{MANIFEST_NAME})')
+    parser.add_argument('--retry-failed', action='store_true',
+                        help='With --manifest, retry unchanged files that failed last time')
+    parser.add_argument('--watch', action='store_true',
+                        help='Keep running and decrypt PDFs as they are added to the input directory '
+                             '(uses --workers, default all cores)')
     
     args = parser.parse_args()
     
@@ -105,7 +565,17 @@ def main():
         print(f"Error: Input directory '{input_dir}' does not exist")
         return
     
-    process_directory(input_dir, output_dir)
+    manifest = None
+    if args.manifest is not None:
+        manifest = Manifest(Path(args.manifest) if args.manifest else output_dir / MANIFEST_NAME)
+    
+    if args.watch:
+        watch_directory(input_dir, output_dir, args.workers or mp.cpu_count(), args.recursive, manifest)
+    elif args.workers:
+        process_directory_parallel(input_dir, output_dir, args.workers, args.recursive, manifest,
+                                   args.retry_failed)
+    else:
+        process_directory(input_dir, output_dir, args.recursive, manifest, args.retry_failed)
 
 if __name__ == '__main__':
     main() 
\ No newline at end of file
@@ -0,0 +1,744 @@
+#!/usr/bin/env python3
+"""PDF standard security handler helpers.
+
+Parses the trailer and ``/Encrypt`` dictionary of a PDF once and checks
+candidate passwords in-process with the standard key derivation
+(revisions 2 through 6), using only hashlib and RC4/AES primitives.
+pikepdf is only needed to confirm and decrypt a winning password.
+
+Usage:
+    python pdf_security.py <pdf_file> [password ...]
+"""
+
+import hashlib
+import mmap
+import re
+import struct
+import sys
+import zlib
+from collections import namedtuple
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Optional
+
+try:
+    from cryptography.hazmat.primitives.ciphers import Cipher, algorithms, modes
+except ImportError:  # pragma: no cover - depends on the environment
+    Cipher = algorithms = modes = None
+
+try:
+    from cryptography.hazmat.decrepit.ciphers.algorithms import ARC4
+except ImportError:  # pragma: no cover - older cryptography releases
+    ARC4 = getattr(algorithms, 'ARC4', None)
+
+# Padding string from the PDF specification (Algorithm 2, step a)
+PASSWORD_PADDING = bytes([
+    0x28, 0xBF, 0x4E, 0x5E, 0x4E, 0x75, 0x8A, 0x41,
+    0x64, 0x00, 0x4E, 0x56, 0xFF, 0xFA, 0x01, 0x08,
+    0x2E, 0x2E, 0x00, 0xB6, 0xD0, 0x68, 0x3E, 0x80,
+    0x2F, 0x0C, 0xA9, 0xFE, 0x64, 0x53, 0x69, 0x7A,
+])
+
+# Byte translation tables for the "key XOR i" rounds of Algorithms 5 and 7
+_XOR_TABLES = [bytes(b ^ i for b in range(256)) for i in range(20)]
+
+Ref = namedtuple('Ref', 'num gen')
+
+
+class UnsupportedEncryptionError(Exception):
+    """Raised for security handlers the in-process verifier cannot check."""
+
+
+@dataclass
+class EncryptionParams:
+    """Parameters of a PDF standard security handler."""
+    filter: str
+    sub_filter: Optional[str]
+    v: int
+    r: int
+    length: int
+    o: bytes
+    u: bytes
+    oe: bytes
+    ue: bytes
+    p: int
+    perms: bytes
+    encrypt_metadata: bool
+    id0: bytes
+    stream_filter: Optional[str]
+
+    @property
+    def key_length(self) -> int:
+        """File encryption key length in bytes."""
+        if self.r == 2:
+            return 5
+        if self.r >= 5:
+            return 32
+        return max(5, min(16, self.length // 8))
+
+    def fingerprint(self) -> str:
+        """Stable identifier of the target: SHA-256 over /ID, O, U, R and Length."""
+        digest = hashlib.sha256()
+        for part in (self.id0, self.o, self.u, str(self.r).encode(), str(self.length).encode()):
+            digest.update(len(part).to_bytes(4, 'big') + part)
+        return digest.hexdigest()
+
+    @property
+    def cipher(self) -> str:
+        """Human-readable name of the document cipher."""
+        if self.r >= 5:
+            return 'AES-256'
+        if self.stream_filter == 'AESV2':
+            return 'AES-128'
+        return f'RC4-{self.key_length * 8}'
+
+
+# --- Minimal PDF object parser ----------------------------------------------
+
+WHITESPACE = b'\x00\t\n\x0c\r '
+DELIMITERS = b'()<>[]{}/%'
+_TOKEN_END = re.compile(rb'[\x00\t\n\x0c\r ()<>\[\]{}/%]')
+_NUMBER = re.compile(rb'[+-]?(\d+\.?\d*|\.\d+)')
+_REF = re.compile(rb'(\d+)\s+(\d+)\s+R(?![^\x00\t\n\x0c\r ()<>\[\]{}/%])')
+_ESCAPES = {ord('n'): b'\n', ord('r'): b'\r', ord('t'): b'\t', ord('b'): b'\b',
+            ord('f'): b'\f', ord('('): b'(', ord(')'): b')', ord('\\'): b'\\'}
+
+
+def _skip_whitespace(data, pos):
+    """Skip whitespace and comments."""
+    length = len(data)
+    while pos < length:
+        c = data[pos]
+        if c in WHITESPACE:
+            pos += 1
+        elif c == 0x25:  # '%' comment runs to end of line
+            while pos < length and data[pos] not in b'\r\n':
+                pos += 1
+        else:
+            break
+    return pos
+
+
+def _parse_literal_string(data, pos):
+    """Parse a literal string starting just after the opening parenthesis."""
+    out = bytearray()
+    depth = 1
+    while pos < len(data):
+        c = data[pos]
+        if c == 0x5C:  # backslash
+            pos += 1
+            c = data[pos]
+            if c in _ESCAPES:
+                out += _ESCAPES[c]
+                pos += 1
+            elif 0x30 <= c <= 0x37:
+                digits = data[pos:pos + 3]
+                n = 0
+                while n < len(digits) and 0x30 <= digits[n] <= 0x37:
+                    n += 1
+                out.append(int(digits[:n], 8) & 0xFF)
+                pos += n
+            elif c == 0x0D:  # line continuation
+                pos += 2 if data[pos + 1:pos + 2] == b'\n' else 1
+            elif c == 0x0A:
+                pos += 1
+            else:
+                out.append(c)
+                pos += 1
+            continue
+        if c == 0x28:
+            depth += 1
+        elif c == 0x29:
+            depth -= 1
+            if depth == 0:
+                return bytes(out), pos + 1
+        out.append(c)
+        pos += 1
+    raise ValueError('Unterminated literal string')
+
+
+def parse_object(data, pos):
+    """Parse one PDF object at ``pos`` and return ``(value, new_pos)``.
+
+    Names are returned as ``str`` with their leading slash, strings as
+    ``bytes``, dictionaries as ``dict`` keyed by name without the slash and
+    indirect references as ``Ref``.
+    """
+    pos = _skip_whitespace(data, pos)
+    c = data[pos:pos + 1]
+    if c == b'/':
+        end = _TOKEN_END.search(data, pos + 1)
+        end = end.start() if end else len(data)
+        name = re.sub(rb'#([0-9A-Fa-f]{2})', lambda m: bytes([int(m.group(1), 16)]),
+                      bytes(data[pos + 1:end]))
+        return '/' + name.decode('latin-1'), end
+    if c == b'<' and data[pos + 1:pos + 2] == b'<':
+        result = {}
+        pos += 2
+        while True:
+            pos = _skip_whitespace(data, pos)
+            if data[pos:pos + 2] == b'>>':
+                return result, pos + 2
+            key, pos = parse_object(data, pos)
+            value, pos = parse_object(data, pos)
+            result[key[1:]] = value
+    if c == b'<':
+        end = data.find(b'>', pos)
+        hex_digits = re.sub(rb'\s', b'', bytes(data[pos + 1:end]))
+        if len(hex_digits) % 2:
+            hex_digits += b'0'
+        return bytes.fromhex(hex_digits.decode('ascii')), end + 1
+    if c == b'(':
+        return _parse_literal_string(data, pos + 1)
+    if c == b'[':
+        result = []
+        pos += 1
+        while True:
+            pos = _skip_whitespace(data, pos)
+            if data[pos:pos + 1] == b']':
+                return result, pos + 1
+            value, pos = parse_object(data, pos)
+            result.append(value)
+    ref = _REF.match(data, pos)
+    if ref:
+        return Ref(int(ref.group(1)), int(ref.group(2))), ref.end()
+    number = _NUMBER.match(data, pos)
+    if number:
+        text = number.group(0)
+        return (float(text) if b'.' in text else int(text)), number.end()
+    end = _TOKEN_END.search(data, pos)
+    end = end.start() if end else len(data)
+    keyword = bytes(data[pos:end])
+    if keyword in (b'true', b'false'):
+        return keyword == b'true', end
+    if keyword == b'null':
+        return None, end
+    raise ValueError(f'Unexpected token {keyword[:20]!r} at offset {pos}')
+
+
+# --- Cross-reference and trailer handling -----------------------------------
+
+def _parse_indirect_object(data, offset):
+    """Parse ``N G obj <object>`` at ``offset`` and return ``(value, end)``."""
+    header = re.compile(rb'\s*(\d+)\s+(\d+)\s+obj').match(data, offset)
+    if not header:
+        raise ValueError(f'No object at offset {offset}')
+    return parse_object(data, header.end())
+
+
+def _stream_data(data, stream_dict, pos):
+    """Return the decoded stream data following a stream dictionary."""
+    start = data.find(b'stream', pos) + len(b'stream')
+    if data[start:start + 2] == b'\r\n':
+        start += 2
+    elif data[start:start + 1] in (b'\n', b'\r'):
+        start += 1
+    length = stream_dict.get('Length')
+    if not isinstance(length, int):
+        length = data.find(b'endstream', start) - start
+    raw = bytes(data[start:start + length])
+    if stream_dict.get('Filter') in ('/FlateDecode', ['/FlateDecode']):
+        raw = zlib.decompress(raw)
+    parms = stream_dict.get('DecodeParms') or {}
+    if isinstance(parms, list):
+        parms = parms[0] or {}
+    predictor = parms.get('Predictor', 1)
+    if predictor >= 10:
+        raw = _png_unpredict(raw, parms.get('Columns', 1))
+    return raw
+
+
+def _png_unpredict(raw, columns):
+    """Undo PNG row predictors (as used by cross-reference streams)."""
+    out = bytearray()
+    previous = bytearray(columns)
+    for row_start in range(0, len(raw), columns + 1):
+        kind = raw[row_start]
+        row = bytearray(raw[row_start + 1:row_start + 1 + columns])
+        for i in range(len(row)):
+            left = row[i - 1] if i else 0
+            up = previous[i]
+            if kind == 1:
+                row[i] = (row[i] + left) & 0xFF
+            elif kind == 2:
+                row[i] = (row[i] + up) & 0xFF
+            elif kind == 3:
+                row[i] = (row[i] + ((left + up) >> 1)) & 0xFF
+            elif kind == 4:
+                upper_left = previous[i - 1] if i else 0
+                estimate = left + up - upper_left
+                pa, pb, pc = abs(estimate - left), abs(estimate - up), abs(estimate - upper_left)
+                if pa <= pb and pa <= pc:
+                    row[i] = (row[i] + left) & 0xFF
+                elif pb <= pc:
+                    row[i] = (row[i] + up) & 0xFF
+                else:
+                    row[i] = (row[i] + upper_left) & 0xFF
+        out += row
+        previous = row
+    return bytes(out)
+
+
+def _read_xref_section(data, offset):
+    """Read one cross-reference section.
+
+    Returns ``(trailer, offsets)`` where ``offsets`` maps object numbers
+    to byte offsets of uncompressed objects.
+    """
+    offsets = {}
+    pos = _skip_whitespace(data, offset)
+    if data[pos:pos + 4] == b'xref':
+        pos += 4
+        subsection = re.compile(rb'\s*(\d+)\s+(\d+)[ \t]*[\r\n]+')
+        entry = re.compile(rb'\s*(\d{10})\s+(\d{5})\s+([nf])')
+        while True:
+            header = subsection.match(data, pos)
+            if not header:
+                break
+            first, count = int(header.group(1)), int(header.group(2))
+            pos = header.end()
+            for num in range(first, first + count):
+                match = entry.match(data, pos)
+                if not match:
+                    break
+                if match.group(3) == b'n':
+                    offsets[num] = int(match.group(1))
+                pos = match.end()
+        pos = data.find(b'trailer', pos) + len(b'trailer')
+        trailer, _ = parse_object(data, pos)
+        return trailer, offsets
+
+    # Cross-reference stream (PDF 1.5+)
+    trailer, pos = _parse_indirect_object(data, pos)
+    widths = trailer['W']
+    index = trailer.get('Index', [0, trailer['Size']])
+    raw = _stream_data(data, trailer, pos)
+    row_size = sum(widths)
+    row = 0
+    for first, count in zip(index[::2], index[1::2]):
+        for num in range(first, first + count):
+            fields = []
+            col = row * row_size
+            for width in widths:
+                fields.append(int.from_bytes(raw[col:col + width], 'big') if width else None)
+                col += width
+            kind = 1 if fields[0] is None else fields[0]
+            if kind == 1:
+                offsets[num] = fields[1]
+            row += 1
+    return trailer, offsets
+
+
+def _find_trailer_and_offset(data, objnum=None):
+    """Return the newest trailer and the offset of object ``objnum``."""
+    startxref = data.rfind(b'startxref')
+    if startxref < 0:
+        raise ValueError('No startxref found')
+    offset, _ = parse_object(data, startxref + len(b'startxref'))
+    trailer = None
+    seen = set()
+    while isinstance(offset, int) and offset not in seen:
+        seen.add(offset)
+        section_trailer, offsets = _read_xref_section(data, offset)
+        if trailer is None:
+            trailer = section_trailer
+            if objnum is None:
+                objnum = _encrypt_objnum(trailer)
+        if objnum is None or objnum in offsets:
+            return trailer, offsets.get(objnum)
+        if isinstance(section_trailer.get('XRefStm'), int):
+            _, stream_offsets = _read_xref_section(data, section_trailer['XRefStm'])
+            if objnum in stream_offsets:
+                return trailer, stream_offsets[objnum]
+        offset = section_trailer.get('Prev')
+    return trailer, None
+
+
+def _encrypt_objnum(trailer):
+    encrypt = trailer.get('Encrypt')
+    return encrypt.num if isinstance(encrypt, Ref) else None
+
+
+def _scan_for_object(data, objnum):
+    """Fallback for broken cross-reference data: find the last definition."""
+    matches = list(re.finditer(rb'(?<![0-9])%d\s+\d+\s+obj' % objnum, data))
+    return matches[-1].start() if matches else None
+
+
+def _scan_for_trailer(data):
+    """Fallback trailer lookup when the cross-reference data is unusable.
+
+    Raises ValueError if an ``/Encrypt`` entry is present but unreadable,
+    or if no trailer can be parsed at all (a truncated file), so damaged
+    files are not mistaken for unencrypted ones.
+    """
+    encrypt_keys = list(re.finditer(rb'/Encrypt\s', data))
+    for match in reversed(encrypt_keys):
+        start = data.rfind(b'<<', 0, match.start())
+        while start >= 0:
+            try:
+                candidate, _ = parse_object(data, start)
+            except (ValueError, IndexError, KeyError):
+                candidate = None
+            if isinstance(candidate, dict) and 'Encrypt' in candidate:
+                return candidate
+            start = data.rfind(b'<<', 0, start)
+    if encrypt_keys:
+        raise ValueError('Damaged trailer: /Encrypt entry cannot be parsed')
+    # No /Encrypt anywhere; still require a trailer (classic or XRef stream dictionary)
+    for match in reversed(list(re.finditer(rb'trailer\s*<<|/Type\s*/XRef', data))):
+        start = match.end() - 2 if match.group().startswith(b'trailer') else data.rfind(b'<<', 0, match.start())
+        try:
+            candidate, _ = parse_object(data, start)
+        except (ValueError, IndexError, KeyError):
+            continue
+        if isinstance(candidate, dict) and 'Root' in candidate:
+            return candidate
+    raise ValueError('No trailer could be parsed (truncated or damaged file)')
+
+
+def _as_int(encrypt, key, default):
+    value = encrypt.get(key, default)
+    if not isinstance(value, int) or isinstance(value, bool):
+        raise ValueError(f'/Encrypt /{key} is not an integer: {value!r}')
+    return value
+
+
+def _as_name(value, key):
+    if not isinstance(value, str) or not value.startswith('/'):
+        raise ValueError(f'/Encrypt /{key} is not a name: {value!r}')
+    return value[1:]
+
+
+def _as_bytes(value):
+    return value if isinstance(value, bytes) else b''
+
+
+def read_encryption_params(pdf_path) -> Optional[EncryptionParams]:
+    """Read the ``/Encrypt`` dictionary of a PDF.
+
+    Returns ``None`` if the file is not encrypted; raises ValueError if the
+    trailer or the ``/Encrypt`` dictionary is damaged.
+    """
+    with open(pdf_path, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+        try:
+            trailer, offset = _find_trailer_and_offset(data)
+        except (ValueError, IndexError, KeyError, TypeError, AttributeError, zlib.error):
+            trailer, offset = _scan_for_trailer(data), None
+        if not isinstance(trailer, dict):
+            raise ValueError('Damaged trailer: not a dictionary')
+
+        encrypt = trailer.get('Encrypt')
+        if encrypt is None:
+            return None
+        if isinstance(encrypt, Ref):
+            if offset is None:
+                offset = _scan_for_object(data, encrypt.num)
+            if offset is None:
+                raise ValueError(f'Encrypt dictionary {encrypt.num} {encrypt.gen} R not found')
+            encrypt, _ = _parse_indirect_object(data, offset)
+
+        if not isinstance(encrypt, dict):
+            raise ValueError(f'/Encrypt is not a dictionary: {type(encrypt).__name__}')
+        ids = trailer.get('ID') or [b'']
+        stream_filter = None
+        crypt_filters = encrypt.get('CF') or {}
+        stmf = _as_name(encrypt.get('StmF', '/Identity'), 'StmF')
+        if isinstance(crypt_filters, dict) and isinstance(crypt_filters.get(stmf), dict):
+            stream_filter = _as_name(crypt_filters[stmf].get('CFM', '/None'), 'CFM')
+        sub_filter = encrypt.get('SubFilter')
+
+        return EncryptionParams(
+            filter=_as_name(encrypt.get('Filter', '/Standard'), 'Filter'),
+            sub_filter=_as_name(sub_filter, 'SubFilter') or None if sub_filter else None,
+            v=_as_int(encrypt, 'V', 0),
+            r=_as_int(encrypt, 'R', 0),
+            length=_as_int(encrypt, 'Length', 40),
+            o=_as_bytes(encrypt.get('O')),
+            u=_as_bytes(encrypt.get('U')),
+            oe=_as_bytes(encrypt.get('OE')),
+            ue=_as_bytes(encrypt.get('UE')),
+            p=_as_int(encrypt, 'P', 0),
+            perms=_as_bytes(encrypt.get('Perms')),
+            encrypt_metadata=encrypt.get('EncryptMetadata', True) is not False,
+            id0=_as_bytes(ids[0]) if isinstance(ids, list) and ids else b'',
+            stream_filter=stream_filter,
+        )
+
+
+# --- Cipher primitives ------------------------------------------------------
+
+def _rc4_python(key, data):
+    """Pure-Python RC4, used when the cryptography package is unavailable."""
+    state = list(range(256))
+    j = 0
+    key_length = len(key)
+    for i in range(256):
+        j = (j + state[i] + key[i % key_length]) & 0xFF
+        state[i], state[j] = state[j], state[i]
+    out = bytearray(len(data))
+    i = j = 0
+    for n, byte in enumerate(data):
+        i = (i + 1) & 0xFF
+        j = (j + state[i]) & 0xFF
+        state[i], state[j] = state[j], state[i]
+        out[n] = byte ^ state[(state[i] + state[j]) & 0xFF]
+    return bytes(out)
+
+
+def rc4(key: bytes, data: bytes) -> bytes:
+    """RC4-encrypt (or decrypt) ``data`` with ``key``."""
+    if ARC4 is None:
+        return _rc4_python(key, data)
+    return Cipher(ARC4(key), mode=None).encryptor().update(data)
+
+
+def _aes128_cbc_encrypt(key, iv, data):
+    encryptor = Cipher(algorithms.AES(key), modes.CBC(iv)).encryptor()
+    return encryptor.update(data) + encryptor.finalize()
+
+
+def _hash_r6(password, salt, udata):
+    """Algorithm 2.B from ISO 32000-2 (revision 6 password hash)."""
+    k = hashlib.sha256(password + salt + udata).digest()
+    hashes = (hashlib.sha256, hashlib.sha384, hashlib.sha512)
+    rounds = 0
+    while True:
+        e = _aes128_cbc_encrypt(k[:16], k[16:32], (password + k + udata) * 64)
+        # The first 16 bytes of E taken as a big-endian integer modulo 3
+        # equals the sum of those bytes modulo 3, since 256 % 3 == 1.
+        k = hashes[sum(e[:16]) % 3](e).digest()
+        rounds += 1
+        if rounds >= 64 and e[-1] <= rounds - 32:
+            return k[:32]
+
+
+def encode_password(password: str, revision: int) -> bytes:
+    """Encode a password the way the security handler expects it."""
+    if revision >= 5:
+        return password.encode('utf-8')[:127]
+    try:
+        return password.encode('latin-1')[:32]
+    except UnicodeEncodeError:
+        return password.encode('utf-8')[:32]
+
+
+def decode_password(password: bytes, revision: int) -> str:
+    """Inverse of encode_password, for reporting byte candidates."""
+    if revision >= 5:
+        try:
+            return password.decode('utf-8')
+        except UnicodeDecodeError:
+            pass
+    return password.decode('latin-1')
+
+
+# --- Verifier ---------------------------------------------------------------
+
+class PasswordVerifier:
+    """Checks candidate user passwords against one PDF's encryption parameters."""
+
+    def __init__(self, params: EncryptionParams):
+        if params.filter != 'Standard':
+            raise UnsupportedEncryptionError(
+                f'Security handler /{params.filter} is not the standard password handler')
+        if params.r not in (2, 3, 4, 5, 6):
+            raise UnsupportedEncryptionError(f'Unsupported security handler revision R{params.r}')
+        if params.r == 6 and Cipher is None:
+            raise UnsupportedEncryptionError('Revision 6 needs the cryptography package')
+
+        self.params = params
+        self.revision = params.r
+        self.key_length = params.key_length
+
+        if self.revision <= 4:
+            o = params.o[:32]
+            rest = struct.pack('<I', params.p & 0xFFFFFFFF) + params.id0
+            if self.revision >= 4 and not params.encrypt_metadata:
+                rest += b'\xff\xff\xff\xff'
+            # Algorithm 2 hashes padded password + O + P + ID; everything after
+            # O is kept separately so targets sharing O can share that block
+            self.o_value = o
+            self.key_rest = rest
+            self._key_tail = o + rest
+            if self.revision == 2:
+                self._u_check = params.u[:32]
+            else:
+                self._u_seed = hashlib.md5(PASSWORD_PADDING + params.id0).digest()
+                self._u_check = params.u[:16]
+        else:
+            self._u_hash = params.u[:32]
+            self._u_salt = params.u[32:40]
+
+    @classmethod
+    def from_file(cls, pdf_path):
+        """Build a verifier for a PDF file, or raise if it is not encrypted."""
+        params = read_encryption_params(pdf_path)
+        if params is None:
+            raise UnsupportedEncryptionError(f'{pdf_path} is not encrypted')
+        return cls(params)
+
+    def compute_file_key(self, password: bytes) -> bytes:
+        """Algorithm 2: derive the RC4/AES-128 file key from a user password."""
+        return self.finish_file_key(
+            hashlib.md5((password + PASSWORD_PADDING)[:32] + self._key_tail).digest())
+
+    def finish_file_key(self, digest: bytes) -> bytes:
+        """Algorithm 2 steps after the first MD5: re-hashing (R3+) and truncation."""
+        n = self.key_length
+        if self.revision >= 3:
+            for _ in range(50):
+                digest = hashlib.md5(digest[:n]).digest()
+        return digest[:n]
+
+    def check_file_key(self, key: bytes) -> bool:
+        """Check a revision 2-4 file key against the /U value."""
+        if self.revision == 2:
+            return rc4(key, PASSWORD_PADDING) == self._u_check
+        value = rc4(key, self._u_seed)
+        for i in range(1, 20):
+            value = rc4(key.translate(_XOR_TABLES[i]), value)
+        return value == self._u_check
+
+    def check_bytes(self, password: bytes) -> bool:
+        """Check an already encoded candidate user password."""
+        if self.revision <= 4:
+            return self.check_file_key(self.compute_file_key(password[:32]))
+        password = password[:127]
+        if self.revision == 5:
+            return hashlib.sha256(password + self._u_salt).digest() == self._u_hash
+        return _hash_r6(password, self._u_salt, b'') == self._u_hash
+
+    def check(self, password: str) -> bool:
+        """Check a candidate user password."""
+        return self.check_bytes(encode_password(password, self.revision))
+
+    def check_owner(self, password: str) -> bool:
+        """Check a candidate owner password."""
+        params = self.params
+        pw = encode_password(password, self.revision)
+        if self.revision >= 5:
+            salt, u48 = params.o[32:40], params.u[:48]
+            if self.revision == 5:
+                digest = hashlib.sha256(pw + salt + u48).digest()
+            else:
+                digest = _hash_r6(pw, salt, u48)
+            return digest == params.o[:32]
+
+        digest = hashlib.md5((pw + PASSWORD_PADDING)[:32]).digest()
+        n = self.key_length
+        if self.revision >= 3:
+            for _ in range(50):
+                digest = hashlib.md5(digest).digest()
+        key = digest[:n]
+        user = params.o[:32]
+        if self.revision == 2:
+            user = rc4(key, user)
+        else:
+            for i in range(19, -1, -1):
+                user = rc4(key.translate(_XOR_TABLES[i]), user)
+        return self.check_bytes(user)
+
+
+class MultiTargetVerifier:
+    """Checks each candidate against several targets at once.
+
+    Work that does not depend on the file is done once per candidate: the
+    password is encoded and padded once, and for revision 2-4 targets the
+    MD5 state after hashing the padded password and O is computed once per
+    distinct O and copied for every target sharing it (O only depends on
+    the owner and user passwords, so documents from the same source often
+    share it even though their /ID differs).
+    """
+
+    def __init__(self, params_list):
+        self.verifiers = [PasswordVerifier(params) for params in params_list]
+        self._legacy = {}
+        self._modern = []
+        for index, verifier in enumerate(self.verifiers):
+            if verifier.revision <= 4:
+                self._legacy.setdefault(verifier.o_value, []).append((index, verifier))
+            else:
+                self._modern.append((index, verifier))
+
+    def __len__(self):
+        return len(self.verifiers)
+
+    def _check_legacy(self, password, solved, hits):
+        padded = (password[:32] + PASSWORD_PADDING)[:32]
+        for o_value, members in self._legacy.items():
+            prefix = None
+            for index, verifier in members:
+                if solved is not None and solved[index]:
+                    continue
+                if prefix is None:
+                    prefix = hashlib.md5(padded + o_value)
+                state = prefix.copy()
+                state.update(verifier.key_rest)
+                if verifier.check_file_key(verifier.finish_file_key(state.digest())):
+                    hits.append(index)
+
+    def _check_modern(self, password, solved, hits):
+        for index, verifier in self._modern:
+            if solved is not None and solved[index]:
+                continue
+            if verifier.check_bytes(password):
+                hits.append(index)
+
+    def check_bytes(self, password: bytes, solved=None):
+        """Return the indices of the targets an encoded ``password`` opens.
+
+        ``solved`` is an optional sequence of flags; targets whose flag is
+        set are skipped.
+        """
+        hits = []
+        if self._legacy:
+            self._check_legacy(password, solved, hits)
+        if self._modern:
+            self._check_modern(password, solved, hits)
+        return hits
+
+    def check(self, password: str, solved=None):
+        """Return the indices of the targets a str password opens."""
+        hits = []
+        # Encoding differs between revision families, so encode once per family
+        if self._legacy:
+            self._check_legacy(encode_password(password, 4), solved, hits)
+        if self._modern:
+            self._check_modern(encode_password(password, 6), solved, hits)
+        return hits
+
+
+def confirm_password(pdf_path, password: str) -> bool:
+    """Confirm a password by actually opening the file with pikepdf."""
+    import pikepdf
+    try:
+        with pikepdf.open(pdf_path, password=password):
+            return True
+    except (pikepdf.PasswordError, pikepdf.PdfError):
+        return False
+
+
+def main():
+    if len(sys.argv) < 2:
+        print("Usage: python pdf_security.py <pdf_file> [password ...]")
+        sys.exit(1)
+
+    pdf_file = Path(sys.argv[1])
+    params = read_encryption_params(pdf_file)
+    if params is None:
+        print(f"{pdf_file.name}: not encrypted")
+        return
+
+    print(f"{pdf_file.name}: /{params.filter} V{params.v} R{params.r} "
+          f"{params.cipher} P={params.p} EncryptMetadata={params.encrypt_metadata}")
+    if len(sys.argv) > 2:
+        verifier = PasswordVerifier(params)
+        for password in sys.argv[2:]:
+            result = 'user' if verifier.check(password) else (
+                'owner' if verifier.check_owner(password) else 'no match')
+            print(f"  '{password}': {result}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,130 @@
+#!/usr/bin/env python3
+"""Potfile of recovered passwords, keyed by encryption fingerprint.
+
+Every recovered password is appended to a JSON-lines file together with
+the fingerprint of the target's encryption parameters (/ID, O, U, R,
+Length; see ``EncryptionParams.fingerprint``). A file that was cracked
+before - under any name - is then opened straight away, and the recovered
+passwords double as a priority list for new targets, most reused first,
+since one source tends to reuse the same few passwords.
+
+The default location is ``results/pdf.potfile`` in the repository; set
+``PDF_POTFILE`` to use another file.
+
+Usage:
+    python potfile.py [<pdf_file> ...]
+"""
+
+import json
+import os
+import sys
+import time
+from collections import Counter
+from pathlib import Path
+
+from pdf_security import PasswordVerifier, UnsupportedEncryptionError, read_encryption_params
+
+DEFAULT_POTFILE = Path(__file__).resolve().parent.parent / 'results' / 'pdf.potfile'
+
+
+def potfile_path():
+    """The potfile in use: ``$PDF_POTFILE`` or the repository default."""
+    return Path(os.environ.get('PDF_POTFILE', DEFAULT_POTFILE))
+
+
+class Potfile:
+    """Fingerprint -> password map backed by an append-only file."""
+
+    def __init__(self, path=None):
+        self.path = Path(path) if path else potfile_path()
+        self.entries = {}
+        self._uses = Counter()
+        if self.path.exists():
+            with open(self.path, encoding='utf-8') as f:
+                for line in f:
+                    try:
+                        entry = json.loads(line)
+                        fingerprint, password = entry['fingerprint'], entry['password']
+                    except (ValueError, KeyError, TypeError):
+                        continue  # Skip a torn or foreign line
+                    if fingerprint not in self.entries:
+                        self._uses[password] += 1
+                    self.entries[fingerprint] = password
+
+    def __len__(self):
+        return len(self.entries)
+
+    def lookup(self, params):
+        """Return the recovered password for these parameters, or None."""
+        return self.entries.get(params.fingerprint())
+
+    def add(self, params, password, source=None):
+        """Record a recovered password (one appended line per new target)."""
+        fingerprint = params.fingerprint()
+        if self.entries.get(fingerprint) == password:
+            return
+        if fingerprint not in self.entries:
+            self._uses[password] += 1
+        self.entries[fingerprint] = password
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        line = json.dumps({'fingerprint': fingerprint, 'password': password,
+                           'file': str(source) if source else None,
+                           'time': time.strftime('%Y-%m-%dT%H:%M:%S')}, ensure_ascii=False)
+        # One short O_APPEND write per entry, so concurrent crackers don't interleave
+        with open(self.path, 'a', encoding='utf-8') as f:
+            f.write(line + '\n')
+
+    def priority_passwords(self):
+        """Recovered passwords, most reused first."""
+        return [password for password, _ in self._uses.most_common()]
+
+
+def try_known_passwords(verifier, potfile=None):
+    """Check the potfile entry and the priority list against one target.
+
+    Returns the password if one of them opens the file, else None. A
+    priority-list hit is recorded under the new target's fingerprint.
+    """
+    potfile = potfile if potfile is not None else Potfile()
+    known = potfile.lookup(verifier.params)
+    if known is not None and verifier.check(known):
+        return known
+    for password in potfile.priority_passwords():
+        if verifier.check(password):
+            potfile.add(verifier.params, password)
+            return password
+    return None
+
+
+def known_password(pdf_file, potfile=None):
+    """Potfile shortcut for a PDF path; None if unknown or not crackable here."""
+    try:
+        verifier = PasswordVerifier.from_file(pdf_file)
+    except (UnsupportedEncryptionError, ValueError, OSError):
+        return None
+    return try_known_passwords(verifier, potfile)
+
+
+def record_password(pdf_file, password, potfile=None):
+    """Record a password recovered for a PDF path."""
+    try:
+        params = read_encryption_params(pdf_file)
+    except (ValueError, OSError):
+        return
+    if params is not None:
+        (potfile if potfile is not None else Potfile()).add(params, password, Path(pdf_file).name)
+
+
+def main():
+    potfile = Potfile()
+    print(f"🗂️  Potfile: {potfile.path} ({len(potfile)} entries)")
+    for pdf_file in sys.argv[1:]:
+        password = known_password(pdf_file, potfile)
+        if password is None:
+            print(f"❌ {pdf_file}: not in potfile")
+        else:
+            print(f"✅ {pdf_file}: '{password}'")
+
+
+if __name__ == '__main__':
+    main()
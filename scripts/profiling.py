@@ -0,0 +1,210 @@
+#!/usr/bin/env python3
+"""cProfile across the parent and every pool worker of a cracking run.
+
+Each worker starts a profiler in its pool initializer, so the executor's
+own loop - unpickling tasks, pickling results - is measured along with
+the task itself, and dumps its stats once, when the worker exits. When
+the pool is done the parent merges the worker dumps, and once the script
+has printed its own summary, reports where the time went on stderr:
+
+    generation     candidate lists, masks, wordlists, rules
+    ipc            pickling, queues, pool and task scheduling
+    verification   key derivation, RC4/AES checks, pikepdf, worker loop
+    reporting      progress, checkpoints, metrics, potfile
+    idle           blocked waiting on locks, pipes and sleeps
+
+Functions are put in a category by module, or else inherit the category
+of their heaviest caller (NumPy ufuncs called by the batch verifier count
+as verification, by the mask decoder as generation). Arguments are
+pickled by the executor's feeder threads in the parent, which cProfile
+does not see; the worker side of IPC is complete.
+"""
+
+import atexit
+import cProfile
+import multiprocessing.util
+import os
+import pstats
+import shutil
+import sys
+import tempfile
+from pathlib import Path
+
+DEFAULT_TOP = 25
+CATEGORIES = ('generation', 'ipc', 'verification', 'reporting', 'idle', 'other')
+
+# Path fragments of modules that belong to one category
+MODULE_CATEGORIES = (
+    ('generation', ('mask.py', 'keyspace.py', 'wordlist.py', 'rules.py', 'dedup.py', 'markov.py')),
+    ('verification', ('pdf_security.py', 'batch_verifier.py', 'crack_worker.py', '/pikepdf/',
+                      'hashlib.py', '/cryptography/')),
+    ('reporting', ('checkpoint.py', 'metrics.py', 'potfile.py', '/json/')),
+    ('ipc', ('/multiprocessing/', '/concurrent/futures/', 'pickle.py', 'copyreg.py', 'queue.py',
+             'selectors.py', 'threading.py', 'profiling.py')),
+)
+# Functions outside those modules, by name
+FUNCTION_CATEGORIES = {
+    'print_progress': 'reporting',
+    'keyspace_tasks': 'generation',
+    'list_tasks': 'generation',
+    'skip_covered': 'generation',
+    'run_tasks': 'ipc',
+    'timed_call': 'ipc',
+}
+# Built-ins that block rather than compute
+IDLE_BUILTINS = ("'acquire' of '_thread.lock'", "'acquire' of '_thread.RLock'", "'poll' of 'select.poll'",
+                 'select.select', 'time.sleep', 'posix.read', 'posix.waitpid')
+
+# Per-process state set up by init_profiled_worker
+_profile = None
+_profile_path = None
+
+
+def init_profiled_worker(directory, initializer, initargs):
+    """Pool initializer: start profiling this worker, then run the real initializer.
+
+    The stats are written once, by a multiprocessing finalizer that runs
+    when the worker process exits (also on KeyboardInterrupt).
+    """
+    global _profile, _profile_path
+    _profile_path = Path(directory) / f"worker-{os.getpid()}.prof"
+    _profile = cProfile.Profile()
+    multiprocessing.util.Finalize(None, _dump_worker_profile, exitpriority=100)
+    _profile.enable()
+    initializer(*initargs)
+
+
+def _dump_worker_profile():
+    _profile.disable()
+    try:
+        _profile.dump_stats(_profile_path)
+    except OSError:
+        # The parent has already reported and removed the directory
+        pass
+
+
+def _rule_category(key):
+    filename, _, name = key
+    if filename == '~':
+        return 'idle' if any(builtin in name for builtin in IDLE_BUILTINS) else None
+    if name.startswith('generate_'):
+        return 'generation'
+    if name in FUNCTION_CATEGORIES:
+        return FUNCTION_CATEGORIES[name]
+    path = filename.replace(os.sep, '/')
+    for category, fragments in MODULE_CATEGORIES:
+        if any(fragment in path for fragment in fragments):
+            return category
+    return None
+
+
+def categorize(stats):
+    """Return ``{function key: category}`` for every function in a pstats.Stats."""
+    categories = {}
+
+    def category_of(key, seen):
+        if key in categories:
+            return categories[key]
+        category = _rule_category(key)
+        if category is None:
+            callers = stats.stats[key][4]
+            # Inherit from the caller that spent the most time calling this function
+            heaviest = max(callers, key=lambda caller: callers[caller][3], default=None)
+            if heaviest is None or heaviest in seen:
+                category = 'other'
+            else:
+                category = category_of(heaviest, seen | {key})
+        categories[key] = category
+        return category
+
+    for key in stats.stats:
+        category_of(key, frozenset())
+    return categories
+
+
+def category_totals(stats):
+    """Self time per category, in seconds."""
+    totals = dict.fromkeys(CATEGORIES, 0.0)
+    for key, category in categorize(stats).items():
+        totals[category] += stats.stats[key][2]
+    return totals
+
+
+class RunProfiler:
+    """Profile the parent and the pool workers of one run.
+
+    The parent is profiled from construction, so work done before the pool
+    starts (generating candidate lists) is included. Leaving the context
+    stops profiling the parent; the worker stats are collected and the
+    report printed to stderr when the script exits, after the pool's
+    workers have written their dumps, so it never buries the run's result.
+    Disabled (``top=None``) it passes the pool initializer through
+    unchanged, so call sites need no conditionals.
+    """
+
+    def __init__(self, top=None):
+        self.top = top
+        self.enabled = top is not None
+        self.directory = Path(tempfile.mkdtemp(prefix='pdf-profile-')) if self.enabled else None
+        self._parent = cProfile.Profile() if self.enabled else None
+        if self.enabled:
+            self._parent.enable()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if self.enabled:
+            self._parent.disable()
+            atexit.register(self.report)
+
+    def pool(self, initializer, initargs):
+        """``(initializer, initargs)`` for a ProcessPoolExecutor."""
+        if not self.enabled:
+            return initializer, initargs
+        return init_profiled_worker, (str(self.directory), initializer, initargs)
+
+    def _collect_workers(self):
+        """``(worker count, merged pstats.Stats or None)``; removes the dump directory."""
+        try:
+            worker_files = sorted(str(path) for path in self.directory.glob('worker-*.prof'))
+            return len(worker_files), pstats.Stats(*worker_files) if worker_files else None
+        finally:
+            shutil.rmtree(self.directory, ignore_errors=True)
+
+    def report(self, file=None):
+        """Print the category split and the top functions by self time (to stderr)."""
+        atexit.unregister(self.report)
+        file = file or sys.stderr
+        parent = pstats.Stats(self._parent)
+        worker_count, workers = self._collect_workers()
+
+        print(f"\n🔬 Profile: parent + {worker_count} workers", file=file)
+        columns = [('parent', category_totals(parent))]
+        if workers is not None:
+            columns.append(('workers', category_totals(workers)))
+        print(f"   {'':<14}" + ''.join(f"{name:>16}" for name, _ in columns), file=file)
+        for category in CATEGORIES:
+            cells = []
+            for _, totals in columns:
+                share = totals[category] / (sum(totals.values()) or 1) * 100
+                cells.append(f"{totals[category]:>9.2f}s {share:>4.0f}%")
+            print(f"   {category:<14}" + ''.join(f"{cell:>16}" for cell in cells), file=file)
+
+        combined = pstats.Stats(self._parent)
+        if workers is not None:
+            combined.add(workers)
+        categories = categorize(combined)
+        ranked = sorted(combined.stats.items(), key=lambda item: item[1][2], reverse=True)
+        print(f"\n   Top {self.top} functions by self time (all processes):", file=file)
+        print(f"   {'self':>9} {'cumulative':>11} {'calls':>10}  {'category':<13} function", file=file)
+        for key, (_, calls, self_time, cumulative, _) in ranked[:self.top]:
+            print(f"   {self_time:>8.3f}s {cumulative:>10.3f}s {calls:>10,}  {categories[key]:<13} "
+                  f"{pstats.func_std_string(pstats.func_strip_path(key))}", file=file)
+
+
+def add_profile_arguments(parser):
+    """Add the --profile option to an argparse parser."""
+    parser.add_argument('--profile', type=int, nargs='?', const=DEFAULT_TOP, metavar='TOP',
+                        help=f'Profile the parent and every worker; print the top functions '
+                             f'(default: {DEFAULT_TOP}) on stderr after the run')
@@ -0,0 +1,213 @@
+#!/usr/bin/env python3
+"""Exhaustive 40-bit RC4 key search for revision 2 PDFs.
+
+A 40-bit file is protected by its 5-byte RC4 file key, not by the
+password: however long the password, there are only 2^40 keys. This
+searches the key space directly against the /U value - RC4 of the
+padding string for R2 - so the worst case is bounded no matter what the
+password looks like. Keys are checked in vectorized blocks against the
+first bytes of /U and confirmed in full; the key space is leased to the
+workers in ranges and checkpointed like the password attacks.
+
+The recovered key decrypts the document without any password, through
+``qpdf --password-is-hex-key``. 40-bit R3/R4 files are searched too, but
+their 20-round U check makes every key 20 times more expensive.
+
+Usage:
+    python rc4_key_search.py <pdf_file> [--processes N] [--checkpoint FILE] [--resume]
+"""
+
+import argparse
+import multiprocessing as mp
+import shutil
+import subprocess
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import nullcontext
+from pathlib import Path
+
+import numpy as np
+import pikepdf
+
+from batch_verifier import DEFAULT_BATCH_SIZE, BatchVerifier
+from checkpoint import CheckpointError, default_checkpoint_path, open_checkpoint
+from crack_runner import keyspace_tasks, run_tasks
+from crack_worker import PREFIX_BYTES, init_worker, try_key_range
+from metrics import add_metrics_arguments, metrics_from_args
+from pdf_security import PasswordVerifier, UnsupportedEncryptionError
+from potfile import record_password, try_known_passwords
+from profiling import RunProfiler, add_profile_arguments
+
+KEY_BYTES = 5
+# Key-search tasks are long and uniform, so lease bigger ranges than the
+# password attacks to keep checkpoint and scheduling overhead negligible
+TASK_SECONDS = 10
+
+
+class RC4KeyKeyspace:
+    """Every 5-byte RC4 key, numbered as big-endian integers."""
+
+    # Keys are raw bytes, not passwords
+    encoded = True
+    size = 1 << (8 * KEY_BYTES)
+
+    def __repr__(self):
+        return f"RC4KeyKeyspace({KEY_BYTES * 8}-bit)"
+
+    def ranges(self, chunk_size, start=0, end=None):
+        """Yield ``(start, end)`` index ranges covering ``[start, end)``."""
+        end = self.size if end is None else end
+        for lo in range(start, end, chunk_size):
+            yield lo, min(lo + chunk_size, end)
+
+    def blocks(self, start, end, block_size=DEFAULT_BATCH_SIZE):
+        """Yield ``(offset, keys)`` with ``keys`` an ``(N, 5)`` uint8 array."""
+        shifts = np.arange(8 * (KEY_BYTES - 1), -1, -8, dtype=np.uint64)
+        for lo in range(start, end, block_size):
+            indices = np.arange(lo, min(lo + block_size, end), dtype=np.uint64)
+            yield lo, ((indices[:, None] >> shifts) & np.uint64(0xFF)).astype(np.uint8)
+
+    def candidates(self, start, end):
+        """Yield the keys in ``[start, end)`` as bytes."""
+        for index in range(start, end):
+            yield index.to_bytes(KEY_BYTES, 'big')
+
+
+def calibrated_key_chunk(params, seconds=TASK_SECONDS):
+    """Keys per task so one task takes roughly ``seconds`` on one core."""
+    batch = BatchVerifier(params)
+    keys = next(RC4KeyKeyspace().blocks(0, DEFAULT_BATCH_SIZE))[1]
+    tested = 0
+    start = time.perf_counter()
+    while time.perf_counter() - start < 0.2:
+        batch.check_keys(keys, PREFIX_BYTES)
+        tested += len(keys)
+    rate = tested / (time.perf_counter() - start)
+    chunk = max(DEFAULT_BATCH_SIZE, int(rate * seconds))
+    return chunk - chunk % DEFAULT_BATCH_SIZE, rate
+
+
+def decrypt_with_key(pdf_file, key_hex):
+    """Decrypt with the recovered file key through qpdf; return the output path or None."""
+    output_file = pdf_file.with_name(f"{pdf_file.stem}_decrypted.pdf")
+    command = ['qpdf', '--password-is-hex-key', f'--password={key_hex}', '--decrypt',
+               str(pdf_file), str(output_file)]
+    if shutil.which('qpdf') is None:
+        print("❌ qpdf is not installed; decrypt with:")
+        print(f"   {' '.join(command)}")
+        return None
+
+    print(f"\n💾 Decrypting with the file key...")
+    result = subprocess.run(command, capture_output=True, text=True)
+    # qpdf exits with 3 for warnings; the output is still written
+    if result.returncode not in (0, 3):
+        print(f"❌ qpdf failed: {result.stderr.strip()}")
+        return None
+    print(f"✅ Decrypted PDF saved as: {output_file}")
+
+    try:
+        with pikepdf.open(output_file) as verify_pdf:
+            pages = len(verify_pdf.pages)
+            print(f"✅ Verification successful: {pages} pages, no password required")
+    except Exception as e:
+        print(f"⚠️  Verification failed: {e}")
+    return output_file
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Exhaustive 40-bit RC4 key search')
+    parser.add_argument('pdf_file', help='40-bit RC4 encrypted PDF (revision 2)')
+    parser.add_argument('--processes', type=int, default=mp.cpu_count(),
+                        help='Worker processes (default: all cores)')
+    parser.add_argument('--checkpoint', help='Checkpoint file (default: <pdf_stem>.checkpoint.json next to the PDF)')
+    parser.add_argument('--resume', action='store_true', help='Continue from the checkpoint file')
+    add_metrics_arguments(parser)
+    add_profile_arguments(parser)
+    args = parser.parse_args()
+
+    pdf_file = Path(args.pdf_file)
+    if not pdf_file.exists():
+        print(f"Error: {pdf_file} does not exist")
+        sys.exit(1)
+
+    try:
+        verifier = PasswordVerifier.from_file(pdf_file)
+        params = verifier.params
+    except (UnsupportedEncryptionError, ValueError) as e:
+        print(f"Error: {e}")
+        sys.exit(1)
+    if params.r > 4 or params.key_length != KEY_BYTES:
+        print(f"Error: {pdf_file} uses {params.cipher} (R{params.r}); key search needs a 40-bit RC4 key")
+        sys.exit(1)
+
+    # A known password is much quicker than a key search
+    password = try_known_passwords(verifier)
+    if password is not None:
+        print(f"🗂️  Password found in potfile: '{password}'")
+        output_file = pdf_file.with_name(f"{pdf_file.stem}_decrypted.pdf")
+        with pikepdf.open(pdf_file, password=password) as pdf:
+            pdf.save(output_file)
+        record_password(pdf_file, password)
+        print(f"✅ Decrypted PDF saved as: {output_file}")
+        return
+
+    checkpoint_path = Path(args.checkpoint) if args.checkpoint else default_checkpoint_path(pdf_file)
+    try:
+        checkpoint = open_checkpoint(checkpoint_path, params.fingerprint(), args.resume)
+    except (CheckpointError, ValueError, OSError) as e:
+        print(f"Error: {e}")
+        sys.exit(1)
+
+    keyspace = RC4KeyKeyspace()
+    strategy = repr(keyspace)
+    num_processes = args.processes
+    chunk_size, rate = calibrated_key_chunk(params)
+    already_tested = checkpoint.tested(strategy)
+    remaining = keyspace.size - already_tested
+
+    print(f"🔑 RC4 Key Search")
+    print(f"📁 Target: {pdf_file} (R{params.r}, {params.cipher})")
+    print(f"⚡ Using {num_processes} CPU cores, ~{rate:,.0f} keys/sec per core")
+    print(f"📊 Key space: {keyspace.size:,} keys, worst case "
+          f"{remaining / (rate * num_processes) / 3600:,.1f} hours")
+    if already_tested:
+        print(f"⏩ Resuming: {already_tested:,} keys already tested")
+    print()
+
+    stop_event = mp.Event()
+    metrics = metrics_from_args(args, pdf_file)
+    profiler = RunProfiler(args.profile)
+    initializer, initargs = profiler.pool(init_worker, (pdf_file, params, stop_event, (keyspace,)))
+    start_time = time.time()
+    with profiler, ProcessPoolExecutor(max_workers=num_processes, initializer=initializer,
+                                       initargs=initargs) as executor, \
+            (metrics or nullcontext()):
+        try:
+            key_hex, keys_tested = run_tasks(
+                executor, try_key_range, keyspace_tasks(0, keyspace, chunk_size, checkpoint, strategy),
+                num_processes * 2, keyspace.size, checkpoint, strategy, already_tested, unit='keys',
+                metrics=metrics)
+        except KeyboardInterrupt:
+            stop_event.set()
+            checkpoint.save()
+            print(f"\n⏹️  Interrupted by user")
+            print(f"💾 Progress saved to {checkpoint.path}; continue with --resume")
+            return
+
+    elapsed = time.time() - start_time
+    if key_hex is None:
+        # Only possible if the file is not what its /Encrypt dictionary says
+        checkpoint.mark_complete(strategy)
+        checkpoint.save()
+        print(f"\n❌ Key space exhausted in {elapsed:.2f}s without a match")
+        sys.exit(1)
+
+    print(f"\n🎉 SUCCESS! File key found: {key_hex}")
+    print(f"⏱️  Time: {elapsed:.2f} seconds, {keys_tested:,} keys tested")
+    checkpoint.remove()
+    decrypt_with_key(pdf_file, key_hex)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,329 @@
+#!/usr/bin/env python3
+"""Hashcat/John-compatible password mangling rules.
+
+A rule is a string of single-letter functions applied left to right, e.g.
+``c $1 $2 $3`` (capitalize, then append "123") or ``sa@ so0`` (leetspeak).
+Positions are ``0-9`` then ``A-Z`` for 10-35. Rules work on ``str`` and on
+encoded ``bytes`` candidates alike, so they can be applied to memory-mapped
+wordlists inside the workers without decoding.
+
+Where hashcat and John differ, hashcat's behaviour is followed, so a rule
+file gives the same candidates here and with ``gpu_crack.py``. Notably the
+length rejections are inclusive: ``<N`` keeps words of at most N
+characters and ``>N`` words of at least N (John keeps ``< N`` and ``> N``).
+
+Usage:
+    python rules.py <rule_file> <word> [<word> ...]
+"""
+
+import argparse
+import hashlib
+import sys
+from functools import partial
+
+# Rules whose result is longer than this are rejected, like hashcat does
+MAX_LENGTH = 256
+
+
+class RuleError(ValueError):
+    """Raised for rule text that cannot be parsed."""
+
+
+def _position(char):
+    if char.isdigit():
+        return int(char)
+    if 'A' <= char <= 'Z':
+        return ord(char) - ord('A') + 10
+    raise RuleError(f"invalid position {char!r}")
+
+
+# --- Rule functions ---------------------------------------------------------
+#
+# Each function takes the word first; character arguments are converted to
+# the word's type (str or bytes) when a rule is compiled. Positions out of
+# range leave the word unchanged, as in hashcat.
+
+def _toggle_at(w, n):
+    return w[:n] + w[n:n + 1].swapcase() + w[n + 1:]
+
+
+def _rotate_left(w):
+    return w[1:] + w[:1]
+
+
+def _rotate_right(w):
+    return w[-1:] + w[:-1]
+
+
+def _delete_at(w, n):
+    return w[:n] + w[n + 1:]
+
+
+def _extract(w, n, m):
+    return w[n:n + m] if n < len(w) else w
+
+
+def _omit(w, n, m):
+    return w[:n] + w[n + m:] if n < len(w) else w
+
+
+def _insert(w, n, x):
+    return w[:n] + x + w[n:] if n <= len(w) else w
+
+
+def _overwrite(w, n, x):
+    return w[:n] + x + w[n + 1:] if n < len(w) else w
+
+
+def _dup_first(w, n):
+    return w[:1] * n + w
+
+
+def _dup_last(w, n):
+    return w + w[-1:] * n
+
+
+def _dup_chars(w):
+    return w[:0].join(w[i:i + 1] * 2 for i in range(len(w)))
+
+
+def _swap(w, n, m):
+    if n >= len(w) or m >= len(w):
+        return w
+    n, m = min(n, m), max(n, m)
+    return w[:n] + w[m:m + 1] + w[n + 1:m] + w[n:n + 1] + w[m + 1:]
+
+
+def _from_code(w, code):
+    """Build a one-character str or bytes matching the word's type."""
+    return chr(code) if isinstance(w, str) else bytes((code,))
+
+
+def _shift_char(w, n, delta):
+    if n >= len(w):
+        return w
+    return w[:n] + _from_code(w, (ord(w[n:n + 1]) + delta) & 0xFF) + w[n + 1:]
+
+
+def _bitshift_char(w, n, left):
+    if n >= len(w):
+        return w
+    code = ord(w[n:n + 1])
+    code = (code << 1) & 0xFF if left else code >> 1
+    return w[:n] + _from_code(w, code) + w[n + 1:]
+
+
+def _replace_next(w, n):
+    return w[:n] + w[n + 1:n + 2] + w[n + 1:] if n + 1 < len(w) else w
+
+
+def _replace_prev(w, n):
+    return w[:n] + w[n - 1:n] + w[n + 1:] if 0 < n < len(w) else w
+
+
+def _title(w, sep=None):
+    if sep is None:
+        sep = ' ' if isinstance(w, str) else b' '
+    return sep.join(part[:1].upper() + part[1:] for part in w.lower().split(sep))
+
+
+def _reject_unless(w, test):
+    return w if test(w) else None
+
+
+# letter -> (argument kinds, builder); 'n' is a position, 'c' a character
+_FUNCTIONS = {
+    ':': ('', lambda: lambda w: w),
+    ' ': ('', lambda: lambda w: w),
+    'l': ('', lambda: lambda w: w.lower()),
+    'u': ('', lambda: lambda w: w.upper()),
+    'c': ('', lambda: lambda w: w[:1].upper() + w[1:].lower()),
+    'C': ('', lambda: lambda w: w[:1].lower() + w[1:].upper()),
+    't': ('', lambda: lambda w: w.swapcase()),
+    'T': ('n', lambda n: partial(_toggle_at, n=n)),
+    'r': ('', lambda: lambda w: w[::-1]),
+    'd': ('', lambda: lambda w: w + w),
+    'p': ('n', lambda n: lambda w: w * (n + 1)),
+    'f': ('', lambda: lambda w: w + w[::-1]),
+    '{': ('', lambda: _rotate_left),
+    '}': ('', lambda: _rotate_right),
+    '$': ('c', lambda x: lambda w: w + x),
+    '^': ('c', lambda x: lambda w: x + w),
+    '[': ('', lambda: lambda w: w[1:]),
+    ']': ('', lambda: lambda w: w[:-1]),
+    'D': ('n', lambda n: partial(_delete_at, n=n)),
+    'x': ('nn', lambda n, m: partial(_extract, n=n, m=m)),
+    'O': ('nn', lambda n, m: partial(_omit, n=n, m=m)),
+    'i': ('nc', lambda n, x: partial(_insert, n=n, x=x)),
+    'o': ('nc', lambda n, x: partial(_overwrite, n=n, x=x)),
+    "'": ('n', lambda n: lambda w: w[:n]),
+    's': ('cc', lambda x, y: lambda w: w.replace(x, y)),
+    '@': ('c', lambda x: lambda w: w.replace(x, x[:0])),
+    'z': ('n', lambda n: partial(_dup_first, n=n)),
+    'Z': ('n', lambda n: partial(_dup_last, n=n)),
+    'q': ('', lambda: _dup_chars),
+    'k': ('', lambda: partial(_swap, n=0, m=1)),
+    'K': ('', lambda: lambda w: _swap(w, len(w) - 2, len(w) - 1) if len(w) >= 2 else w),
+    '*': ('nn', lambda n, m: partial(_swap, n=n, m=m)),
+    '.': ('n', lambda n: partial(_replace_next, n=n)),
+    ',': ('n', lambda n: partial(_replace_prev, n=n)),
+    'y': ('n', lambda n: lambda w: w[:n] + w if n <= len(w) else w),
+    'Y': ('n', lambda n: lambda w: w + w[-n:] if 0 < n <= len(w) else w),
+    'E': ('', lambda: _title),
+    'e': ('c', lambda x: partial(_title, sep=x)),
+    '+': ('n', lambda n: partial(_shift_char, n=n, delta=1)),
+    '-': ('n', lambda n: partial(_shift_char, n=n, delta=-1)),
+    'L': ('n', lambda n: partial(_bitshift_char, n=n, left=True)),
+    'R': ('n', lambda n: partial(_bitshift_char, n=n, left=False)),
+    # Rejection rules: the candidate is dropped unless the test passes
+    # Length rejections as in hashcat: <N drops words longer than N, >N shorter than N
+    '<': ('n', lambda n: partial(_reject_unless, test=lambda w: len(w) <= n)),
+    '>': ('n', lambda n: partial(_reject_unless, test=lambda w: len(w) >= n)),
+    '_': ('n', lambda n: partial(_reject_unless, test=lambda w: len(w) == n)),
+    '!': ('c', lambda x: partial(_reject_unless, test=lambda w: x not in w)),
+    '/': ('c', lambda x: partial(_reject_unless, test=lambda w: x in w)),
+    '(': ('c', lambda x: partial(_reject_unless, test=lambda w: w[:1] == x)),
+    ')': ('c', lambda x: partial(_reject_unless, test=lambda w: w[-1:] == x)),
+    '=': ('nc', lambda n, x: partial(_reject_unless, test=lambda w: w[n:n + 1] == x)),
+    '%': ('nc', lambda n, x: partial(_reject_unless, test=lambda w: w.count(x) >= n)),
+}
+
+
+class Rule:
+    """One parsed rule line, applicable to ``str`` or ``bytes`` words."""
+
+    def __init__(self, text):
+        self.text = text
+        self.steps = []
+        pos = 0
+        while pos < len(text):
+            letter = text[pos]
+            if letter not in _FUNCTIONS:
+                raise RuleError(f"unknown rule function {letter!r} in {text!r}")
+            kinds = _FUNCTIONS[letter][0]
+            args = text[pos + 1:pos + 1 + len(kinds)]
+            if len(args) < len(kinds):
+                raise RuleError(f"rule function {letter!r} is missing arguments in {text!r}")
+            self.steps.append((letter, tuple(
+                _position(arg) if kind == 'n' else arg for kind, arg in zip(kinds, args))))
+            pos += 1 + len(kinds)
+        self._compiled = {}
+
+    def __repr__(self):
+        return f"Rule({self.text!r})"
+
+    def __getstate__(self):
+        # Compiled steps hold lambdas; workers recompile on first use
+        return {'text': self.text, 'steps': self.steps, '_compiled': {}}
+
+    def _compile(self, kind):
+        functions = []
+        for letter, args in self.steps:
+            if letter in (':', ' '):
+                continue
+            kinds, build = _FUNCTIONS[letter]
+            if kind is bytes:
+                args = [arg.encode('latin-1') if k == 'c' else arg for k, arg in zip(kinds, args)]
+            functions.append(build(*args))
+        return functions
+
+    def apply(self, word):
+        """Return the mangled word, or None if the rule rejects it."""
+        kind = type(word)
+        functions = self._compiled.get(kind)
+        if functions is None:
+            functions = self._compiled[kind] = self._compile(kind)
+        for function in functions:
+            word = function(word)
+            if word is None:
+                return None
+        return word if len(word) <= MAX_LENGTH else None
+
+
+def parse_rules(lines):
+    """Parse rule lines, skipping blanks and ``#`` comments.
+
+    Returns ``(rules, skipped)``; lines using unsupported functions are
+    skipped and counted, as hashcat does.
+    """
+    rules, skipped = [], 0
+    for line in lines:
+        line = line.rstrip('\r\n')
+        if not line.strip() or line.startswith('#'):
+            continue
+        try:
+            rules.append(Rule(line))
+        except RuleError:
+            skipped += 1
+    return rules, skipped
+
+
+def load_rules(path):
+    """Load a rule file, warning about rules that could not be parsed."""
+    with open(path, encoding='latin-1') as f:
+        rules, skipped = parse_rules(f)
+    if skipped:
+        print(f"⚠️  Skipped {skipped} unsupported rules in {path}")
+    if not rules:
+        raise RuleError(f"{path} contains no usable rules")
+    return rules
+
+
+def apply_rules(word, rules):
+    """Yield the distinct candidates produced by each rule for one word."""
+    seen = set()
+    for rule in rules:
+        candidate = rule.apply(word)
+        if candidate is not None and candidate not in seen:
+            seen.add(candidate)
+            yield candidate
+
+
+class RuledKeyspace:
+    """Wraps a keyspace so every base word is expanded through a rule list.
+
+    Indices and ranges are those of the base keyspace, so checkpoints
+    record base words; the expansion happens lazily in ``candidates``,
+    which runs inside the workers.
+    """
+
+    def __init__(self, base, rules):
+        self.base = base
+        self.rules = rules
+        self.encoded = base.encoded
+        self.size = base.size
+        self._digest = hashlib.sha256('\n'.join(r.text for r in rules).encode('latin-1')).hexdigest()[:12]
+
+    def __repr__(self):
+        return f"{self.base!r} x {len(self.rules)} rules ({self._digest})"
+
+    def ranges(self, chunk_size, start=0, end=None):
+        """Base ranges sized so each holds about ``chunk_size`` candidates."""
+        return self.base.ranges(max(1, chunk_size // len(self.rules)), start, end)
+
+    def candidates(self, start, end):
+        """Yield every rule's output for the base words in ``[start, end)``."""
+        rules = self.rules
+        for word in self.base.candidates(start, end):
+            yield from apply_rules(word, rules)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Apply a rule file to words')
+    parser.add_argument('rule_file', help='Hashcat/John rule file')
+    parser.add_argument('words', nargs='+', help='Base words')
+    args = parser.parse_args()
+
+    try:
+        rules = load_rules(args.rule_file)
+    except (RuleError, OSError) as e:
+        parser.error(str(e))
+    # Candidates go to stdout so they can be piped into dedup.py
+    print(f"📜 {len(rules)} rules", file=sys.stderr)
+    for word in args.words:
+        for candidate in apply_rules(word, rules):
+            print(candidate)
+
+
+if __name__ == '__main__':
+    main()
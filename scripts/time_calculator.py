@@ -1,93 +1,257 @@
 #!/usr/bin/env python3
-import math
-
-def calculate_crack_time():
-    """Calculate estimated cracking times for various password patterns"""
-    
-    # Hashcat performance on M4 Pro (from benchmark)
-    hashcat_speed = 6567200  # 6.567 million hashes per second
-    
-    print("🚀 M4 Pro GPU Hashcat Performance Analysis")
-    print("=" * 50)
-    print(f"Hashcat speed: {hashcat_speed:,} hashes/second")
-    print()
-    
-    # Calculate different attack scenarios
-    attacks = [
-        ("Dates since 1900 (DDMMYYYY, MMDDYYYY)", calculate_date_combinations()),
-        ("Numeric passwords (1-8 digits)", calculate_numeric_combinations(1, 8)),
-        ("Numeric passwords (1-12 digits)", calculate_numeric_combinations(1, 12)),
-        ("Alphanumeric lowercase (1-6 chars)", calculate_alphanumeric_combinations(1, 6, 36)),
-        ("Alphanumeric mixed case (1-5 chars)", calculate_alphanumeric_combinations(1, 5, 62)),
-        ("Alphanumeric + symbols (1-4 chars)", calculate_alphanumeric_combinations(1, 4, 95)),
-    ]
-    
-    for attack_name, combinations in attacks:
-        seconds = combinations / hashcat_speed
-        print(f"📊 {attack_name}")
-        print(f"   Combinations: {combinations:,}")
-        print(f"   Time: {format_time(seconds)}")
-        print()
+"""Estimate how long an attack plan takes against a specific PDF.
 
-def calculate_date_combinations():
-    """Calculate date combinations since 1900"""
-    total = 0
-    
-    # DDMMYYYY format (01011900 to 31122025)
-    for year in range(1900, 2026):
-        for month in range(1, 13):
-            days_in_month = [31, 28, 31, 30, 31, 30, 31, 31, 30, 31, 30, 31]
-            if year % 4 == 0 and (year % 100 != 0 or year % 400 == 0):
-                days_in_month[1] = 29  # Leap year
-            
-            for day in range(1, days_in_month[month - 1] + 1):
-                total += 2  # DDMMYYYY and MMDDYYYY
-    
-    # Also add DDMMYY and MMDDYY formats
-    for year in range(1900, 2026):
-        for month in range(1, 13):
-            days_in_month = [31, 28, 31, 30, 31, 30, 31, 31, 30, 31, 30, 31]
-            if year % 4 == 0 and (year % 100 != 0 or year % 400 == 0):
-                days_in_month[1] = 29
-            
-            for day in range(1, days_in_month[month - 1] + 1):
-                total += 2  # DDMMYY and MMDDYY
-    
-    return total
-
-def calculate_numeric_combinations(min_length, max_length):
-    """Calculate total numeric combinations"""
-    total = 0
-    for length in range(min_length, max_length + 1):
-        total += 10 ** length
-    return total
+Keyspace sizes are exact: masks in closed form from their per-position
+charsets, date ranges from the same DateKeyspace the crackers stream
+(valid days only, strings shared by two formats counted once), wordlists
+from their line count times the number of rules. Speeds are not constants: each available engine is
+calibrated for a moment against the target file itself, since a guess
+costs orders of magnitude more on R6 than on R2.
+
+Without an attack plan, the classic scenarios (dates since 1900, numeric,
+alphanumeric and printable brute force) are estimated.
+
+Usage:
+    python time_calculator.py <pdf_file> [--mask MASK ...] [--wordlist FILE ... [--rules FILE]]
+        [--dates 1950-2025 ... [--date-orders DMY,MDY]] [--processes N] [--hashcat]
+    python time_calculator.py --revision 6     # generated fixture instead of a real file
+"""
+
+import argparse
+import datetime
+import multiprocessing as mp
+import re
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+
+from batch_verifier import DEFAULT_BATCH_SIZE, BatchVerifier, pad_passwords
+from dates import add_date_arguments, date_keyspace_from_args
+from mask import MaskError, MaskKeyspace
+from pdf_security import PasswordVerifier, UnsupportedEncryptionError
+from rc4_key_search import KEY_BYTES, RC4KeyKeyspace, calibrated_key_chunk
+from rules import RuleError, load_rules
+
+# hashcat modes for the PDF security handler revisions
+HASHCAT_MODES = {2: 10400, 3: 10500, 4: 10500, 5: 10600, 6: 10700}
+_HASHCAT_SPEED = re.compile(r'Speed\.#(\*|\d+)\.*:\s+([\d.]+)\s*([kMGT]?)H/s')
+_UNITS = {'': 1, 'k': 1e3, 'M': 1e6, 'G': 1e9, 'T': 1e12}
+
+# Default plan: dates since CLASSIC_FIRST_YEAR plus incremental masks as
+# (name, mask, custom charsets, min length)
+CLASSIC_FIRST_YEAR = 1900
+CLASSIC_MASKS = [
+    ("Numeric passwords (1-8 digits)", '?d' * 8, None, 1),
+    ("Numeric passwords (9-12 digits)", '?d' * 12, None, 9),
+    ("Alphanumeric lowercase (1-6 chars)", '?1' * 6, {'1': '?l?d'}, 1),
+    ("Alphanumeric mixed case (1-5 chars)", '?1' * 5, {'1': '?l?u?d'}, 1),
+    ("Alphanumeric + symbols (1-4 chars)", '?a' * 4, None, 1),
+]
+
+
+# --- Keyspace sizes ---------------------------------------------------------
+
+def wordlist_lines(path, chunk_size=1 << 26):
+    """Number of non-empty lines, as read by WordlistKeyspace.
+
+    Lines are split on ``\n`` with one trailing ``\r`` removed, and blank
+    lines (empty or a lone ``\r``) are skipped, exactly as the crackers do.
+    """
+    size = Path(path).stat().st_size
+    if not size:
+        return 0
+    data = np.memmap(path, dtype=np.uint8, mode='r')
+    lines = 0
+    line_start = 0
+    for lo in range(0, size, chunk_size):
+        newlines = np.flatnonzero(data[lo:lo + chunk_size] == 0x0A) + lo
+        if not len(newlines):
+            continue
+        starts = np.concatenate(([line_start], newlines[:-1] + 1))
+        lengths = newlines - starts
+        blank = (lengths == 0).sum() + (data[starts[lengths == 1]] == 0x0D).sum()
+        lines += len(newlines) - int(blank)
+        line_start = int(newlines[-1]) + 1
+    # The last line, if the file does not end with a newline
+    tail = size - line_start
+    lines += tail > 1 or (tail == 1 and data[line_start] != 0x0D)
+    return int(lines)
 
-def calculate_alphanumeric_combinations(min_length, max_length, charset_size):
-    """Calculate alphanumeric combinations"""
-    total = 0
-    for length in range(min_length, max_length + 1):
-        total += charset_size ** length
-    return total
 
 def format_time(seconds):
     """Format seconds into human-readable time"""
     if seconds < 60:
         return f"{seconds:.1f} seconds"
     elif seconds < 3600:
-        minutes = seconds / 60
-        return f"{minutes:.1f} minutes"
+        return f"{seconds / 60:.1f} minutes"
     elif seconds < 86400:
-        hours = seconds / 3600
-        return f"{hours:.1f} hours"
+        return f"{seconds / 3600:.1f} hours"
     elif seconds < 2592000:  # 30 days
-        days = seconds / 86400
-        return f"{days:.1f} days"
+        return f"{seconds / 86400:.1f} days"
     elif seconds < 31536000:  # 365 days
-        months = seconds / 2592000
-        return f"{months:.1f} months"
+        return f"{seconds / 2592000:.1f} months"
     else:
-        years = seconds / 31536000
-        return f"{years:.1f} years"
+        return f"{seconds / 31536000:.1f} years"
+
+
+# --- Engine calibration -----------------------------------------------------
+
+def _measure(check, make_batch, seconds):
+    """Guesses per second of ``check`` over batches from ``make_batch``."""
+    tested = 0
+    start = time.perf_counter()
+    while time.perf_counter() - start < seconds:
+        batch = make_batch(tested)
+        check(batch)
+        tested += len(batch)
+    return tested / (time.perf_counter() - start)
+
+
+def calibrate_engines(verifier, processes, seconds=0.5, hashcat=False):
+    """Return ``{engine: guesses/sec}`` for every engine usable on this target.
+
+    CPU engines are measured on one core and scaled by ``processes``.
+    """
+    rates = {}
+    native = _measure(lambda batch: [verifier.check(p) for p in batch],
+                      lambda n: [f"calibration{n + i}" for i in range(100)], seconds)
+    rates['cpu (per candidate)'] = native * processes
+    if verifier.revision <= 4:
+        batch = BatchVerifier(verifier.params)
+        padded = pad_passwords([b'calibration%d' % i for i in range(DEFAULT_BATCH_SIZE)])
+        rates['cpu (batched)'] = _measure(batch.check_padded, lambda n: padded, seconds) * processes
+    if hashcat:
+        speed = hashcat_speed(verifier.revision)
+        if speed:
+            rates['hashcat'] = speed
+    return rates
+
+
+def hashcat_speed(revision):
+    """Run hashcat's benchmark for the revision's mode; None if unavailable."""
+    mode = HASHCAT_MODES.get(revision)
+    if mode is None or shutil.which('hashcat') is None:
+        return None
+    try:
+        result = subprocess.run(['hashcat', '-b', '-m', str(mode)], capture_output=True,
+                                text=True, timeout=300)
+    except (OSError, subprocess.TimeoutExpired):
+        return None
+    speeds = {device: float(value) * _UNITS[unit]
+              for device, value, unit in _HASHCAT_SPEED.findall(result.stdout)}
+    if not speeds:
+        return None
+    # "#*" is the total over all devices when there are several
+    return speeds.get('*', sum(speeds.values()))
+
+
+# --- Plan -------------------------------------------------------------------
+
+def build_plan(args, custom_charsets, rules):
+    """Return ``[(phase name, keyspace size, exact)]`` for the requested plan."""
+    phases = []
+    for mask in args.mask or []:
+        keyspace = MaskKeyspace(mask, custom_charsets, args.increment)
+        phases.append((f"Mask {mask}" + (" (incremental)" if args.increment else ""), keyspace.size, True))
+    for path in args.wordlist or []:
+        lines = wordlist_lines(path)
+        if rules:
+            # Rules can reject words or repeat a candidate, so this is an upper bound
+            phases.append((f"Wordlist {Path(path).name} x {len(rules)} rules", lines * len(rules), False))
+        else:
+            phases.append((f"Wordlist {Path(path).name}", lines, True))
+    for first, last in args.dates or []:
+        dates = date_keyspace_from_args(args, (first, last))
+        phases.append((f"Dates {first} to {last} ({len(dates.formats)} formats)", dates.size, True))
+    if not phases:
+        dates = date_keyspace_from_args(args, (datetime.date(CLASSIC_FIRST_YEAR, 1, 1), datetime.date.today()))
+        phases.append((f"Dates since {CLASSIC_FIRST_YEAR} ({len(dates.formats)} formats)", dates.size, True))
+        for name, mask, custom, min_length in CLASSIC_MASKS:
+            phases.append((name, MaskKeyspace(mask, custom, increment=True, min_length=min_length).size, True))
+    return phases
+
+
+def fixture_verifier(revision):
+    """Verifier for a generated fixture of the given revision."""
+    from benchmark import FIXTURES, make_fixtures
+    names = {int(options['R']): name for name, options in FIXTURES}
+    if revision not in names:
+        raise SystemExit(f"Error: no fixture for R{revision} (choose from {sorted(names)})")
+    with tempfile.TemporaryDirectory(prefix='estimate-') as directory:
+        for name, path, _ in make_fixtures(directory):
+            if name == names[revision]:
+                return PasswordVerifier.from_file(path)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Estimate attack time against a PDF')
+    parser.add_argument('pdf_file', nargs='?', help='Target PDF (calibration runs against it)')
+    parser.add_argument('--revision', type=int, help='Without a PDF: calibrate on a generated R2/R3/R4/R6 fixture')
+    parser.add_argument('--mask', action='append', help="Hashcat-style mask phase (repeatable)")
+    for n in range(1, 5):
+        parser.add_argument(f'-{n}', f'--custom-charset{n}', dest=f'charset{n}',
+                            metavar='CHARSET', help=f'Custom charset for ?{n}')
+    parser.add_argument('--increment', action='store_true', help='Masks also cover shorter prefixes')
+    parser.add_argument('--wordlist', action='append', help='Wordlist phase (repeatable)')
+    parser.add_argument('--rules', help='Rule file applied to every --wordlist')
+    add_date_arguments(parser, flag_help='Date phase, e.g. 1950-2025', repeatable=True)
+    parser.add_argument('--processes', type=int, default=mp.cpu_count(),
+                        help='CPU cores the attack will use (default: all)')
+    parser.add_argument('--hashcat', action='store_true', help="Also run hashcat's benchmark for this mode")
+    parser.add_argument('--seconds', type=float, default=0.5, help='Calibration time per engine (default: 0.5)')
+    args = parser.parse_args()
+
+    if not args.pdf_file and args.revision is None:
+        parser.error('give a PDF file or --revision')
+    try:
+        if args.pdf_file:
+            verifier = PasswordVerifier.from_file(args.pdf_file)
+        else:
+            verifier = fixture_verifier(args.revision)
+        rules = load_rules(args.rules) if args.rules else None
+        custom = {str(n): getattr(args, f'charset{n}') for n in range(1, 5) if getattr(args, f'charset{n}')}
+        phases = build_plan(args, custom, rules)
+    except (UnsupportedEncryptionError, ValueError, OSError, MaskError, RuleError) as e:
+        print(f"Error: {e}")
+        sys.exit(1)
+
+    target = args.pdf_file or f"generated R{args.revision} fixture"
+    print(f"⏱️  Time estimate for {target} (R{verifier.revision}, {verifier.params.cipher})")
+    print("=" * 50)
+    rates = calibrate_engines(verifier, args.processes, args.seconds, args.hashcat)
+    for engine, rate in rates.items():
+        print(f"⚡ {engine}: {rate:,.0f} guesses/sec"
+              + (f" ({args.processes} cores)" if engine.startswith('cpu') else ""))
+    if args.hashcat and 'hashcat' not in rates:
+        print("⚠️  hashcat benchmark unavailable")
+    print()
+
+    best = max(rates, key=rates.get)
+    total = 0
+    for name, size, exact in phases:
+        total += size
+        print(f"📊 {name}")
+        print(f"   Keyspace: {'' if exact else '≤ '}{size:,}")
+        for engine, rate in rates.items():
+            marker = " ⭐" if engine == best and len(rates) > 1 else ""
+            print(f"   {engine}: {format_time(size / rate)}{marker}")
+        print()
+
+    print(f"🧮 Total: {total:,} candidates in {len(phases)} phases")
+    for engine, rate in rates.items():
+        print(f"   {engine}: {format_time(total / rate)}")
+
+    if verifier.revision <= 4 and verifier.params.key_length == KEY_BYTES:
+        # The 40-bit file key bounds the worst case whatever the password is
+        _, key_rate = calibrated_key_chunk(verifier.params)
+        print(f"\n🔑 RC4 key search bound (rc4_key_search.py): {RC4KeyKeyspace.size:,} keys, "
+              f"{format_time(RC4KeyKeyspace.size / (key_rate * args.processes))}")
+
 
 if __name__ == "__main__":
-    calculate_crack_time()
+    main()
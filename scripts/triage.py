@@ -0,0 +1,186 @@
+#!/usr/bin/env python3
+"""Classify PDFs before any cracking starts.
+
+Only the trailer and the ``/Encrypt`` dictionary of each file are read,
+in parallel over all cores, and every file is routed to its cheapest
+path:
+
+    unencrypted   nothing to do
+    decrypt       empty user password (owner password only): decrypt now
+    potfile       password already known from the potfile
+    rc4           revisions 2-4 (RC4 / AES-128): CPU password attack; 40-bit
+                  files also have the bounded RC4 key search
+    aes256        revisions 5-6 (AES-256): hashcat or the CPU crackers
+    unsupported   public-key or unknown security handler
+    error         unreadable or damaged file
+
+Usage:
+    python triage.py <pdf_or_dir> [<pdf_or_dir> ...] [--json FILE] [--decrypt OUTPUT_DIR]
+"""
+
+import argparse
+import json
+import multiprocessing as mp
+import sys
+import time
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Optional
+
+import pikepdf
+
+from multi_crack import collect_pdfs
+from pdf_security import PasswordVerifier, UnsupportedEncryptionError, read_encryption_params
+from potfile import Potfile
+
+ROUTES = ('unencrypted', 'decrypt', 'potfile', 'rc4', 'aes256', 'unsupported', 'error')
+
+# Suggested next step per route; {pdf} is replaced by the file path
+NEXT_STEPS = {
+    'decrypt': 'python scripts/triage.py {pdf} --decrypt <output_dir>',
+    'potfile': 'python scripts/triage.py {pdf} --decrypt <output_dir>',
+    'rc4': 'python scripts/m4_optimized_crack.py {pdf}',
+    'rc4-40': 'python scripts/rc4_key_search.py {pdf}',
+    'aes256': 'python scripts/auto_crack.py {pdf}',
+}
+
+# Per-process potfile, loaded once by init_triage
+_potfile = None
+
+
+@dataclass
+class Triage:
+    """Where one file goes next, and why."""
+    path: str
+    route: str
+    detail: str
+    password: Optional[str] = None
+
+
+def init_triage():
+    """Pool initializer: load the potfile once per worker."""
+    global _potfile
+    _potfile = Potfile()
+
+
+def triage_file(pdf_file, potfile=None):
+    """Classify one PDF from its trailer and /Encrypt dictionary."""
+    path = str(pdf_file)
+    try:
+        with open(pdf_file, 'rb') as f:
+            if b'%PDF-' not in f.read(1024):
+                return Triage(path, 'error', 'not a PDF file')
+        params = read_encryption_params(pdf_file)
+    except Exception as e:
+        # Damaged files raise all sorts of parse errors; never lose the batch over one
+        return Triage(path, 'error', str(e) or type(e).__name__)
+    if params is None:
+        return Triage(path, 'unencrypted', 'no /Encrypt dictionary')
+
+    detail = f"/{params.filter} R{params.r} {params.cipher}"
+    try:
+        verifier = PasswordVerifier(params)
+        # Owner-password-only files open with the empty user password
+        empty_user_password = verifier.check('')
+    except UnsupportedEncryptionError as e:
+        return Triage(path, 'unsupported', f"{detail}: {e}")
+    except Exception as e:
+        return Triage(path, 'error', f"{detail}: {e or type(e).__name__}")
+
+    if empty_user_password:
+        return Triage(path, 'decrypt', f"{detail}, empty user password", '')
+    # Only this file's own entry: replaying the potfile's priority list would
+    # cost one full key derivation per password, per file (slow on R6), and
+    # belongs to the crackers
+    potfile = potfile if potfile is not None else (_potfile if _potfile is not None else Potfile())
+    password = potfile.lookup(params)
+    if password is not None and verifier.check(password):
+        return Triage(path, 'potfile', f"{detail}, password in potfile", password)
+    return Triage(path, 'rc4' if params.r <= 4 else 'aes256', detail)
+
+
+def decrypt_to(pdf_file, password, output_dir):
+    """Decrypt a triaged file into ``output_dir``; return an error message or None.
+
+    Files from different directories can share a name, so an existing
+    output file is never overwritten.
+    """
+    output_file = Path(output_dir) / Path(pdf_file).name
+    if output_file.exists():
+        return f"{output_file} already exists; not overwriting it"
+    try:
+        with pikepdf.open(pdf_file, password=password) as pdf:
+            pdf.save(output_file)
+    except (pikepdf.PdfError, OSError) as e:
+        return str(e)
+    return None
+
+
+def next_step(result):
+    """Command to run next for a file, or None if there is nothing to do."""
+    key = result.route
+    if key == 'rc4' and result.detail.endswith('RC4-40'):
+        key = 'rc4-40'
+    step = NEXT_STEPS.get(key)
+    return step.format(pdf=result.path) if step else None
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Classify PDFs and route them to the cheapest path')
+    parser.add_argument('targets', nargs='+', help='PDF files or directories of PDFs')
+    parser.add_argument('--workers', type=int, default=mp.cpu_count(),
+                        help='Parallel worker processes (default: all cores)')
+    parser.add_argument('--json', help='Write one JSON result per line to this file')
+    parser.add_argument('--decrypt', metavar='OUTPUT_DIR',
+                        help='Decrypt the files that need no cracking into OUTPUT_DIR')
+    parser.add_argument('--quiet', action='store_true', help='Only print the summary')
+    args = parser.parse_args()
+
+    pdf_files = collect_pdfs(args.targets)
+    if not pdf_files:
+        print("No PDF files found")
+        sys.exit(1)
+
+    print(f"🔎 Triaging {len(pdf_files):,} files with {args.workers} workers")
+    start_time = time.time()
+    with ProcessPoolExecutor(max_workers=args.workers, initializer=init_triage) as executor:
+        # Files are tiny tasks; chunking keeps IPC from dominating
+        chunksize = max(1, len(pdf_files) // (args.workers * 8))
+        results = list(executor.map(triage_file, pdf_files, chunksize=chunksize))
+    elapsed = time.time() - start_time
+
+    if not args.quiet:
+        for result in results:
+            print(f"{result.route:<12} {result.path}: {result.detail}")
+
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            for result in results:
+                entry = asdict(result)
+                entry['next'] = next_step(result)
+                f.write(json.dumps(entry, ensure_ascii=False) + '\n')
+
+    counts = Counter(result.route for result in results)
+    print(f"\n📊 {len(results):,} files in {elapsed:.2f}s")
+    for route in ROUTES:
+        if counts[route]:
+            print(f"   {route:<12} {counts[route]:,}")
+
+    if args.decrypt:
+        output_dir = Path(args.decrypt)
+        output_dir.mkdir(parents=True, exist_ok=True)
+        ready = [r for r in results if r.route in ('decrypt', 'potfile')]
+        decrypted = 0
+        for result in ready:
+            error = decrypt_to(result.path, result.password, output_dir)
+            if error is None:
+                decrypted += 1
+            else:
+                print(f"❌ {result.path}: {error}")
+        print(f"✅ Decrypted {decrypted}/{len(ready)} files into {output_dir}")
+
+
+if __name__ == '__main__':
+    main()
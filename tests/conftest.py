@@ -0,0 +1,60 @@
+"""Shared fixtures: the scripts are flat modules, imported from scripts/."""
+
+import itertools
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / 'scripts'))
+
+# (name, pikepdf.Encryption options, user password)
+ENCRYPTED = [
+    ('r2', {'R': 2, 'aes': False, 'metadata': False}, '12'),
+    ('r3', {'R': 3, 'aes': False, 'metadata': False}, 'abc1'),
+    ('r4-rc4', {'R': 4, 'aes': False, 'metadata': False}, 'zz'),
+    ('r4-aes', {'R': 4, 'aes': True}, 'Police1'),
+    ('r6', {'R': 6, 'aes': True}, 'secret9'),
+    ('r6-empty', {'R': 6, 'aes': True}, ''),
+]
+
+
+@pytest.fixture(autouse=True)
+def isolated_potfile(tmp_path, monkeypatch):
+    """Never read or write the repository potfile from tests."""
+    monkeypatch.setenv('PDF_POTFILE', str(tmp_path / 'test.potfile'))
+
+
+@pytest.fixture(scope='session')
+def encrypted_pdfs(tmp_path_factory):
+    """``{name: (path, user password, revision)}`` for one file per encryption mode."""
+    import pikepdf
+
+    directory = tmp_path_factory.mktemp('pdfs')
+    pdfs = {}
+    for name, options, password in ENCRYPTED:
+        path = directory / f"{name}.pdf"
+        pdf = pikepdf.new()
+        pdf.add_blank_page()
+        pdf.save(path, encryption=pikepdf.Encryption(user=password, owner=f"owner-{name}", **options))
+        pdfs[name] = (path, password, options['R'])
+    return pdfs
+
+
+def product(charsets, min_length, max_length):
+    """Reference enumeration: shorter lengths first, then itertools.product order."""
+    for length in range(min_length, max_length + 1):
+        for chars in itertools.product(*charsets[:length]):
+            yield ''.join(chars) if isinstance(charsets[0], str) else bytes(chars)
+
+
+def ranged(keyspace, chunk_size, start=0, end=None):
+    """Concatenate the candidates of every range, checking the ranges tile the span."""
+    end = keyspace.size if end is None else end
+    words, position = [], start
+    for lo, hi in keyspace.ranges(chunk_size, start, end):
+        assert lo == position and lo < hi
+        position = hi
+        words.extend(keyspace.candidates(lo, hi))
+    assert position == end
+    return words
@@ -0,0 +1,27 @@
+"""The batched RC4 verifier agrees with the scalar one on revisions 2-4."""
+
+import numpy as np
+import pytest
+
+from batch_verifier import BatchVerifier, pad_block, pad_passwords
+from pdf_security import PasswordVerifier, encode_password
+
+WRONG = ['', 'wrong', '12 ', 'ABC1', 'x' * 40] + [f"w{i}" for i in range(50)]
+
+
+@pytest.mark.parametrize('name', ['r2', 'r3', 'r4-rc4', 'r4-aes'])
+def test_batch_verifier_matches_verifier(encrypted_pdfs, name):
+    path, password, revision = encrypted_pdfs[name]
+    verifier = PasswordVerifier.from_file(path)
+    batch = BatchVerifier(verifier.params)
+    candidates = [encode_password(p, revision) for p in [password] + WRONG]
+    expected = [verifier.check_bytes(c) for c in candidates]
+    assert expected[0] and not any(expected[1:])
+    assert batch.check_passwords(candidates).tolist() == expected
+
+
+@pytest.mark.parametrize('length', [0, 1, 5, 32, 40])
+def test_pad_block_matches_pad_passwords(length):
+    words = [bytes((65 + i + j) % 256 for j in range(length)) for i in range(7)]
+    block = np.frombuffer(b''.join(words), dtype=np.uint8).reshape(len(words), length)
+    assert (pad_block(block) == pad_passwords(words)).all()
@@ -0,0 +1,35 @@
+"""Benchmark engines agree on the fixtures and leave nothing behind."""
+
+import pytest
+
+import benchmark
+
+
+@pytest.fixture(scope='module')
+def fixtures(tmp_path_factory):
+    return benchmark.make_fixtures(tmp_path_factory.mktemp('bench'))
+
+
+@pytest.mark.parametrize('engine', ['pikepdf', 'native', 'batched'])
+def test_engines_find_only_the_password(fixtures, engine):
+    for name, path, password in fixtures:
+        if benchmark.engine_supported(engine, name) is None:
+            check = benchmark._engine_checker(engine, path)
+            assert check([password, 'not-' + password, '']) == 1
+
+
+def test_qpdf_output_stays_in_the_fixture_directory(fixtures, tmp_path, monkeypatch):
+    outputs = []
+
+    def fake_qpdf(pdf_path, password, output_path):
+        outputs.append(output_path)
+        output_path.write_bytes(b'%PDF-')
+        return True
+
+    monkeypatch.setattr(benchmark, 'try_decrypt_pdf', fake_qpdf)
+    monkeypatch.setattr(benchmark.tempfile, 'tempdir', str(tmp_path))
+    _, path, _ = fixtures[0]
+    check = benchmark._engine_checker('qpdf', path)
+    assert check(['a', 'b', 'c']) == 3
+    assert len(set(outputs)) == 1 and outputs[0].parent == path.parent
+    assert not list(tmp_path.iterdir())
@@ -0,0 +1,65 @@
+"""Checkpoint range arithmetic and resumed task lists."""
+
+import random
+
+import pytest
+
+from checkpoint import Checkpoint, CheckpointError
+from crack_runner import keyspace_tasks, list_tasks
+from mask import MaskKeyspace
+
+
+def test_mark_done_merges_ranges(tmp_path):
+    checkpoint = Checkpoint(tmp_path / 'cp.json', 'target')
+    for start, end in [(10, 20), (30, 40), (20, 25), (0, 5), (5, 10), (35, 50)]:
+        checkpoint.mark_done('mask', start, end)
+    assert checkpoint.strategies['mask']['done'] == [(0, 25), (30, 50)]
+    assert list(checkpoint.pending('mask', 0, 60)) == [(25, 30), (50, 60)]
+    assert list(checkpoint.pending('mask', 2, 28)) == [(25, 28)]
+    assert list(checkpoint.pending('other', 0, 60)) == [(0, 60)]
+
+
+def test_random_ranges_against_a_set(tmp_path):
+    rng = random.Random(5)
+    checkpoint = Checkpoint(tmp_path / 'cp.json', 'target')
+    done = set()
+    for _ in range(300):
+        start = rng.randrange(500)
+        end = start + rng.randrange(1, 20)
+        checkpoint.mark_done('s', start, end)
+        done.update(range(start, end))
+        ranges = checkpoint.strategies['s']['done']
+        assert all(a[1] < b[0] for a, b in zip(ranges, ranges[1:]))
+        assert {i for lo, hi in ranges for i in range(lo, hi)} == done
+        gaps = {i for lo, hi in checkpoint.pending('s', 0, 600) for i in range(lo, hi)}
+        assert gaps == set(range(600)) - done
+
+
+def test_save_and_load(tmp_path):
+    path = tmp_path / 'cp.json'
+    checkpoint = Checkpoint(path, 'target')
+    checkpoint.mark_done('mask', 0, 100, tested=90)
+    checkpoint.mark_complete('dates')
+    loaded = Checkpoint.load(path, 'target')
+    assert loaded.strategies['mask']['done'] == [(0, 100)]
+    assert loaded.tested('mask') == 90
+    assert loaded.is_complete('dates') and not loaded.is_complete('mask')
+    with pytest.raises(CheckpointError):
+        Checkpoint.load(path, 'another target')
+
+
+def test_resumed_tasks_cover_exactly_the_untested(tmp_path):
+    keyspace = MaskKeyspace('?l?d?d', increment=True)
+    checkpoint = Checkpoint(tmp_path / 'cp.json', 'target')
+    strategy = repr(keyspace)
+    for start, end in [(0, 37), (100, 250), (2000, 2600)]:
+        checkpoint.mark_done(strategy, start, end)
+    tasks = list(keyspace_tasks(0, keyspace, 64, checkpoint, strategy))
+    covered = [i for _, (start, end) in tasks for i in range(start, end)]
+    assert all(end - start <= 64 for _, (start, end) in tasks)
+    assert covered == [i for i in range(keyspace.size) if not (i < 37 or 100 <= i < 250 or 2000 <= i < 2600)]
+
+    passwords = [f"pw{i}" for i in range(300)]
+    checkpoint.mark_done('list', 10, 120)
+    batches = [batch for (batch, _), _ in list_tasks(passwords, 50, checkpoint, 'list')]
+    assert [pw for batch in batches for pw in batch] == passwords[:10] + passwords[120:]
@@ -0,0 +1,46 @@
+"""Date keyspaces produce every real date once, in every requested format."""
+
+import datetime
+
+import pytest
+
+from conftest import ranged
+from dates import QUICK_YEARS, DateKeyspace, quick_date_keyspace
+
+
+def reference_dates(first, last, orders, separators, year_digits):
+    recent = datetime.date(max(last.year - 99, 1), 1, 1)
+    day = first
+    while day <= last:
+        fields = {'D': f'{day.day:02d}', 'M': f'{day.month:02d}'}
+        for sep in ('',) + tuple(separators):
+            for digits in year_digits:
+                if digits == 2 and day < recent:
+                    continue
+                fields['Y'] = f'{day.year % 10 ** digits:0{digits}d}'
+                for order in orders:
+                    yield sep.join(fields[field] for field in order).encode()
+        day += datetime.timedelta(days=1)
+
+
+@pytest.mark.parametrize('first,last', [(datetime.date(1011, 1, 1), datetime.date(1013, 1, 1)),
+                                        (datetime.date(1940, 1, 1), datetime.date(1950, 12, 31)),
+                                        (datetime.date(2000, 2, 27), datetime.date(2001, 3, 2))])
+def test_date_keyspace(first, last):
+    orders, separators, year_digits = ('DMY', 'MDY', 'YMD'), ('.', '-', '/'), (4, 2)
+    keyspace = DateKeyspace(first, last, orders, separators, year_digits)
+    candidates = ranged(keyspace, 997)
+    assert len(candidates) == keyspace.size == len(set(candidates))
+    assert set(candidates) == set(reference_dates(first, last, orders, separators, year_digits))
+    blocks = [row.tobytes() for _, block in keyspace.blocks(0, keyspace.size) for row in block]
+    assert blocks == candidates
+
+
+def test_quick_date_keyspace():
+    keyspace = quick_date_keyspace()
+    today = datetime.date.today()
+    first = datetime.date(today.year - QUICK_YEARS, 1, 1)
+    candidates = ranged(keyspace, 4096)
+    assert set(candidates) == set(reference_dates(first, today, ('DMY', 'YMD'), (), (4,)))
+    assert len(candidates) == len(set(candidates)) == 2 * (today - first).days + 2
+    assert today.strftime('%d%m%Y').encode() in candidates
@@ -0,0 +1,46 @@
+"""Deduplication returns the first occurrence of each candidate, in order."""
+
+import random
+
+import pytest
+
+import dedup
+from dedup import bloom_dedup, exact_dedup
+
+
+def stream(count, distinct, seed=0):
+    rng = random.Random(seed)
+    return [f"cand{rng.randrange(distinct):06d}".encode() for _ in range(count)]
+
+
+def test_exact_in_memory():
+    data = stream(5000, 1000)
+    assert list(exact_dedup(data)) == list(dict.fromkeys(data))
+
+
+def test_exact_spilled_with_multilevel_merge(tmp_path, monkeypatch):
+    # Enough distinct candidates for several 512 KiB runs, merged two at a time
+    monkeypatch.setattr(dedup, 'MERGE_FAN_IN', 2)
+    data = stream(60000, 40000, seed=1)
+    assert list(exact_dedup(data, memory_mb=1, tmpdir=tmp_path)) == list(dict.fromkeys(data))
+    assert not list(tmp_path.iterdir())
+
+
+@pytest.mark.parametrize('method', ['exact', 'bloom'])
+def test_dedup_keeps_order_and_drops_repeats(method):
+    data = stream(3000, 500, seed=2)
+    result = list(dedup.dedup(data, method))
+    assert len(set(result)) == len(result)
+    # Bloom may drop a few false positives, but never reorders
+    iterator = iter(dict.fromkeys(data))
+    assert all(word in iterator for word in result)
+    if method == 'exact':
+        assert result == list(dict.fromkeys(data))
+
+
+def test_bloom_small_filter_stays_a_subset():
+    data = stream(20000, 5000, seed=3)
+    result = list(bloom_dedup(data, capacity=5000, error_rate=0.01))
+    assert len(set(result)) == len(result)
+    assert set(result) <= set(data)
+    assert len(result) > 0.95 * len(set(data))
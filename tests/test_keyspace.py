@@ -0,0 +1,47 @@
+"""Keyspace indices, ranges and enumeration agree with each other."""
+
+import string
+
+from conftest import product, ranged
+from dates import quick_date_keyspace
+from keyspace import CharsetKeyspace, ExcludingKeyspace, covering, skip_covered
+from mask import MaskKeyspace
+from wordlist import WordlistKeyspace
+
+
+def test_charset_keyspace_enumeration():
+    keyspace = CharsetKeyspace('abc', 0, 4)
+    expected = list(product(['abc'] * 4, 0, 4))
+    assert keyspace.size == len(expected)
+    assert list(keyspace.candidates(0, keyspace.size)) == expected
+    assert [keyspace.candidate(i) for i in range(keyspace.size)] == expected
+    for chunk_size in (1, 7, 40, 1000):
+        assert ranged(keyspace, chunk_size) == expected
+    assert ranged(keyspace, 5, 10, 50) == expected[10:50]
+
+
+def test_excluding_keyspace():
+    earlier = [MaskKeyspace('?d?d', increment=True), CharsetKeyspace('0123456789ab', 3, 3)]
+    base = MaskKeyspace('?h?d?d', increment=True)
+    keyspace = ExcludingKeyspace(base, earlier)
+    everything = list(base.candidates(0, base.size))
+    kept = [w for w in everything if not any(k.covers(w) for k in earlier)]
+    assert keyspace.size == base.size and repr(keyspace) == repr(base)
+    assert ranged(keyspace, 17) == kept
+    assert keyspace.remaining() == len(kept)
+    assert skip_covered(everything, earlier) == kept
+
+
+def test_covering_keeps_only_overlapping_phases(tmp_path):
+    numeric = CharsetKeyspace(string.digits, 1, 6)
+    lowercase = CharsetKeyspace(string.ascii_lowercase, 1, 4)
+    (tmp_path / 'words.txt').write_bytes(b'0\n00\n')
+    wordlist = WordlistKeyspace(tmp_path / 'words.txt')
+    mixed = CharsetKeyspace(string.ascii_letters, 1, 3)
+    assert covering(mixed, [numeric, lowercase]) == [lowercase]
+    assert covering(MaskKeyspace('?u?d'), [numeric, lowercase]) == []
+    # Dates are 8 digits, the numeric phase at most 6
+    assert covering(quick_date_keyspace(), [numeric, lowercase]) == []
+    assert covering(quick_date_keyspace(), [CharsetKeyspace(string.digits, 8, 8)])
+    # Wordlists and dates cover nothing, so later phases are never filtered by them
+    assert covering(MaskKeyspace('?d?d'), [wordlist, quick_date_keyspace()]) == []
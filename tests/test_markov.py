@@ -0,0 +1,68 @@
+"""Markov ordering is a permutation of its base keyspace."""
+
+import pickle
+import random
+
+import pytest
+
+from keyspace import CharsetKeyspace
+from mask import MaskKeyspace, expand_charset
+from markov import MarkovKeyspace, MarkovModel
+
+CORPUS = ['password1', 'letmein', 'abc123', 'qwerty', 'dragon99', 'monkey', 'a1b2c3', 'zz9', 'ba', 'cab']
+
+
+def bases():
+    return [
+        MaskKeyspace('?l?l?d', increment=True),
+        MaskKeyspace('?1?d?1', {'1': expand_charset('abz')}, increment=True, min_length=2),
+        CharsetKeyspace('abc1', 0, 4),
+    ]
+
+
+def encoded(word):
+    return word.encode('latin-1') if isinstance(word, str) else word
+
+
+@pytest.mark.parametrize('base', bases(), ids=repr)
+@pytest.mark.parametrize('corpus', [CORPUS, []], ids=['trained', 'empty'])
+def test_order_is_a_permutation(base, corpus):
+    keyspace = MarkovKeyspace(base, MarkovModel.from_passwords(corpus))
+    ordered = list(keyspace.candidates(0, keyspace.size))
+    original = [encoded(w) for w in base.candidates(0, base.size)]
+    assert keyspace.size == base.size == len(ordered)
+    assert len(set(ordered)) == len(ordered)
+    assert sorted(ordered) == sorted(original)
+
+    for index, word in enumerate(ordered):
+        assert keyspace.index(word) == index
+    rng = random.Random(3)
+    for _ in range(100):
+        start = rng.randrange(keyspace.size)
+        end = rng.randrange(start, keyspace.size + 1)
+        assert list(keyspace.candidates(start, end)) == ordered[start:end]
+    assert [w for lo, hi in keyspace.ranges(7) for w in keyspace.candidates(lo, hi)] == ordered
+
+
+def test_mask_index_inverts_candidate():
+    keyspace = MaskKeyspace('?1?d?1', {'1': expand_charset('abz')}, increment=True)
+    for index in range(keyspace.size):
+        assert keyspace.index(keyspace.candidate(index)) == index
+    with pytest.raises(ValueError):
+        keyspace.index(b'c1a')
+
+
+def test_likely_candidates_come_first():
+    model = MarkovModel.from_passwords(['ab1'] * 50 + ['zz9'])
+    keyspace = MarkovKeyspace(MaskKeyspace('?l?l?d'), model)
+    assert keyspace.candidate(0) == b'ab1'
+    assert keyspace.index(b'ab1') < keyspace.index(b'zz9') < keyspace.index(b'qx5')
+
+
+def test_pickled_keyspace_enumerates_the_same(tmp_path):
+    keyspace = MarkovKeyspace(MaskKeyspace('?l?d?d', increment=True), MarkovModel.from_passwords(CORPUS))
+    expected = list(keyspace.candidates(100, 400))
+    clone = pickle.loads(pickle.dumps(keyspace))
+    assert clone._tables is None
+    assert list(clone.candidates(100, 400)) == expected
+    assert repr(clone) == repr(keyspace)
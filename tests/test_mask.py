@@ -0,0 +1,40 @@
+"""Mask keyspaces decode indices in itertools.product order."""
+
+import random
+
+import pytest
+
+from conftest import product, ranged
+from mask import MaskKeyspace, expand_charset
+
+MASKS = [('?d?d', {}, False, 1), ('?l?d?u', {}, True, 1), ('?1?2?1', {'1': 'ab', '2': '?d!'}, True, 2),
+         ('ab?d', {}, False, 1)]
+
+
+def mask_keyspace(mask, custom, increment, min_length):
+    custom = {key: expand_charset(value) for key, value in custom.items()}
+    return MaskKeyspace(mask, custom, increment, min_length)
+
+
+@pytest.mark.parametrize('mask,custom,increment,min_length', MASKS)
+def test_mask_keyspace_enumeration(mask, custom, increment, min_length):
+    keyspace = mask_keyspace(mask, custom, increment, min_length)
+    expected = list(product(keyspace.positions, keyspace.min_length, keyspace.max_length))
+    assert keyspace.size == len(expected)
+    assert list(keyspace.candidates(0, keyspace.size)) == expected
+    for chunk_size in (1, 13, 100, keyspace.size):
+        assert ranged(keyspace, chunk_size) == expected
+
+    blocks = [row.tobytes() for _, block in keyspace.blocks(0, keyspace.size) for row in block]
+    assert blocks == expected
+    assert all(keyspace.covers(word) for word in expected)
+
+
+def test_mask_random_ranges():
+    keyspace = mask_keyspace('?l?l?d', {}, True, 1)
+    expected = list(product(keyspace.positions, 1, 3))
+    rng = random.Random(1)
+    for _ in range(200):
+        start = rng.randrange(keyspace.size)
+        end = rng.randrange(start, keyspace.size + 1)
+        assert list(keyspace.candidates(start, end)) == expected[start:end]
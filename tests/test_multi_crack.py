@@ -0,0 +1,17 @@
+"""Command-line validation of the multi-target cracker."""
+
+import sys
+
+import pytest
+
+import multi_crack
+
+
+def test_missing_wordlist_is_an_error(encrypted_pdfs, tmp_path, monkeypatch, capsys):
+    path, _, _ = encrypted_pdfs['r3']
+    missing = tmp_path / 'missing.txt'
+    monkeypatch.setattr(sys, 'argv', ['multi_crack.py', str(path), '--wordlist', str(missing)])
+    with pytest.raises(SystemExit) as exit_info:
+        multi_crack.main()
+    assert exit_info.value.code == 1
+    assert f"Error: {missing} does not exist" in capsys.readouterr().out
@@ -0,0 +1,55 @@
+"""Watch mode keeps dispatching while filesystem events stream in."""
+
+import _thread
+import threading
+import time
+from types import SimpleNamespace
+
+import pikepdf
+
+import pdf_decrypt
+
+
+class FloodingObserver:
+    """Stands in for watchdog, reporting the same file modified non-stop."""
+
+    def __init__(self):
+        self.stopped = threading.Event()
+
+    def schedule(self, handler, path, recursive=False):
+        self.handler, self.path = handler, path
+
+    def start(self):
+        def flood():
+            event = SimpleNamespace(is_directory=False, src_path=f"{self.path}/big.pdf")
+            while not self.stopped.is_set():
+                self.handler.on_any_event(event)
+                time.sleep(0.0005)
+        threading.Thread(target=flood, daemon=True).start()
+
+    def stop(self):
+        self.stopped.set()
+
+    def join(self):
+        pass
+
+
+def test_watch_dispatches_during_an_event_stream(tmp_path, monkeypatch):
+    input_dir, output_dir = tmp_path / 'in', tmp_path / 'out'
+    input_dir.mkdir()
+    pdf = pikepdf.new()
+    pdf.add_blank_page()
+    pdf.save(input_dir / 'big.pdf')
+    monkeypatch.setattr(pdf_decrypt, 'Observer', FloodingObserver)
+
+    def interrupt_when_done():
+        deadline = time.monotonic() + 30
+        while not (output_dir / 'big.pdf').exists() and time.monotonic() < deadline:
+            time.sleep(0.05)
+        _thread.interrupt_main()
+
+    threading.Thread(target=interrupt_when_done, daemon=True).start()
+    started = time.monotonic()
+    pdf_decrypt.watch_directory(input_dir, output_dir, 1, settle=0.1)
+    assert (output_dir / 'big.pdf').exists()
+    assert time.monotonic() - started < 20
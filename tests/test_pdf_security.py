@@ -0,0 +1,43 @@
+"""The in-process verifier agrees with pikepdf on revisions 2-6."""
+
+import pikepdf
+import pytest
+
+from conftest import ENCRYPTED
+from pdf_security import PasswordVerifier, read_encryption_params
+
+NAMES = [name for name, _, _ in ENCRYPTED]
+WRONG = ['', 'wrong', '12 ', 'ABC1', 'secret', 'x' * 40]
+
+
+def opens(path, password):
+    try:
+        with pikepdf.open(path, password=password):
+            return True
+    except pikepdf.PasswordError:
+        return False
+
+
+@pytest.mark.parametrize('name', NAMES)
+def test_verifier_matches_pikepdf(encrypted_pdfs, name):
+    path, password, revision = encrypted_pdfs[name]
+    verifier = PasswordVerifier.from_file(path)
+    assert verifier.revision == revision
+    for candidate in [password] + WRONG:
+        assert verifier.check(candidate) == opens(path, candidate), candidate
+
+
+@pytest.mark.parametrize('name', NAMES)
+def test_owner_password(encrypted_pdfs, name):
+    path, _, _ = encrypted_pdfs[name]
+    verifier = PasswordVerifier.from_file(path)
+    assert verifier.check_owner(f"owner-{name}")
+    assert not verifier.check_owner('not-the-owner')
+
+
+def test_unencrypted_file(tmp_path):
+    path = tmp_path / 'plain.pdf'
+    pdf = pikepdf.new()
+    pdf.add_blank_page()
+    pdf.save(path)
+    assert read_encryption_params(path) is None
@@ -0,0 +1,34 @@
+"""Worker profiles are dumped once at exit and reported after the run."""
+
+import io
+from concurrent.futures import ProcessPoolExecutor
+
+from profiling import RunProfiler
+
+
+def _init(values):
+    values.append(1)
+
+
+def _square(n):
+    return sum(i * i for i in range(n))
+
+
+def test_report_merges_worker_stats_after_the_pool_exits():
+    profiler = RunProfiler(100)
+    initializer, initargs = profiler.pool(_init, ([],))
+    with profiler, ProcessPoolExecutor(max_workers=2, initializer=initializer, initargs=initargs) as executor:
+        assert list(executor.map(_square, [1000] * 8)) == [_square(1000)] * 8
+    report = io.StringIO()
+    profiler.report(report)
+    assert 'Profile: parent + ' in report.getvalue()
+    assert ' 0 workers' not in report.getvalue()
+    assert 'test_profiling.py' in report.getvalue()
+    assert not profiler.directory.exists()
+
+
+def test_disabled_profiler_passes_the_initializer_through():
+    profiler = RunProfiler()
+    assert profiler.pool(_init, ([],)) == (_init, ([],))
+    with profiler:
+        pass
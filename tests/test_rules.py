@@ -0,0 +1,35 @@
+"""Rule semantics follow hashcat."""
+
+import pytest
+
+from rules import Rule, RuleError, parse_rules
+
+WORDS = ['abc', 'abcd', 'abcde']
+
+
+@pytest.mark.parametrize('rule,expected', [
+    ('<4', ['abc', 'abcd', None]),
+    ('>4', [None, 'abcd', 'abcde']),
+    ('_4', [None, 'abcd', None]),
+    ('u', ['ABC', 'ABCD', 'ABCDE']),
+    ('$1$2', ['abc12', 'abcd12', 'abcde12']),
+    ('c r', ['cbA', 'dcbA', 'edcbA']),
+])
+def test_rule(rule, expected):
+    assert [Rule(rule).apply(word) for word in WORDS] == expected
+
+
+def test_bytes_words():
+    assert Rule('$!').apply(b'pw') == b'pw!'
+
+
+@pytest.mark.parametrize('rule', ['\x01', '$', '<'])
+def test_invalid_rules(rule):
+    with pytest.raises(RuleError):
+        Rule(rule)
+
+
+def test_parse_rules_skips_comments_and_bad_lines():
+    rules, skipped = parse_rules(['# comment\n', ':\n', '\n', '$1\n', '\x01\n'])
+    assert [rule.text for rule in rules] == [':', '$1']
+    assert skipped == 1
@@ -0,0 +1,39 @@
+"""Estimates count exactly the candidates the crackers run."""
+
+import random
+
+import pytest
+
+from mask import MaskKeyspace
+from time_calculator import CLASSIC_MASKS, wordlist_lines
+from wordlist import WordlistKeyspace
+
+WORDLISTS = [b'', b'\n', b'one', b'one\n', b'one\r\ntwo\r\n', b'\r\ntail', b'a\n\n\nb\r', b'x\r',
+             b'\r\r\n\r', b'alpha\nbeta\r\ngamma\n\ndelta']
+
+
+def candidate_count(path):
+    keyspace = WordlistKeyspace(path)
+    return sum(1 for _ in keyspace.candidates(0, keyspace.size))
+
+
+@pytest.mark.parametrize('data', WORDLISTS)
+def test_wordlist_lines(tmp_path, data):
+    path = tmp_path / 'words.txt'
+    path.write_bytes(data)
+    for chunk_size in (1, 3, 1 << 20):
+        assert wordlist_lines(path, chunk_size) == candidate_count(path)
+
+
+def test_wordlist_lines_random(tmp_path):
+    rng = random.Random(11)
+    path = tmp_path / 'words.txt'
+    for _ in range(300):
+        path.write_bytes(bytes(rng.choice(b'ab\r\n') for _ in range(rng.randrange(40))))
+        assert wordlist_lines(path, rng.randrange(1, 9)) == candidate_count(path)
+
+
+def test_classic_numeric_phases_count_each_length_once():
+    numeric = [MaskKeyspace(mask, custom, increment=True, min_length=min_length).size
+               for name, mask, custom, min_length in CLASSIC_MASKS if name.startswith('Numeric')]
+    assert sum(numeric) == sum(10 ** length for length in range(1, 13))
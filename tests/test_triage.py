@@ -0,0 +1,77 @@
+"""Triage routes each file from its trailer and /Encrypt dictionary alone."""
+
+import shutil
+
+import pikepdf
+import pytest
+
+from pdf_security import PasswordVerifier, read_encryption_params
+from potfile import Potfile
+from triage import decrypt_to, triage_file
+
+DAMAGED = [b'(abc)', b'<< /R [ >>', b'<< /Filter /Standard /V 2 /R /X /O <00> /U <00> >>',
+           b'<< /Filter /Standard /V 2 /R 3 /Length (x) /O <00> /U <00> >>']
+
+
+def damaged_pdf(directory, encrypt):
+    path = directory / 'damaged.pdf'
+    path.write_bytes(b'%PDF-1.4\n1 0 obj << /Type /Catalog >> endobj\ntrailer\n<< /Root 1 0 R /Encrypt '
+                     + encrypt + b' >>\n%%EOF\n')
+    return path
+
+
+@pytest.mark.parametrize('encrypt', DAMAGED)
+def test_damaged_encrypt_dictionary_is_an_error(tmp_path, encrypt):
+    path = damaged_pdf(tmp_path, encrypt)
+    with pytest.raises(ValueError):
+        read_encryption_params(path)
+    assert triage_file(path, Potfile(tmp_path / 'pot')).route == 'error'
+
+
+def test_truncated_encrypted_file_is_an_error(encrypted_pdfs, tmp_path):
+    path, _, _ = encrypted_pdfs['r3']
+    truncated = tmp_path / 'truncated.pdf'
+    data = path.read_bytes()
+    truncated.write_bytes(data[:len(data) // 2])
+    with pytest.raises(ValueError):
+        read_encryption_params(truncated)
+    assert triage_file(truncated, Potfile(tmp_path / 'pot')).route == 'error'
+
+
+@pytest.mark.parametrize('name,route', [('r2', 'rc4'), ('r4-aes', 'rc4'), ('r6', 'aes256'),
+                                        ('r6-empty', 'decrypt')])
+def test_routes(encrypted_pdfs, tmp_path, name, route):
+    path, _, _ = encrypted_pdfs[name]
+    assert triage_file(path, Potfile(tmp_path / 'pot')).route == route
+
+
+def test_only_the_files_own_potfile_entry_is_checked(encrypted_pdfs, tmp_path, monkeypatch):
+    potfile = Potfile(tmp_path / 'pot')
+    r3, password, _ = encrypted_pdfs['r3']
+    r6, r6_password, _ = encrypted_pdfs['r6']
+    # Priority passwords from other files are left to the crackers
+    potfile.add(read_encryption_params(r3), r6_password)
+    checked = []
+    check = PasswordVerifier.check
+    monkeypatch.setattr(PasswordVerifier, 'check', lambda self, pw: checked.append(pw) or check(self, pw))
+    assert triage_file(r6, potfile).route == 'aes256'
+    assert checked == ['']
+
+    potfile.add(read_encryption_params(r6), r6_password)
+    result = triage_file(r6, potfile)
+    assert (result.route, result.password) == ('potfile', r6_password)
+
+
+def test_decrypt_to_never_overwrites(encrypted_pdfs, tmp_path):
+    path, password, _ = encrypted_pdfs['r3']
+    first, second, output = tmp_path / 'a', tmp_path / 'b', tmp_path / 'out'
+    for directory in (first, second, output):
+        directory.mkdir()
+    shutil.copy(path, first / 'same.pdf')
+    shutil.copy(encrypted_pdfs['r2'][0], second / 'same.pdf')
+    assert decrypt_to(first / 'same.pdf', password, output) is None
+    decrypted = (output / 'same.pdf').read_bytes()
+    assert 'already exists' in decrypt_to(second / 'same.pdf', '12', output)
+    assert (output / 'same.pdf').read_bytes() == decrypted
+    with pikepdf.open(output / 'same.pdf'):
+        pass
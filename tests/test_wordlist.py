@@ -0,0 +1,38 @@
+"""Wordlist byte ranges cover every line exactly once."""
+
+import random
+
+import pytest
+
+from conftest import ranged
+from wordlist import WordlistKeyspace
+
+WORDLISTS = [b'', b'\n', b'one', b'one\n', b'one\r\ntwo\r\n', b'\r\ntail', b'a\n\n\nb\r', b'x\r',
+             b'\r\r\n\r', b'alpha\nbeta\r\ngamma\n\ndelta']
+
+
+def lines(data):
+    """Reference split: one trailing ``\\r`` removed, blank lines skipped."""
+    stripped = (line[:-1] if line.endswith(b'\r') else line for line in data.split(b'\n'))
+    return [line for line in stripped if line]
+
+
+@pytest.mark.parametrize('data', WORDLISTS)
+def test_wordlist_ranges(tmp_path, data):
+    path = tmp_path / 'words.txt'
+    path.write_bytes(data)
+    keyspace = WordlistKeyspace(path)
+    for chunk_size in (1, 2, 100):
+        assert ranged(keyspace, chunk_size) == lines(data)
+
+
+def test_wordlist_random_splits(tmp_path):
+    rng = random.Random(7)
+    for _ in range(200):
+        data = bytes(rng.choice(b'ab\r\n') for _ in range(rng.randrange(30)))
+        path = tmp_path / 'words.txt'
+        path.write_bytes(data)
+        keyspace = WordlistKeyspace(path)
+        cuts = sorted({0, keyspace.size, *(rng.randrange(keyspace.size + 1) for _ in range(3))})
+        words = [w for lo, hi in zip(cuts, cuts[1:]) for w in keyspace.candidates(lo, hi)]
+        assert words == lines(data)